@@ -1,4 +1,9 @@
 # LIBRARIES
+import os
+import time
+import queue
+import multiprocessing
+from threading import Thread, Event
 from tkinter import *
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
@@ -8,50 +13,46 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
 # import openpyxl
 # import serial
 import mplcursors
+from bms_core import *
 
-plt.style.use('Solarize_Light2')
+plt.style.use(PLOT_STYLE)
 
 # CONSTANTS
-DEFAULT_STACK_ROWS = 3  # Default number of stacks in a row
-DEFAULT_STACK_COLS = 6  # Default number of stacks in a column
-DEFAULT_CELLS = 6   # Default number of cells per stack
-DEFAULT_TEMPS = 4  # Default number of temperature sensors per stack
-DEFAULT_UV = 2.700  # Default undervoltage threshold, in volts
-DEFAULT_OV = 4.200  # Default overvoltage threshold, in volts
-DEFAULT_UT = 10.0   # Default under-temperature threshold, in degrees Celsius
-DEFAULT_OT = 45.0   # Default over-temperature threshold, in degrees Celsius
 DEFAULT_BAUD = 115200  # Default baud rate for serial communication
-TIMESTAMP_COL = 1  # Column index for timestamp
-LAST_CELL_DATA_COL = 181  # Last column index for cell voltage & temp data
-SOC_COL = 182
-VSBAT_COL = 183
-VSHV_COL = 184
-CURR_COL = 185
-I_ACTUAL_COL = 186
-N_ACTUAL_COL = 187
-T_MOTOR_COL = 188
-T_IGBT_COL = 189
-LEFT_RADIATOR_COL = 190
-RIGHT_RADIATOR_COL = 191
-I_ACTUAL_FLAG = True  # Flag to indicate if actual current data is present
+LOAD_POLL_MS = 100  # Interval at which the UI checks on a background load
+VIOLATION_ZOOM_SECONDS = 5.0  # Least time shown either side of a zoomed violation
+TABLE_MAX_ROWS = 1000  # Rows inserted into a table; the rest are reached by sorting
 
 
 # GLOBAL VARIABLES
-all_cell_voltages = []  # List to store all cell voltages
-all_cell_temps = []  # List to store all cell temperatures
+# Cell voltages and temperatures, shaped (stack, channel, sample)
+all_cell_voltages = np.empty((0, 0, 0), dtype=CELL_DTYPE)
+all_cell_temps = np.empty((0, 0, 0), dtype=CELL_DTYPE)
 total_pack_voltage = 0.0  # Total pack voltage
-timestamps = []
+time_axis = np.array([])  # Seconds since midnight, the x values of every plot
 SoC = []
 VsBat = []
 VsHV = []
 curr = []
 i_actual = []
-timestamps_numeric = np.array([], dtype=np.int64)
+timestamps_numeric = np.array([], dtype=np.int64)  # Nanoseconds since midnight
+total_pack_voltage_arr = np.array([])  # Pack voltage per sample
+power = np.array([])  # Pack power per sample, in kW
 num_rows = 0  # Number of rows in the DataFrame
+data_version = 0  # Incremented on every load, so views know when to refresh
+file_starts = np.zeros(1, dtype=np.int64)  # First sample of each file of a session
+window_index = build_window_index(timestamps_numeric, {})  # Prefix sums for window queries
+# Range min/max indexes over every cell voltage and temperature channel
+voltage_range_index = build_range_index(timestamps_numeric, all_cell_voltages)
+temp_range_index = build_range_index(timestamps_numeric, all_cell_temps)
+current_range_index = build_range_index(timestamps_numeric, np.empty((1, 0)))
+# Per-channel statistics (mean, min, max, std, first, last, p1, p99) computed at load
+voltage_stats = channel_stats(voltage_range_index)
+temp_stats = channel_stats(temp_range_index)
+current_stats = channel_stats(current_range_index)
 file_name = ''
 
 
@@ -76,97 +77,53 @@ file_name = ''
 #     return comms
 
 
-def parse_time_to_numeric(value):
-    """Converts a timestamp-like value to a zero-right-padded integer."""
-    digits = ''.join(filter(str.isdigit, str(value)))
-    if not digits:
-        return None
-    if len(digits) < 15:
-        digits = digits.ljust(15, '0')
-    return int(digits)
+def set_data(data, i_actual_flag):
+    """ Publishes a loaded and prepared data dictionary as the global data series.
+
+        :param data: Dictionary returned by prepare_data.
+        :param i_actual_flag: Flag indicating if actual current data is present.
+    """
+    global time_axis, timestamps_numeric, SoC, VsBat, VsHV, curr, current_converted, num_rows, all_cell_voltages, all_cell_temps, i_actual, n_actual, t_motor, t_igbt, torque, left_radiator_temps, right_radiator_temps, total_pack_voltage_arr, power, file_starts, window_index, voltage_range_index, temp_range_index, current_range_index, voltage_stats, temp_stats, current_stats, data_version
+
+    data_version += 1
+    timestamps_numeric = data['timestamps_numeric']
+    num_rows = len(timestamps_numeric)  # Number of rows in the file
+    time_axis = timestamps_numeric / 1e9
+    SoC = data['SoC']
+    VsBat = data['VsBat']
+    VsHV = data['VsHV']
+    curr = data['curr']
+    current_converted = data['current_converted']
+    if (i_actual_flag):
+        i_actual = data['i_actual']
+        torque = data['torque']
+    n_actual = data['n_actual']
+    t_motor = data['t_motor']
+    t_igbt = data['t_igbt']
+    left_radiator_temps = data['left_radiator_temps']
+    right_radiator_temps = data['right_radiator_temps']
+    all_cell_voltages = data['cell_voltages']
+    all_cell_temps = data['cell_temps']
+    total_pack_voltage_arr = data['total_pack_voltage']
+    power = data['power']
+    file_starts = data.get('file_starts', np.zeros(1, dtype=np.int64))
+    window_index = data['window_index']
+    voltage_range_index = data['voltage_range_index']
+    temp_range_index = data['temp_range_index']
+    current_range_index = data['current_range_index']
+    voltage_stats = data['voltage_stats']
+    temp_stats = data['temp_stats']
+    current_stats = data['current_stats']
 
 
 def read_file(file_path, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag):
-    """ Reads a CSV file and returns its content as a pandas DataFrame.
+    """ Reads a CSV file into the global data series.
 
         :param file_path: Path to the CSV file.
-        :returns: DataFrame containing the CSV data.
     """
-    indiv_cell_voltages = []  # List to store individual cell voltages
-    indiv_cell_temps = []  # List to store individual cell temperatures
-    global timestamps, timestamps_numeric, SoC, VsBat, VsHV, curr, current_converted, num_rows, all_cell_voltages, all_cell_temps, i_actual, n_actual, t_motor, t_igbt, torque, left_radiator_temps, right_radiator_temps
-
-    # Read the CSV file, skipping the second line
-    df = pd.read_csv(file_path, header=0, skiprows=[1])
-    # Only keep every 20th row after the second line
-    # df = df.iloc[::20, :].reset_index(drop=True)
-
-    cols = df.columns.tolist()  # Get the list of column names
-    num_rows = 0
-    num_rows = len(df.index)  # Get the number of rows in the DataFrame
-    # Store timestamps from the first column and trim each entry
-    timestamps = [str(ts)[11:-6]
-                  for ts in df.iloc[:, timestamp_col-1].tolist()]
-    timestamps_numeric = np.array([
-        parse_time_to_numeric(ts) or 0 for ts in timestamps
-    ], dtype=np.int64)
-    SoC = df.iloc[:, SoC_col-1].tolist()  # Store SoC data
-    VsBat = df.iloc[:, VsBat_col-1].tolist()  # Store VsBat data
-    VsHV = df.iloc[:, VsHV_col-1].tolist()  # Store VsHV data
-    curr_arr = df.iloc[:, curr_col-1].to_numpy(dtype=float, copy=False)
-    curr = curr_arr.tolist()  # Store current data
-    if (i_actual_flag):
-        # Store negated actual current data
-        i_actual = (-df.iloc[:, I_ACTUAL_COL -
-                    1].to_numpy(dtype=float, copy=False)).tolist()
-        # Torque approximation from current
-        torque = [max(0, value * 0.75) for value in i_actual]
-        N_ACTUAL_COL = I_ACTUAL_COL + 1
-        T_MOTOR_COL = I_ACTUAL_COL + 2
-        T_IGBT_COL = I_ACTUAL_COL + 3
-    else:
-        N_ACTUAL_COL = I_ACTUAL_COL
-        T_MOTOR_COL = I_ACTUAL_COL + 1
-        T_IGBT_COL = I_ACTUAL_COL + 2
-    # Store negated RPM data (corresponding to motor mounting direciton, forward is negative)
-    n_actual = (-df.iloc[:, N_ACTUAL_COL-1].to_numpy(
-        dtype=float, copy=False)).tolist()
-    # Store raw motor temperature data
-    raw_t_motor = df.iloc[:, T_MOTOR_COL-1].to_numpy(dtype=float, copy=False)
-    t_motor = calc_motor_temp(raw_t_motor).tolist()
-    # Store raw IGBT temperature data
-    raw_t_igbt = df.iloc[:, T_IGBT_COL-1].to_numpy(dtype=float, copy=False)
-    t_igbt = calc_igbt_temp(raw_t_igbt).tolist()
-    # Convert current to Amperes
-    current_converted = calc_curr(curr_arr).tolist()
-    left_radiator_temps = calc_radiator_temp(
-        df.iloc[:, LEFT_RADIATOR_COL-1].to_numpy(dtype=float, copy=False)).tolist()
-    right_radiator_temps = calc_radiator_temp(
-        df.iloc[:, RIGHT_RADIATOR_COL-1].to_numpy(dtype=float, copy=False)).tolist()
-
-    new_cols = []
-    for i in range(timestamp_col, LAST_CELL_DATA_COL, 4):
-        group = cols[i:i+4]
-        # Reverse the order of each group of 4 columns
-        new_cols.extend(group[::-1])
-    all_cols = [cols[timestamp_col-1]] + new_cols + cols[LAST_CELL_DATA_COL+1:]
-    df_new = df[all_cols]  # Creating new dataframe with reordered columns
-
-    all_cell_temps.clear()  # Clear previous temperature data
-    all_cell_voltages.clear()  # Clear previous voltage data
-    # Extracting cell voltages and temperatures from the DataFrame
-    for stack_data in range(timestamp_col, LAST_CELL_DATA_COL, cells+temps):
-        for cell in range(cells):
-            indiv_cell_voltages.append(
-                df_new.iloc[:, stack_data + cell].to_numpy(dtype=float, copy=False).tolist())
-        all_cell_voltages.append(indiv_cell_voltages)
-        indiv_cell_voltages = []  # Reset for the next stack
-        for temp in range(temps):
-            raw_temp = df_new.iloc[:, stack_data + cells +
-                                   temp].to_numpy(dtype=float, copy=False)
-            indiv_cell_temps.append(calc_temp(raw_temp).tolist())
-        all_cell_temps.append(indiv_cell_temps)
-        indiv_cell_temps = []
+    data = load_data(file_path, cells, temps, timestamp_col,
+                     SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag)
+    set_data(prepare_data(data), i_actual_flag)
 
 
 # def read_lap_times(file_path):
@@ -189,138 +146,77 @@ def read_file(file_path, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_c
 def plot_data(x, y, x_label, y_label, title, do, type='', top_lim=None, bot_lim=None):
     """ Plots the data using matplotlib.
 
-        :param x: X-axis data (e.g., timestamps).
+        :param x: X-axis data (e.g., time_axis).
         :param y: Y-axis data (e.g., cell voltages or temperatures).
         :param x_label: Label for the X-axis.
         :param y_label: Label for the Y-axis.
         :param title: Title of the plot."""
 
-    lines = []
     fig, ax = plt.subplots()
-
-    if (type == 'voltages'):
-        if isinstance(y[0], list):  # If y is a list of lists (all cells in a stack)
-            for cell_index, voltage in enumerate(y):
-                line, = ax.plot(x, voltage,
-                                label=f'Cell {cell_index + 1}')
-                lines.append(line)
-            ax.legend()
-        else:
-            line, = ax.plot(x, y)
-            lines.append(line)
-        ax.set_ylim(bottom=0.0, top=5.0)
-
-    elif (type == 'temps'):
-        if isinstance(y[0], list):  # If y is a list of lists (all cells in a stack)
-            for cell_index, temp in enumerate(y):
-                line, = ax.plot(x, temp,
-                                label=f'Cell {cell_index + 1}')
-                lines.append(line)
-            ax.legend()
-        else:
-            line, = ax.plot(x, y)
-            lines.append(line)
-        ax.set_ylim(bottom=0.0, top=60.0)
-
-    else:
-        line, = ax.plot(x, y)
-        lines.append(line)
-        ax.set_ylim(bottom=top_lim, top=bot_lim)
-
-    ax.set_xlabel(x_label)
-    ax.set_ylabel(y_label)
-    ax.xaxis.set_major_locator(ticker.AutoLocator())
-    ax.xaxis.set_minor_locator(ticker.AutoLocator())
-    ax.set_title(title)
-    ax.grid(True)
+    lines = draw_plot(ax, x, y, x_label, y_label,
+                      title, type, top_lim, bot_lim)
     mplcursors.cursor(lines, hover=True)
     if (do == 'show'):
         plt.show()
     else:
-        plt.savefig(title + ' ' + file_name.split('.')[0] + '.png')
+        plt.savefig(graph_file_name(title))
         plt.close(fig)
 
 
-def calc_temp(raw_temp):
-    """ Calculates the temperature in Celsius from the raw temperature value.
+def mark_file_starts(ax):
+    """ Draws a vertical line where each file of a session after the first one starts.
 
-        :param raw_temp: Raw temperature value.
-        :returns: Temperature in Celsius.
+        :param ax: Axes plotted against time_axis.
+        :returns: List of the drawn lines.
     """
-    raw_temp = np.asarray(raw_temp, dtype=float)
-    r_inf = 10000 * np.exp(-3435 / 298.15)
-    R = raw_temp / (3.0 - (raw_temp * 0.0001))  # Calculate resistance
-    return ((3435 / np.log(R / r_inf)) - 273.15)  # Convert to Celsius
-
+    return [ax.axvline(time_axis[start], color='grey', linestyle='--', linewidth=1)
+            for start in file_starts[1:] if start < len(time_axis)]
 
-def calc_curr(raw_curr):
-    """ Calculates the current in Amperes from the raw current value.
 
-        :param raw_curr: Raw current value.
-        :returns: Current in Amperes.
-    """
-    # Assuming raw_curr is in mA, convert to A
-    raw_curr = np.asarray(raw_curr, dtype=float)
-    voltage = raw_curr * 5.0 / 1023.0
-    current = ((voltage - 2.4929) / 0.0057)
-    return current
+def plot_multi_data(x, y_series, labels, x_label, y_label, title):
+    """Plots multiple data series against the same x-axis."""
+    fig, ax = plt.subplots()
+    lines = []
+    for series, label in zip(y_series, labels):
+        line = plot_decimated(ax, x, series, label=label)
+        lines.append(line)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    ax.xaxis.set_major_locator(ticker.AutoLocator())
+    ax.xaxis.set_major_formatter(clock_formatter())
+    ax.xaxis.set_minor_locator(ticker.AutoLocator())
+    ax.grid(True)
+    ax.legend()
+    mplcursors.cursor(lines, hover=True)
+    plt.show()
+    plt.close(fig)
 
 
-def calc_radiator_temp(raw_radiator_temp):
-    """ Calculates radiator temperature from a raw sensor value.
+def graph_file_name(title):
+    """ Returns the PNG file name a graph is saved under.
 
-        :param raw_radiator_temp: Raw radiator temperature value.
-        :returns: Radiator temperature in Celsius.
+        :param title: Title of the plot.
     """
-    raw_radiator_temp = np.asarray(raw_radiator_temp, dtype=float)
-    clamped = np.clip(raw_radiator_temp, 0.0, 5000.0)
-    radiator_temp = -55.0 + (clamped / 5000.0) * 180.0
-    return radiator_temp
+    return title + ' ' + file_name.split('.')[0] + '.png'
 
 
-def calc_motor_temp(raw_motor_temp):
-    """ Calculates motor temperature from a raw sensor value.
+def table_value(column, value):
+    """ Formats a value for a table cell.
 
-        :param raw_motor_temp: Raw motor temperature value.
-        :returns: Motor temperature in Celsius.
-    """
-    raw_motor_temp = np.asarray(raw_motor_temp, dtype=float)
-    # EMRAX motor temperature regression model
-    p1 = -1.387e-16
-    p2 = 3.164e-11
-    p3 = -1.009e-06
-    p4 = 0.027410
-    p5 = -196.9
-    motor_temp = (
-        p1 * (raw_motor_temp ** 4)
-        + p2 * (raw_motor_temp ** 3)
-        + p3 * (raw_motor_temp ** 2)
-        + p4 * raw_motor_temp
-        + p5
-    )
-    return motor_temp
-
-
-def calc_igbt_temp(raw_igbt_temp):
-    """ Calculates IGBT temperature from a raw sensor value.
-
-        :param raw_igbt_temp: Raw IGBT temperature value.
-        :returns: IGBT temperature in Celsius.
+        :param column: Key of the table column.
+        :param value: Value to show.
+        :returns: Display value.
     """
-    raw_igbt_temp = np.asarray(raw_igbt_temp, dtype=float)
-    p1 = -2.8e-15
-    p2 = 3.375e-10
-    p3 = -1.426e-05
-    p4 = 0.26510
-    p5 = -1810
-    igbt_temp = (
-        p1 * (raw_igbt_temp ** 4)
-        + p2 * (raw_igbt_temp ** 3)
-        + p3 * (raw_igbt_temp ** 2)
-        + p4 * raw_igbt_temp
-        + p5
-    )
-    return igbt_temp
+    if column in ('start', 'end'):
+        return format_clock(value)
+    elif column in ('stack', 'channel'):
+        return int(value) + 1
+    elif column == 'lap':
+        return int(value)
+    elif isinstance(value, str):
+        return str(value)
+    return 'N/A' if np.isnan(value) else round(float(value), 3)
 
 
 def check_status(value, lower, upper):
@@ -350,6 +246,13 @@ class BatteryManagementSystem:
         self.root.iconbitmap('icon.ico')
 
         self.file_path = ""  # Initialize file path as instance variable
+        self.file_paths = []  # Files of the session, more than one for a multi-file session
+        self.load_running = False  # Whether a background job is running
+        self.stack_count = DEFAULT_STACK_ROWS * DEFAULT_STACK_COLS  # Stacks in use
+        self.tables = {}  # Contents of the sortable tables, by Treeview
+        self.status_labels = []  # (label, kind, stack, channel) of every threshold-coloured label
+        self.layout = None  # (stack_rows, stack_cols, cells, temps, i_actual_flag) of the built widgets
+        self.panels = []  # Embedded plots, built and refreshed when their tab is shown
 
         # self.comms = serial_ports() # Searching for available serial ports
         self.create_widgets()
@@ -368,18 +271,46 @@ class BatteryManagementSystem:
         self.create_voltages_tab()
         self.create_temps_tab()
         self.create_motor_controller_tab()
+        self.create_laps_tab()
+        self.create_violations_tab()
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
 
     def open_file(self):
-        """ Opens a file dialog to select a CSV file. """
+        """ Opens a file dialog to select one or more CSV files. """
 
-        file_path = filedialog.askopenfilename(
+        file_paths = filedialog.askopenfilenames(
             filetypes=[("CSV files", "*.csv")])
-        if file_path:
-            self.file_path = file_path  # Store as instance variable
-            self.file_entry.delete(0, END)
-            self.file_entry.insert(0, file_path)
-            # Enable the Confirm Settings button now that a file is selected
-            self.confirm_button.config(state='normal')
+        if file_paths:
+            self.select_files(sorted(file_paths))
+
+    def open_folder(self):
+        """ Opens a folder dialog and selects every CSV file in the folder. """
+
+        folder = filedialog.askdirectory()
+        if folder:
+            file_paths = sorted(os.path.join(folder, entry) for entry in os.listdir(folder)
+                                if entry.lower().endswith('.csv'))
+            if not file_paths:
+                messagebox.showinfo(
+                    "No CSV Files", f"No CSV files were found in {folder}.")
+                return
+            self.select_files(file_paths)
+
+    def select_files(self, file_paths):
+        """ Stores the selected files and shows them in the file entry.
+
+            :param file_paths: List of CSV file paths.
+        """
+        self.file_paths = list(file_paths)
+        self.file_path = self.file_paths[0]  # Store as instance variable
+        self.file_entry.delete(0, END)
+        if len(self.file_paths) == 1:
+            self.file_entry.insert(0, self.file_path)
+        else:
+            self.file_entry.insert(
+                0, f'{len(self.file_paths)} files in {os.path.dirname(self.file_path)}')
+        # Enable the Confirm Settings button now that a file is selected
+        self.confirm_button.config(state='normal')
 
     def create_settings_tab(self):
         """ Creates the settings tab with input fields for voltage and temperature settings. """
@@ -453,6 +384,10 @@ class BatteryManagementSystem:
         self.OT_entry = ttk.Entry(self.temp_frame, width=5)
         self.OT_entry.insert(0, DEFAULT_OT)
         self.OT_entry.grid(row=1, column=3, padx=5, pady=5)
+        # Threshold edits restyle labels and list violations without reloading the log
+        for entry in (self.UV_entry, self.OV_entry, self.UT_entry, self.OT_entry):
+            entry.bind('<Return>', self.apply_thresholds)
+            entry.bind('<FocusOut>', self.apply_thresholds)
 
         # File Selection Frame
         self.file_frame = ttk.LabelFrame(
@@ -467,6 +402,10 @@ class BatteryManagementSystem:
         self.file_button = ttk.Button(
             self.file_frame, text='Browse', command=self.open_file)
         self.file_button.grid(row=0, column=2, padx=5, pady=5)
+        # Folder button, selects every log of a test day
+        self.folder_button = ttk.Button(
+            self.file_frame, text='Folder', command=self.open_folder)
+        self.folder_button.grid(row=0, column=3, padx=5, pady=5)
         # Column entries
         self.columns_frame = ttk.LabelFrame(
             self.file_frame, text='Data Columns:')
@@ -514,8 +453,10 @@ class BatteryManagementSystem:
         def get_avg_current():
             """ Calculates and displays the average current over the specified time interval. """
 
-            start_time = parse_time_to_numeric(self.ca_start_time_entry.get())
-            end_time = parse_time_to_numeric(self.ca_end_time_entry.get())
+            start_time = parse_clock(
+                self.ca_start_time_entry.get(), timestamps_numeric)
+            end_time = parse_clock(
+                self.ca_end_time_entry.get(), timestamps_numeric, start_time)
 
             # Validate input: check if times are not empty and not equal
             if start_time is None or end_time is None or start_time >= end_time:
@@ -524,29 +465,33 @@ class BatteryManagementSystem:
                 return
 
             # Find indices corresponding to the specified time interval
-            start_index = int(np.searchsorted(
-                timestamps_numeric, start_time, side='left'))
-            end_index = int(np.searchsorted(
-                timestamps_numeric, end_time, side='right'))
+            start_index, end_index = window_bounds(
+                window_index, start_time, end_time)
 
             if start_index >= len(timestamps_numeric) or end_index <= start_index:
                 messagebox.showerror(
                     "Invalid Input", "Time interval out of range.")
                 return
 
-            # Calculate average current
-            current_segment = current_converted[start_index:end_index]
-            avg_current = sum(current_segment) / len(current_segment)
+            # Calculate average current, charge and energy from the prefix sums
+            avg_current = window_mean(
+                window_index, 'current', start_time, end_time)
+            amp_hours = window_amp_hours(window_index, start_time, end_time)
+            kwh = window_kwh(window_index, start_time, end_time)
 
             # Display average current
             self.ca_result_label.config(
                 text=f'Average Current (A): {avg_current:.2f}')
+            self.ca_energy_label.config(
+                text=f'Charge (Ah): {amp_hours:.3f}    Energy (kWh): {kwh:.3f}')
 
         def plot_curr():
             """ Plots the current over the specified time interval. """
 
-            start_time = parse_time_to_numeric(self.ca_start_time_entry.get())
-            end_time = parse_time_to_numeric(self.ca_end_time_entry.get())
+            start_time = parse_clock(
+                self.ca_start_time_entry.get(), timestamps_numeric)
+            end_time = parse_clock(
+                self.ca_end_time_entry.get(), timestamps_numeric, start_time)
 
             if start_time is None or end_time is None or start_time >= end_time:
                 messagebox.showerror(
@@ -565,7 +510,7 @@ class BatteryManagementSystem:
                 return
 
             # Extract data for plotting
-            time_segment = timestamps[start_index:end_index]
+            time_segment = time_axis[start_index:end_index]
             current_segment = current_converted[start_index:end_index]
 
             # Plot current data
@@ -594,6 +539,10 @@ class BatteryManagementSystem:
         self.ca_result_label = ttk.Label(
             self.current_frame, text='Average Current (A):')
         self.ca_result_label.grid(row=1, column=3, padx=5, pady=5, sticky='e')
+        self.ca_energy_label = ttk.Label(
+            self.current_frame, text='Charge (Ah):    Energy (kWh):')
+        self.ca_energy_label.grid(
+            row=2, column=0, columnspan=4, padx=5, pady=5, sticky='e')
         self.ca_graph_button = ttk.Button(
             self.current_frame, text='Plot Current', command=plot_curr)
         self.ca_graph_button.grid(row=1, column=2, padx=5, pady=5)
@@ -627,11 +576,80 @@ class BatteryManagementSystem:
         self.ain_scale_value = ttk.Label(self.torque_calci_frame, text='')
         self.ain_scale_value.grid(row=1, column=2, padx=5, pady=5, sticky='w')
 
-        # # Lap times frame
-        # self.lap_frame = ttk.LabelFrame(self.settings_tab, text='Lap Times', padding=(10, 5))
-        # self.lap_frame.grid(row=2, column=0, padx=10, pady=5, sticky='nsew')
-        # self.lap_file_label = ttk.Label(self.lap_frame, text='Lap Times File:')
-        # self.lap_file_label.grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        # Lap times frame
+        def open_lap_file():
+            """ Opens a file dialog to select a lap times file. """
+
+            lap_file_path = filedialog.askopenfilename(
+                filetypes=[("Lap times", "*.csv *.xlsx"), ("All files", "*.*")])
+            if lap_file_path:
+                self.lap_file_entry.delete(0, END)
+                self.lap_file_entry.insert(0, lap_file_path)
+
+        def load_laps():
+            """ Reads lap start and end times from the selected file. """
+
+            if num_rows == 0:
+                messagebox.showerror("No Data", "Load a log before adding laps.")
+                return
+            try:
+                starts, ends = read_lap_times(
+                    self.lap_file_entry.get(), timestamps_numeric)
+            except (OSError, ValueError, ImportError) as e:
+                messagebox.showerror("Invalid Lap Times", str(e))
+                return
+            self.show_laps(starts, ends)
+
+        def detect():
+            """ Detects laps where the selected signal stays above the threshold. """
+
+            if num_rows == 0:
+                messagebox.showerror("No Data", "Load a log before adding laps.")
+                return
+            try:
+                threshold = float(self.lap_threshold_entry.get())
+            except ValueError:
+                messagebox.showerror(
+                    "Invalid Input", "Enter a numeric threshold.")
+                return
+            signal = n_actual if self.lap_signal_var.get() == 'Actual Speed' else current_converted
+            starts, ends = detect_laps(timestamps_numeric, signal, threshold)
+            if len(starts) == 0:
+                messagebox.showinfo(
+                    "No Laps", "No laps were found above the threshold.")
+                return
+            self.show_laps(starts, ends)
+
+        self.lap_frame = ttk.LabelFrame(
+            self.settings_tab, text='Lap Times', padding=(10, 5))
+        self.lap_frame.grid(row=4, column=0, padx=10, pady=5, sticky='nw')
+        self.lap_file_label = ttk.Label(self.lap_frame, text='Lap Times File:')
+        self.lap_file_label.grid(row=0, column=0, padx=5, pady=5, sticky='e')
+        self.lap_file_entry = ttk.Entry(self.lap_frame, width=40)
+        self.lap_file_entry.grid(
+            row=0, column=1, columnspan=2, padx=5, pady=5)
+        self.lap_file_button = ttk.Button(
+            self.lap_frame, text='Browse', command=open_lap_file)
+        self.lap_file_button.grid(row=0, column=3, padx=5, pady=5)
+        self.lap_load_button = ttk.Button(
+            self.lap_frame, text='Load Laps', command=load_laps)
+        self.lap_load_button.grid(row=0, column=4, padx=5, pady=5)
+        # Automatic detection from the motor speed or current
+        self.lap_signal_label = ttk.Label(self.lap_frame, text='Detect from:')
+        self.lap_signal_label.grid(row=1, column=0, padx=5, pady=5, sticky='e')
+        self.lap_signal_var = StringVar(value='Actual Speed')
+        self.lap_signal_option = ttk.OptionMenu(
+            self.lap_frame, self.lap_signal_var, 'Actual Speed', 'Actual Speed', 'Current')
+        self.lap_signal_option.grid(row=1, column=1, padx=5, pady=5, sticky='w')
+        self.lap_threshold_label = ttk.Label(self.lap_frame, text='Above:')
+        self.lap_threshold_label.grid(
+            row=1, column=2, padx=5, pady=5, sticky='e')
+        self.lap_threshold_entry = ttk.Entry(self.lap_frame, width=8)
+        self.lap_threshold_entry.insert(0, LAP_THRESHOLD)
+        self.lap_threshold_entry.grid(row=1, column=3, padx=5, pady=5)
+        self.lap_detect_button = ttk.Button(
+            self.lap_frame, text='Detect Laps', command=detect)
+        self.lap_detect_button.grid(row=1, column=4, padx=5, pady=5)
 
         # Communication Settings Frame
         # self.comm_frame = ttk.LabelFrame(self.settings_tab, text='Communication Settings', padding=(10, 5))
@@ -656,7 +674,6 @@ class BatteryManagementSystem:
         def update_data():
             """ Updates the instance variables with the values from the input fields. """
 
-            self.root.title("Athena DAQ GUI - Loading...")
             stack_rows = int(self.stack_rows_entry.get())
             stack_cols = int(self.stack_cols_entry.get())
             cells = int(self.cells_entry.get())
@@ -672,11 +689,23 @@ class BatteryManagementSystem:
             curr_col = int(self.current_entry.get())
             i_actual_flag = self.i_actual_check.instate(['selected'])
 
-            # Read the CSV file to update data
-            read_file(self.file_path, cells,
-                      temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag)
-            self.create_dynamic_widgets(
-                stack_rows, stack_cols, cells, temps, UV, OV, UT, OT, i_actual_flag)
+            file_paths = list(self.file_paths)
+
+            def work(progress):
+                # Runs in the worker thread
+                if len(file_paths) == 1:
+                    data = load_data(file_paths[0], cells, temps, timestamp_col,
+                                     SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress)
+                else:
+                    # Parse the files of a session in parallel processes
+                    data = load_session(file_paths, cells, temps, timestamp_col,
+                                        SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress)
+                return prepare_data(data)
+
+            # Read the CSV files in the background to update data
+            self.start_load(work, lambda data: self.finish_load(
+                data, stack_rows, stack_cols, cells, temps, UV, OV, UT, OT, i_actual_flag),
+                unit='rows' if len(file_paths) == 1 else 'files')
 
         # Confirm Settings Button
         self.confirm_button = ttk.Button(
@@ -686,6 +715,119 @@ class BatteryManagementSystem:
         self.confirm_button.grid(
             row=2, column=0, columnspan=2, padx=10, pady=5, sticky='')
 
+        # Loading Progress Frame
+        self.load_frame = ttk.LabelFrame(
+            self.settings_tab, text='Loading', padding=(10, 5))
+        self.load_frame.grid(row=3, column=1, padx=10, pady=5, sticky='nw')
+        self.load_progress = ttk.Progressbar(
+            self.load_frame, length=300, mode='determinate', bootstyle=(STRIPED, SUCCESS))
+        self.load_progress.grid(row=0, column=0, padx=5, pady=5)
+        self.load_cancel_button = ttk.Button(
+            self.load_frame, text='Cancel', command=self.cancel_load, bootstyle=DANGER)
+        self.load_cancel_button.config(state='disabled')
+        self.load_cancel_button.grid(row=0, column=1, padx=5, pady=5)
+        self.load_status_label = ttk.Label(self.load_frame, text='Idle')
+        self.load_status_label.grid(
+            row=1, column=0, columnspan=2, padx=5, pady=5, sticky='w')
+
+    def start_load(self, work, on_done, action='Loading', unit='rows'):
+        """ Runs a loading job in a worker thread while the UI shows its progress.
+
+            :param work: Callable taking a progress callback (items done, total items)
+                and returning the loaded data; it must not touch any widgets.
+            :param on_done: Called on the UI thread with the result of work.
+            :param action: Name of the job, shown in the window title.
+            :param unit: Name of the items counted by the progress callback.
+        """
+        if self.load_running:
+            messagebox.showinfo(
+                "Busy", "Wait for the current job to finish or cancel it.")
+            return
+        self.load_running = True
+        self.load_action = action
+        self.load_unit = unit
+        self.load_cancel = Event()
+        self.load_queue = queue.Queue()
+        started = time.perf_counter()
+
+        def progress(rows, total):
+            if self.load_cancel.is_set():
+                raise LoadCancelled()
+            self.load_queue.put(
+                ('progress', rows, total, time.perf_counter() - started))
+
+        def worker():
+            try:
+                self.load_queue.put(('done', work(progress)))
+            except LoadCancelled:
+                self.load_queue.put(('cancelled',))
+            except Exception as e:
+                self.load_queue.put(('error', e))
+
+        self.confirm_button.config(state='disabled')
+        self.load_cancel_button.config(state='normal')
+        self.load_progress.config(value=0)
+        self.load_status_label.config(text='Starting...')
+        self.root.title(f"Athena DAQ GUI - {action}...")
+        Thread(target=worker, daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self.poll_load, on_done)
+
+    def poll_load(self, on_done):
+        """ Applies queued progress of the background load and hands over its result.
+
+            :param on_done: Called with the loaded data once the worker is done.
+        """
+        message = None
+        try:
+            while True:
+                message = self.load_queue.get_nowait()
+                if message[0] != 'progress':
+                    break
+                _, rows, total, elapsed = message
+                percent = 100.0 * rows / total if total else 100.0
+                self.load_progress.config(value=percent)
+                self.load_status_label.config(
+                    text=f'{rows:,} / {total:,} {self.load_unit} ({rows / max(elapsed, 1e-9):,.0f} {self.load_unit}/s)')
+                self.root.title(
+                    f"Athena DAQ GUI - {self.load_action}... {percent:.0f}%")
+        except queue.Empty:
+            pass
+        if message is None or message[0] == 'progress':
+            self.root.after(LOAD_POLL_MS, self.poll_load, on_done)
+            return
+
+        self.load_running = False
+        self.confirm_button.config(state='normal')
+        self.load_cancel_button.config(state='disabled')
+        self.root.title(f"Athena DAQ GUI - {file_name}" if file_name else "Athena DAQ GUI")
+        if message[0] == 'done':
+            self.load_status_label.config(text='Done')
+            on_done(message[1])
+        elif message[0] == 'cancelled':
+            self.load_progress.config(value=0)
+            self.load_status_label.config(text='Cancelled')
+        else:
+            self.load_status_label.config(text='Failed')
+            messagebox.showerror(
+                f"Error {self.load_action}", str(message[1]))
+
+    def cancel_load(self):
+        """ Asks the running background job to stop after its current block. """
+
+        self.load_cancel.set()
+        self.load_status_label.config(text='Cancelling...')
+
+    def finish_load(self, data, stack_rows, stack_cols, cells, temps, UV, OV, UT, OT, i_actual_flag):
+        """ Publishes loaded data and rebuilds the widgets, on the UI thread.
+
+            :param data: Dictionary returned by prepare_data.
+        """
+        set_data(data, i_actual_flag)
+        self.stack_count = stack_rows * stack_cols
+        self.create_dynamic_widgets(
+            stack_rows, stack_cols, cells, temps, UV, OV, UT, OT, i_actual_flag)
+        self.update_violations()
+
     def create_temps_tab(self):
         """ Creates the temperatures tab with a scrollable view for temperature data. """
 
@@ -839,8 +981,192 @@ class BatteryManagementSystem:
             self.o_canvas.yview_moveto(0)
         self.motor_controller_frame.bind('<Configure>', on_frame_configure)
 
+    def create_table(self, tab, columns):
+        """ Creates a table filling a tab, sorted by clicking on a column heading.
+
+            :param tab: Tab frame to fill.
+            :param columns: Tuple of (key, heading) pairs.
+            :returns: The Treeview widget.
+        """
+        view_frame = ttk.Frame(tab, padding=(10, 5))
+        view_frame.pack(padx=10, pady=5, fill=BOTH, expand=True)
+        table = ttk.Treeview(view_frame, columns=[
+                             key for key, _ in columns], show='headings', bootstyle=PRIMARY)
+        for key, heading in columns:
+            table.heading(key, text=heading,
+                          command=lambda k=key: self.sort_table(table, k))
+            table.column(key, width=120, anchor='center')
+        table.pack(side=LEFT, fill=BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(
+            view_frame, orient=VERTICAL, command=table.yview)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        table.configure(yscrollcommand=scrollbar.set)
+        # Rows shown in the table, its columns, and the sorted column and direction
+        self.tables[table] = {'rows': None,
+                              'columns': columns, 'sort': (None, False)}
+        return table
+
+    def show_table(self, table, rows, key):
+        """ Replaces the rows of a table, sorted by a column.
+
+            :param table: Treeview created by create_table.
+            :param rows: Dictionary of per-row arrays keyed like the table columns.
+            :param key: Key of the column to sort by.
+        """
+        self.tables[table]['rows'] = rows
+        self.tables[table]['sort'] = (None, False)
+        self.sort_table(table, key)
+
+    def sort_table(self, table, key):
+        """ Fills a table sorted by a column, reversing the order on a second click.
+
+            Only the first TABLE_MAX_ROWS rows in that order are inserted, so a
+            click costs the same however many rows there are.
+
+            :param table: Treeview created by create_table.
+            :param key: Key of the column to sort by.
+        """
+        contents = self.tables[table]
+        if contents['rows'] is None:
+            return
+        descending = contents['sort'] == (key, False)
+        contents['sort'] = (key, descending)
+        values = contents['rows'][key]
+        order = np.argsort(values, kind='stable')
+        if descending:
+            # Rows lacking data stay at the end
+            missing = np.isnan(values[order]) if values.dtype.kind == 'f' else np.zeros(len(order), dtype=bool)
+            order = np.concatenate((order[~missing][::-1], order[missing]))
+        table.delete(*table.get_children())
+        for row in order[:TABLE_MAX_ROWS]:
+            table.insert('', END, iid=str(row), values=[table_value(column, contents['rows'][column][row])
+                                                        for column, _ in contents['columns']])
+
+    def create_laps_tab(self):
+        """ Creates the laps tab with a sortable table of per-lap statistics. """
+
+        self.laps_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.laps_tab, text='Laps')
+        self.laps_table = self.create_table(self.laps_tab, LAP_COLUMNS)
+
+    def show_laps(self, starts, ends):
+        """ Computes the statistics of the given laps and shows them in the laps tab.
+
+            :param starts: Lap start times in nanoseconds since midnight.
+            :param ends: Lap end times in nanoseconds since midnight.
+        """
+        data = {'window_index': window_index, 'current_range_index': current_range_index, 'voltage_range_index': voltage_range_index,
+                'temp_range_index': temp_range_index, 'cell_temps': all_cell_temps}
+        self.show_table(self.laps_table, lap_stats(
+            data, starts, ends, self.stack_count), 'lap')
+        self.notebook.select(self.laps_tab)
+
+    def create_violations_tab(self):
+        """ Creates the violations tab listing every interval a cell spent beyond its thresholds. """
+
+        self.violations_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.violations_tab, text='Violations')
+        self.violations_label = ttk.Label(
+            self.violations_tab, text='Double-click an event to zoom to it.')
+        self.violations_label.pack(padx=10, pady=5, anchor='w')
+        self.violations_table = self.create_table(
+            self.violations_tab, VIOLATION_COLUMNS)
+        self.violations_table.bind('<Double-1>', self.zoom_violation)
+        self.thresholds = {}  # Thresholds the listed events were found with
+
+    def apply_thresholds(self, event=None):
+        """ Applies the thresholds in the settings tab to the loaded data.
+
+            Only the colours of the labels change; the statistics are not recomputed.
+        """
+        try:
+            UV, OV, UT, OT = (float(entry.get()) for entry in (
+                self.UV_entry, self.OV_entry, self.UT_entry, self.OT_entry))
+        except ValueError:
+            return
+        self.restyle_labels(UV, OV, UT, OT)
+        self.update_violations(event)
+
+    def update_violations(self, event=None):
+        """ Recomputes the threshold violations from the thresholds in the settings tab. """
+
+        if num_rows == 0:
+            return
+        try:
+            thresholds = {name: float(entry.get()) for name, entry in (
+                ('UV', self.UV_entry), ('OV', self.OV_entry), ('UT', self.UT_entry), ('OT', self.OT_entry))}
+        except ValueError:
+            return
+        if thresholds == self.thresholds and event is not None:
+            return
+        self.thresholds = thresholds
+        events = violation_events(voltage_range_index, temp_range_index, thresholds['UV'], thresholds['OV'],
+                                  thresholds['UT'], thresholds['OT'], self.stack_count)
+        self.show_table(self.violations_table, events, 'start')
+        count = len(events['type'])
+        listed = f" The first {TABLE_MAX_ROWS} in the sorted column are listed." if count > TABLE_MAX_ROWS else ''
+        self.violations_label.config(
+            text=f"{count} violations.{listed} Double-click an event to zoom to it.")
+
+    def zoom_violation(self, event):
+        """ Plots the stack of the double-clicked violation, zoomed to the event.
+
+            :param event: Tk event of the double click.
+        """
+        item = self.violations_table.identify_row(event.y)
+        events = self.tables[self.violations_table]['rows']
+        if not item or events is None:
+            return
+        row = int(item)
+        kind = events['type'][row]
+        stack = events['stack'][row]
+        start = events['start'][row] / 1e9
+        end = events['end'][row] / 1e9
+        if kind in ('UV', 'OV'):
+            y, type, y_label = all_cell_voltages[stack], 'voltages', 'Voltage (V)'
+        else:
+            y, type, y_label = all_cell_temps[stack], 'temps', 'Temperature (°C)'
+        fig, ax = plt.subplots()
+        lines = draw_plot(ax, time_axis, y, 'Time (hh:mm:ss.ms)', y_label,
+                          f'Stack {stack + 1} {kind}, channel {events["channel"][row] + 1}', type)
+        ax.axvspan(start, end, color='red', alpha=0.2)
+        ax.axhline(self.thresholds[kind], color='red', linestyle='--')
+        margin = max(end - start, VIOLATION_ZOOM_SECONDS)
+        ax.set_xlim(start - margin, end + margin)
+        mplcursors.cursor(lines, hover=True)
+        plt.show()
+
     def create_dynamic_widgets(self, stack_rows, stack_cols, cells, temps, UV, OV, UT, OT, i_actual_flag):
-        """ Creates dynamic widgets for voltages and temperatures based on user input.
+        """ Shows the loaded data, building the widget tree only when the layout changes.
+
+            Loading another file or changing thresholds with the same layout only
+            updates label text, bootstyle and line data in place.
+
+            :param stack_rows: Number of rows of stacks.
+            :param stack_cols: Number of columns of stacks.
+            :param cells: Number of cells per stack.
+            :param temps: Number of temperature sensors per stack.
+            :param i_actual_flag: Flag indicating if actual current data is present.
+        """
+        global file_name
+        layout = (stack_rows, stack_cols, cells, temps, i_actual_flag)
+        if layout != self.layout:
+            self.build_dynamic_widgets(*layout)
+            self.layout = layout
+        self.update_dynamic_widgets()
+        self.restyle_labels(UV, OV, UT, OT)
+
+        # Get the file name from the path
+        file_name = self.file_path.split('/')[-1]
+        if len(self.file_paths) > 1:
+            file_name += f' + {len(self.file_paths) - 1} more'
+        # Update window title with file name
+        self.root.title(f"Athena DAQ GUI - {file_name}")
+
+    def build_dynamic_widgets(self, stack_rows, stack_cols, cells, temps, i_actual_flag):
+        """ Builds the voltage, temperature, overview and motor controller widgets of a layout.
+
+            Widgets are created empty and filled by update_dynamic_widgets.
 
             :param stack_rows: Number of rows of stacks.
             :param stack_cols: Number of columns of stacks.
@@ -848,37 +1174,33 @@ class BatteryManagementSystem:
             :param temps: Number of temperature sensors per stack.
             :param i_actual_flag: Flag indicating if actual current data is present.
         """
-        global total_pack_voltage, SoC, VsBat, VsHV, current_converted, red, blue, green, num_rows, file_name
-        total_pack_voltage = 0.0  # Reset total pack voltage
-        avg_stack_voltages = []  # List to store average stack voltages
         print_order = [
             [16, 15, 10, 9, 4, 3],
             [17, 14, 11, 8, 5, 2],
             [18, 13, 12, 7, 6, 1]
         ]
+        self.status_labels = []  # (label, kind, stack, channel) of every threshold-coloured label
+        self.temp_delta_labels = {}  # Temperature delta label of each stack
+        self.panels = []  # Embedded plots, built and refreshed when their tab is shown
 
-        # Clear previous widgets in voltages and temperatures frames
-        for widget in self.voltages_frame.winfo_children():
-            widget.destroy()
-        for widget in self.temps_frame.winfo_children():
-            widget.destroy()
-        for widget in self.motor_controller_frame.winfo_children():
-            widget.destroy()
+        # Clear the widgets of the previous layout
+        for frame in (self.voltages_frame, self.temps_frame, self.overview_frame, self.motor_controller_frame):
+            for widget in frame.winfo_children():
+                widget.destroy()
 
         def save_graphs(stack_rows, stack_cols, x, y, x_label, y_label, type):
-            """ Saves the current graphs to files.
+            """ Saves the graph of every stack to a file, in worker processes.
 
-                :param title: The title to use for the saved files.
+                :param type: 'voltages' or 'temps'.
             """
-            self.root.title("Athena DAQ GUI - Saving Graphs...")
-            for stack_index in range(stack_rows * stack_cols):
-                if (type == 'voltages'):
-                    plot_data(x, y[stack_index], x_label, y_label,
-                              f'Stack {stack_index+1} Voltages', 'save', type)
-                else:
-                    plot_data(x, y[stack_index], x_label, y_label,
-                              f'Stack {stack_index+1} Temperatures', 'save', type)
-            self.root.title(f"Athena DAQ GUI - {file_name}")
+            indices = range(stack_rows * stack_cols)
+            if (type == 'voltages'):
+                titles = [f'Stack {stack_index+1} Voltages' for stack_index in indices]
+            else:
+                titles = [f'Stack {stack_index+1} Temperatures' for stack_index in indices]
+            output_paths = [graph_file_name(title) for title in titles]
+            self.start_load(lambda progress: export_graphs(x, y, indices, x_label, y_label, titles, type, output_paths, progress),
+                            lambda written: None, 'Saving Graphs', 'graphs')
 
         # Creating voltage widget grid
         for row in range(stack_rows):
@@ -889,32 +1211,25 @@ class BatteryManagementSystem:
                 stack_frame.grid(row=row, column=col,
                                  padx=5, pady=5, sticky='nw')
 
-                total_stack_voltage = 0.0  # Reset total stack voltage for each stack
                 for cell in range(cells):
                     # Cell voltages with plot buttons
                     cell_button = ttk.Button(stack_frame, text=f'Cell {cell + 1}', command=lambda s=stack_index, c=cell: plot_data(
-                        timestamps, all_cell_voltages[s][c], 'Time (hh:mm:ss.ms)', 'Voltage (V)', f'Stack {s + 1} Cell {c + 1} Voltage', 'show', 'voltages'))
+                        time_axis, all_cell_voltages[s, c], 'Time (hh:mm:ss.ms)', 'Voltage (V)', f'Stack {s + 1} Cell {c + 1} Voltage', 'show', 'voltages'))
                     cell_button.grid(row=cell, column=0, padx=5, pady=5)
-                    avg_cell_voltage = np.mean(
-                        all_cell_voltages[stack_index][cell])
-                    total_stack_voltage += avg_cell_voltage
-                    cell_voltage_label = ttk.Label(
-                        stack_frame, text=round(
-                            avg_cell_voltage, 4), bootstyle=check_status(avg_cell_voltage, UV, OV))
+                    cell_voltage_label = ttk.Label(stack_frame, text='')
                     cell_voltage_label.grid(row=cell, column=1, padx=5, pady=5)
+                    self.status_labels.append(
+                        (cell_voltage_label, 'voltage', stack_index, cell))
                     voltage_unit = ttk.Label(stack_frame, text='V')
                     voltage_unit.grid(row=cell, column=2, padx=5, pady=5)
 
-                avg_stack_voltages.append(total_stack_voltage)
-                total_pack_voltage += total_stack_voltage
-
                 # Plot all button
                 stack_v_plot_button = ttk.Button(stack_frame, text='Plot All', command=lambda s=stack_index: plot_data(
-                    timestamps, all_cell_voltages[s], 'Time (hh:mm:ss.ms)', 'Voltage (V)', f'Stack {s + 1} Voltages', 'show', 'voltages'))
+                    time_axis, all_cell_voltages[s], 'Time (hh:mm:ss.ms)', 'Voltage (V)', f'Stack {s + 1} Voltages', 'show', 'voltages'))
                 stack_v_plot_button.grid(
                     row=cells, column=0, columnspan=2, padx=5, pady=5)
         save_v_graphs_button = ttk.Button(
-            self.voltages_frame, text='Save Stack Voltage Graphs', command=lambda: save_graphs(stack_rows, stack_cols, timestamps, all_cell_voltages, 'Time (hh:mm:ss.ms)', 'Voltage (V)', 'voltages'))
+            self.voltages_frame, text='Save Stack Voltage Graphs', command=lambda: save_graphs(stack_rows, stack_cols, time_axis, all_cell_voltages, 'Time (hh:mm:ss.ms)', 'Voltage (V)', 'voltages'))
         save_v_graphs_button.grid(
             row=stack_rows, column=0, columnspan=stack_cols, padx=5, pady=5, sticky='ew')
 
@@ -927,37 +1242,34 @@ class BatteryManagementSystem:
                 stack_frame.grid(row=row, column=col,
                                  padx=5, pady=5, sticky='nw')
 
-                avg_cell_temps = []  # List to store average cell temperatures for the stack
                 for temp in range(temps):
                     # Cell temperatures with plot buttons
                     temp_button = ttk.Button(
                         stack_frame, text=f'Temp. {temp + 1}', command=lambda s=stack_index, t=temp: plot_data(
-                            timestamps, all_cell_temps[s][t], 'Time (hh:mm:ss.ms)', 'Temperature (°C)', f'Stack {s + 1} Temperature {t + 1}', 'show', 'temps'))
+                            time_axis, all_cell_temps[s, t], 'Time (hh:mm:ss.ms)', 'Temperature (°C)', f'Stack {s + 1} Temperature {t + 1}', 'show', 'temps'))
                     temp_button.grid(row=temp, column=0, padx=5, pady=5)
-                    avg_cell_temp = np.mean(
-                        all_cell_temps[stack_index][temp])
-                    avg_cell_temps.append(avg_cell_temp)
-                    temp_value = ttk.Label(stack_frame, text=round(
-                        avg_cell_temp, 4), bootstyle=check_status(avg_cell_temp, UT, OT))
+                    temp_value = ttk.Label(stack_frame, text='')
                     temp_value.grid(row=temp, column=1, padx=5, pady=5)
+                    self.status_labels.append(
+                        (temp_value, 'temp', stack_index, temp))
                     temp_unit = ttk.Label(stack_frame, text='°C')
                     temp_unit.grid(row=temp, column=2, padx=5, pady=5)
                 # Temp delta
                 temp_delta_label = ttk.Label(stack_frame, text='Delta:')
                 temp_delta_label.grid(
                     row=temps, column=0, padx=5, pady=5, sticky='e')
-                temp_delta_value = ttk.Label(stack_frame, text=(round(
-                    max(all_cell_temps[stack_index][0]) - all_cell_temps[stack_index][0][0], 4)))
+                temp_delta_value = ttk.Label(stack_frame, text='')
                 temp_delta_value.grid(row=temps, column=1, padx=5, pady=5)
+                self.temp_delta_labels[stack_index] = temp_delta_value
                 temp_delta_unit = ttk.Label(stack_frame, text='°C')
                 temp_delta_unit.grid(row=temps, column=2, padx=5, pady=5)
                 # Plot all button
                 stack_t_plot_button = ttk.Button(stack_frame, text='Plot All', command=lambda s=stack_index: plot_data(
-                    timestamps, all_cell_temps[s], 'Time (hh:mm:ss.ms)', 'Temperature (°C)', f'Stack {s + 1} Temperatures', 'show', 'temps'))
+                    time_axis, all_cell_temps[s], 'Time (hh:mm:ss.ms)', 'Temperature (°C)', f'Stack {s + 1} Temperatures', 'show', 'temps'))
                 stack_t_plot_button.grid(
                     row=temps+1, column=0, columnspan=3, padx=5, pady=5)
         save_t_graphs_button = ttk.Button(
-            self.temps_frame, text='Save Stack Temp. Graphs', command=lambda: save_graphs(stack_rows, stack_cols, timestamps, all_cell_temps, 'Time (hh:mm:ss.ms)', 'Temperature (°C)', 'temps'))
+            self.temps_frame, text='Save Stack Temp. Graphs', command=lambda: save_graphs(stack_rows, stack_cols, time_axis, all_cell_temps, 'Time (hh:mm:ss.ms)', 'Temperature (°C)', 'temps'))
         save_t_graphs_button.grid(
             row=stack_rows, column=0, columnspan=stack_cols, padx=5, pady=5, sticky='ew')
 
@@ -967,59 +1279,28 @@ class BatteryManagementSystem:
             self.overview_frame, padding=(2, 2))
         self.plot_frame.grid(row=0, column=0, sticky='nw')
 
-        def overview_plots(ro, col, data, title, unit, top_lim=None, bot_lim=None):
-            """ Creates a plot in the overview tab.
-
-                :param ro: Row index for the plot.
-                :param col: Column index for the plot.
-                :param data: Data to plot.
-                :param title: Title for the plot.
-            """
-            sub_plot_frame = ttk.Frame(self.plot_frame)
-            sub_plot_frame.grid(row=ro, column=col, padx=2, pady=2)
-            fig, ax = plt.subplots(figsize=(6, 4.2))
-            canvas = FigureCanvasTkAgg(fig, master=sub_plot_frame)
-            canvas.get_tk_widget().grid(row=0, column=0, padx=2, pady=2)
-            ax.plot(timestamps, data)
-            ax.set_xlabel('Time (hh:mm:ss.ms)')
-            ax.set_ylabel(f'{title} ({unit})')
-            ax.set_title(title)
-            ax.set_ylim(top=top_lim, bottom=bot_lim)
-            ax.xaxis.set_major_locator(ticker.AutoLocator())
-            ax.xaxis.set_minor_locator(ticker.AutoLocator())
-            ax.grid(True)
-            mplcursors.cursor(hover=True)
-            canvas.draw()
-            plt.close(fig)
-            expand_button = ttk.Button(
-                sub_plot_frame, text='Expand', command=lambda: plot_data(
-                    timestamps, data, 'Time (hh:mm:ss.ms)', f'{title} ({unit})', title, 'show', top_lim, bot_lim))
-            expand_button.grid(row=1, column=0, padx=2, pady=8, sticky='new')
-
+        # Series are looked up when drawn, so panels always show the loaded data
         # SoC
-        # overview_plots(0, 0, SoC, 'State of Charge', '%')
+        # self.create_panel(self.overview_tab, self.plot_frame, 0, 0, (6, 4.2), lambda: [SoC], 'State of Charge', '%')
         # VsBat
-        # overview_plots(0, 1, VsBat, 'VsBat', 'V')
+        # self.create_panel(self.overview_tab, self.plot_frame, 0, 1, (6, 4.2), lambda: [VsBat], 'VsBat', 'V')
         # VsHV
-        # overview_plots(1, 0, VsHV, 'VsHV', 'V')
+        # self.create_panel(self.overview_tab, self.plot_frame, 1, 0, (6, 4.2), lambda: [VsHV], 'VsHV', 'V')
         # Current
-        overview_plots(0, 0, current_converted, 'Current', 'A')
+        self.create_panel(self.overview_tab, self.plot_frame, 0, 0, (6, 4.2),
+                          lambda: [current_converted], 'Current', 'A')
         # Total Pack Voltage
-        voltage_np = np.asarray(all_cell_voltages, dtype=float)
-        total_pack_voltage_arr = voltage_np.sum(
-            axis=(0, 1)).tolist()  # Sum across stack and cell axes
-        overview_plots(0, 1, total_pack_voltage_arr,
-                       'Total Pack Voltage', 'V', 453.6, 270)
+        self.create_panel(self.overview_tab, self.plot_frame, 0, 1, (6, 4.2), lambda: [total_pack_voltage_arr],
+                          'Total Pack Voltage', 'V', 453.6, 270)
         # Power
-        power = (np.asarray(total_pack_voltage_arr, dtype=float) *
-                 np.asarray(current_converted, dtype=float) / 1000.0).tolist()
-        overview_plots(1, 0, power, 'Power', 'kW')
+        self.create_panel(self.overview_tab, self.plot_frame, 1, 0, (6, 4.2),
+                          lambda: [power], 'Power', 'kW')
         # Left radiator temperature
-        overview_plots(2, 0, left_radiator_temps,
-                       'Left Radiator Temp.', '°C', 125, -55)
+        self.create_panel(self.overview_tab, self.plot_frame, 2, 0, (6, 4.2), lambda: [left_radiator_temps],
+                          'Left Radiator Temp.', '°C', 125, -55)
         # Right radiator temperature
-        overview_plots(2, 1, right_radiator_temps,
-                       'Right Radiator Temp.', '°C', 125, -55)
+        self.create_panel(self.overview_tab, self.plot_frame, 2, 1, (6, 4.2), lambda: [right_radiator_temps],
+                          'Right Radiator Temp.', '°C', 125, -55)
 
         # Data & Stacks frame
         self.d_n_s_frame = ttk.Frame(self.overview_frame, padding=(10, 5))
@@ -1032,8 +1313,7 @@ class BatteryManagementSystem:
         self.TPV_label = ttk.Label(
             self.data_frame, text='Total Pack Voltage:')
         self.TPV_label.grid(row=0, column=0, padx=5, pady=5, sticky='e')
-        self.TPV_value = ttk.Label(
-            self.data_frame, text=round(total_pack_voltage, 4))
+        self.TPV_value = ttk.Label(self.data_frame, text='')
         self.TPV_value.grid(row=0, column=1, padx=5, pady=5, sticky='')
         self.TPV_unit = ttk.Label(self.data_frame, text='V')
         self.TPV_unit.grid(row=0, column=2, padx=5, pady=5, sticky='w')
@@ -1041,10 +1321,7 @@ class BatteryManagementSystem:
         self.ACV_label = ttk.Label(
             self.data_frame, text='Avg. Cell Voltage:')
         self.ACV_label.grid(row=1, column=0, padx=5, pady=5, sticky='e')
-        fullpack_avg_cell_voltage = np.mean([np.mean(voltage)
-                                             for voltage in all_cell_voltages])
-        self.ACV_value = ttk.Label(
-            self.data_frame, text=round(fullpack_avg_cell_voltage, 4))
+        self.ACV_value = ttk.Label(self.data_frame, text='')
         self.ACV_value.grid(row=1, column=1, padx=5, pady=5)
         self.ACV_unit = ttk.Label(self.data_frame, text='V')
         self.ACV_unit.grid(row=1, column=2, padx=5, pady=5)
@@ -1052,23 +1329,15 @@ class BatteryManagementSystem:
         self.ACT_label = ttk.Label(
             self.data_frame, text='Avg. Cell Temp.:')
         self.ACT_label.grid(row=2, column=0, padx=10, pady=5, sticky='e')
-        fullpack_avg_cell_temp = np.mean(
-            [np.mean(temp) for temp in all_cell_temps])
-        self.ACT_value = ttk.Label(
-            self.data_frame, text=round(fullpack_avg_cell_temp, 4))
+        self.ACT_value = ttk.Label(self.data_frame, text='')
         self.ACT_value.grid(row=2, column=1, padx=5, pady=5)
         self.ACT_unit = ttk.Label(self.data_frame, text='°C')
         self.ACT_unit.grid(row=2, column=2, padx=5, pady=5)
         # Highest cell temperature
-        max_cell_temps = []
         self.HCT_label = ttk.Label(
             self.data_frame, text='Highest Cell Temp.:')
         self.HCT_label.grid(row=3, column=0, padx=10, pady=5, sticky='e')
-        for stack_index in range(stack_rows * stack_cols):
-            for temp in range(temps):
-                max_cell_temps.append(max(all_cell_temps[stack_index][temp]))
-        self.HCT_value = ttk.Label(
-            self.data_frame, text=round(max(max_cell_temps), 4))
+        self.HCT_value = ttk.Label(self.data_frame, text='')
         self.HCT_value.grid(row=3, column=1, padx=5, pady=5)
         self.HCT_unit = ttk.Label(self.data_frame, text='°C')
         self.HCT_unit.grid(row=3, column=2, padx=5, pady=5, sticky='w')
@@ -1076,8 +1345,7 @@ class BatteryManagementSystem:
         self.avg_curr = ttk.Label(
             self.data_frame, text='Average Current:')
         self.avg_curr.grid(row=4, column=0, padx=10, pady=5, sticky='e')
-        self.avg_curr_value = ttk.Label(
-            self.data_frame, text=round(np.mean(current_converted), 4))
+        self.avg_curr_value = ttk.Label(self.data_frame, text='')
         self.avg_curr_value.grid(row=4, column=1, padx=5, pady=5)
         self.avg_curr_unit = ttk.Label(self.data_frame, text='A')
         self.avg_curr_unit.grid(row=4, column=2, padx=5, pady=5, sticky='w')
@@ -1085,125 +1353,178 @@ class BatteryManagementSystem:
         self.HC_label = ttk.Label(
             self.data_frame, text='Highest Current:')
         self.HC_label.grid(row=5, column=0, padx=10, pady=5, sticky='e')
-        self.HC_value = ttk.Label(
-            self.data_frame, text=round(max(current_converted), 4))
+        self.HC_value = ttk.Label(self.data_frame, text='')
         self.HC_value.grid(row=5, column=1, padx=5, pady=5)
-        self.HC_unit = ttk.Label(self.data_frame, text='°C')
+        self.HC_unit = ttk.Label(self.data_frame, text='A')
         self.HC_unit.grid(row=5, column=2, padx=5, pady=5, sticky='w')
         # Average stack voltages
         self.ASV_frame = ttk.LabelFrame(
             self.d_n_s_frame, text='Average Stack Voltages', padding=(10, 5))
         self.ASV_frame.grid(row=1, column=0, padx=10, pady=5, sticky='nw')
+        self.stack_values = []  # Average voltage label of each stack
         for stack_index in range(stack_rows * stack_cols):
             self.stack_label = ttk.Label(
                 self.ASV_frame, text=f'Stack {stack_index + 1}:')
             self.stack_label.grid(row=stack_index, column=0,
                                   padx=5, pady=5, sticky='e')
-            self.stack_value = ttk.Label(
-                self.ASV_frame, text=round(avg_stack_voltages[stack_index], 4))
+            self.stack_value = ttk.Label(self.ASV_frame, text='')
             self.stack_value.grid(row=stack_index, column=1, padx=5, pady=5)
+            self.stack_values.append(self.stack_value)
             self.stack_unit = ttk.Label(self.ASV_frame, text='V')
             self.stack_unit.grid(row=stack_index, column=2, padx=5, pady=5)
 
         # Filling motor controller tab
-        def plot_multi_data(x, y_series, labels, x_label, y_label, title):
-            """Plots multiple data series against the same x-axis."""
-            fig, ax = plt.subplots()
-            lines = []
-            for series, label in zip(y_series, labels):
-                line, = ax.plot(x, series, label=label)
-                lines.append(line)
-            ax.set_xlabel(x_label)
-            ax.set_ylabel(y_label)
-            ax.set_title(title)
-            ax.xaxis.set_major_locator(ticker.AutoLocator())
-            ax.xaxis.set_minor_locator(ticker.AutoLocator())
-            ax.grid(True)
-            ax.legend()
-            mplcursors.cursor(lines, hover=True)
-            plt.show()
-            plt.close(fig)
+        self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 0, 0, (8, 6),
+                          lambda: [n_actual], 'Actual Speed', 'RPM')
+        self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 0, 1, (8, 6),
+                          lambda: [t_motor], 'Motor Temperature', '°C')
+        self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 1, 0, (8, 6),
+                          lambda: [t_igbt], 'IGBT Temperature', '°C')
+        if (i_actual_flag):
+            self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 1, 1, (8, 6),
+                              lambda: [i_actual], 'Actual Current', 'A (rms)')
+            self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 2, 0, (8, 6),
+                              lambda: [torque], 'Torque', 'nm')
+            self.create_panel(self.motor_controller_tab, self.motor_controller_frame, 2, 1, (8, 6), lambda: [n_actual, torque], 'Motor RPM and Torque',
+                              'RPM / A (rms)', data_labels=['Motor RPM', 'Torque'])
+
+    def create_panel(self, tab, parent, ro, col, figsize, series, title, unit, top_lim=None, bot_lim=None, data_labels=None):
+        """ Registers an embedded plot, which is built by build_panel the first time its tab is shown.
+
+            :param tab: Notebook tab the plot is shown in.
+            :param parent: Frame to place the plot in.
+            :param ro: Row index for the plot.
+            :param col: Column index for the plot.
+            :param figsize: Figure size in inches.
+            :param series: Callable returning the list of series to plot.
+            :param title: Title for the plot.
+            :param unit: Unit of the plotted series.
+            :param data_labels: Legend labels, for plots of more than one series.
+        """
+        self.panels.append({'tab': str(tab), 'parent': parent, 'ro': ro, 'col': col, 'figsize': figsize, 'series': series,
+                            'title': title, 'unit': unit, 'top_lim': top_lim, 'bot_lim': bot_lim,
+                            'data_labels': data_labels, 'ax': None, 'markers': [], 'version': None})
 
-        def motor_controller_plots(ro, col, data, title, unit, top_lim=None, bot_lim=None, data_labels=None):
-            """ Creates a plot in the motor controller tab.
+    def build_panel(self, panel):
+        """ Creates the figure and Expand button of a registered plot; its lines are filled by refresh_panel.
 
-                :param ro: Row index for the plot.
-                :param col: Column index for the plot.
-                :param data: Data to plot.
-                :param title: Title for the plot.
-            """
-            sub_plot_frame = ttk.Frame(self.motor_controller_frame)
-            sub_plot_frame.grid(row=ro, column=col, padx=2, pady=2)
-            fig, ax = plt.subplots(figsize=(8, 6))
-            canvas = FigureCanvasTkAgg(fig, master=sub_plot_frame)
-            canvas.get_tk_widget().grid(row=0, column=0, padx=2, pady=2)
-            lines = []
-            is_multi_series = (
-                isinstance(data, list)
-                and len(data) > 0
-                and isinstance(data[0], (list, tuple, np.ndarray))
-            )
-            if is_multi_series:
-                labels = data_labels if data_labels else [
-                    f'Series {idx + 1}' for idx in range(len(data))]
-                for series, label in zip(data, labels):
-                    line, = ax.plot(timestamps, series, label=label)
-                    lines.append(line)
-                ax.legend()
-            else:
-                line, = ax.plot(timestamps, data)
-                lines.append(line)
-            ax.set_xlabel('Time (hh:mm:ss.ms)')
-            ax.set_ylabel(f'{title} ({unit})')
-            ax.set_title(title)
-            ax.set_ylim(top=top_lim, bottom=bot_lim)
-            ax.xaxis.set_major_locator(ticker.AutoLocator())
-            ax.xaxis.set_minor_locator(ticker.AutoLocator())
-            ax.grid(True)
-            mplcursors.cursor(lines, hover=True)
-            canvas.draw()
-            plt.close(fig)
-            if is_multi_series:
-                labels = data_labels if data_labels else [
-                    f'Series {idx + 1}' for idx in range(len(data))]
-
-                def expand_command(): return plot_multi_data(
-                    timestamps,
-                    data,
-                    labels,
-                    'Time (hh:mm:ss.ms)',
-                    f'{title} ({unit})',
-                    title,
-                )
+            :param panel: Panel registered by create_panel.
+        """
+        series = panel['series']
+        title = panel['title']
+        unit = panel['unit']
+        top_lim = panel['top_lim']
+        bot_lim = panel['bot_lim']
+        data_labels = panel['data_labels']
+        sub_plot_frame = ttk.Frame(panel['parent'])
+        sub_plot_frame.grid(row=panel['ro'], column=panel['col'], padx=2, pady=2)
+        fig, ax = plt.subplots(figsize=panel['figsize'])
+        canvas = FigureCanvasTkAgg(fig, master=sub_plot_frame)
+        canvas.get_tk_widget().grid(row=0, column=0, padx=2, pady=2)
+        lines = [plot_decimated(ax, np.array([]), np.array([]), label=label)
+                 for label in (data_labels or [None])]
+        if data_labels:
+            ax.legend()
+        ax.set_xlabel('Time (hh:mm:ss.ms)')
+        ax.set_ylabel(f'{title} ({unit})')
+        ax.set_title(title)
+        ax.xaxis.set_major_locator(ticker.AutoLocator())
+        ax.xaxis.set_major_formatter(clock_formatter())
+        ax.xaxis.set_minor_locator(ticker.AutoLocator())
+        ax.grid(True)
+        mplcursors.cursor(lines, hover=True)
+        plt.close(fig)
+
+        def expand():
+            if data_labels:
+                plot_multi_data(time_axis, series(), data_labels,
+                                'Time (hh:mm:ss.ms)', f'{title} ({unit})', title)
             else:
-                def expand_command(): return plot_data(
-                    timestamps,
-                    data,
-                    'Time (hh:mm:ss.ms)',
-                    f'{title} ({unit})',
-                    title,
-                    'show',
-                    '',
-                    top_lim,
-                    bot_lim,
-                )
-            expand_button = ttk.Button(
-                sub_plot_frame, text='Expand', command=expand_command)
-            expand_button.grid(row=1, column=0, padx=2, pady=8, sticky='new')
-
-        motor_controller_plots(0, 0, n_actual, 'Actual Speed', 'RPM')
-        motor_controller_plots(0, 1, t_motor, 'Motor Temperature', '°C')
-        motor_controller_plots(1, 0, t_igbt, 'IGBT Temperature', '°C')
-        if (i_actual_flag):
-            motor_controller_plots(1, 1, i_actual, 'Actual Current', 'A (rms)')
-            motor_controller_plots(2, 0, torque, 'Torque', 'nm')
-            motor_controller_plots(2, 1, [n_actual, torque], 'Motor RPM and Torque',
-                                   'RPM / A (rms)', data_labels=['Motor RPM', 'Torque'],)
+                plot_data(time_axis, series()[0], 'Time (hh:mm:ss.ms)',
+                          f'{title} ({unit})', title, 'show', '', top_lim, bot_lim)
+        expand_button = ttk.Button(
+            sub_plot_frame, text='Expand', command=expand)
+        expand_button.grid(row=1, column=0, padx=2, pady=8, sticky='new')
+        panel.update({'ax': ax, 'canvas': canvas, 'lines': lines})
 
-        # Get the file name from the path
-        file_name = self.file_path.split('/')[-1]
-        # Update window title with file name
-        self.root.title(f"Athena DAQ GUI - {file_name}")
+    def refresh_panel(self, panel):
+        """ Puts the loaded data into the lines of an embedded plot and redraws it.
+
+            :param panel: Panel built by build_panel.
+        """
+        ax = panel['ax']
+        for line, data in zip(panel['lines'], panel['series']()):
+            set_decimated_data(line, time_axis, data)
+        for marker in panel['markers']:
+            marker.remove()
+        panel['markers'] = mark_file_starts(ax)
+        ax.set_autoscale_on(True)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_ylim(top=panel['top_lim'], bottom=panel['bot_lim'])
+        panel['canvas'].draw_idle()
+        panel['version'] = data_version
+
+    def render_tab(self, tab):
+        """ Builds the plots of a tab on its first visit and refreshes those showing old data.
+
+            :param tab: Notebook tab, or its widget name as returned by Notebook.select.
+        """
+        for panel in self.panels:
+            if panel['tab'] != str(tab):
+                continue
+            if panel['ax'] is None:
+                self.build_panel(panel)
+            if panel['version'] != data_version:
+                self.refresh_panel(panel)
+
+    def on_tab_changed(self, event):
+        """ Draws the plots of the newly selected tab. """
+
+        self.render_tab(self.notebook.select())
+
+    def update_dynamic_widgets(self):
+        """ Puts the loaded data into the existing labels and plots. """
+
+        global total_pack_voltage
+        stacks = self.stack_count
+        # Every figure shown comes from the per-channel statistics computed at load
+        avg_stack_voltages = voltage_stats['mean'].sum(axis=1)
+        total_pack_voltage = float(avg_stack_voltages[:stacks].sum())
+        for label, kind, stack_index, channel in self.status_labels:
+            stats = voltage_stats if kind == 'voltage' else temp_stats
+            label.config(text=round(float(stats['mean'][stack_index, channel]), 4))
+        for stack_index, label in self.temp_delta_labels.items():
+            label.config(text=round(float(
+                temp_stats['max'][stack_index, 0] - temp_stats['first'][stack_index, 0]), 4))
+        self.TPV_value.config(text=round(total_pack_voltage, 4))
+        self.ACV_value.config(text=round(pack_mean(voltage_stats), 4))
+        self.ACT_value.config(text=round(pack_mean(temp_stats), 4))
+        self.HCT_value.config(text=round(
+            float(np.nanmax(temp_stats['max'][:stacks])), 4))
+        self.avg_curr_value.config(
+            text=round(float(current_stats['mean'][0]), 4))
+        self.HC_value.config(text=round(float(current_stats['max'][0]), 4))
+        for stack_index, label in enumerate(self.stack_values):
+            label.config(text=round(float(avg_stack_voltages[stack_index]), 4))
+        # Plots on other tabs are drawn when their tab is shown
+        self.render_tab(self.notebook.select())
+
+    def restyle_labels(self, UV, OV, UT, OT):
+        """ Colours the cell voltage and temperature labels against the thresholds.
+
+            :param UV: Undervoltage threshold.
+            :param OV: Overvoltage threshold.
+            :param UT: Under-temperature threshold.
+            :param OT: Over-temperature threshold.
+        """
+        for label, kind, stack_index, channel in self.status_labels:
+            if kind == 'voltage':
+                label.config(bootstyle=check_status(
+                    voltage_stats['mean'][stack_index, channel], UV, OV))
+            else:
+                label.config(bootstyle=check_status(
+                    temp_stats['mean'][stack_index, channel], UT, OT))
 
 
 def main():
@@ -1215,4 +1536,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Graph export workers in the packaged exe
     main()
@@ -1,110 +1,281 @@
+import time
+import queue
+from threading import Thread
 from tkinter import *
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import serial
-from threading import Thread
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from bms_core import PLOT_STYLE, format_clock
+from bms_live import *
 
-port_var = "COM8"
-root = Tk()
-serial_vals = [StringVar(value='0.0') for _ in range(180)]
-serial_running = False
-serial_port = None
 DEFAULT_ROWS = 3
 DEFAULT_COLS = 6
 DEFAULT_CELLS = 6
 DEFAULT_TEMPS = 4
+UI_RATE_HZ = 20  # Default rate of the display tick
+UI_RATE_MIN = 10  # Slowest selectable display rate
+UI_RATE_MAX = 30  # Fastest selectable display rate
+SERIAL_VALUES = 180  # Frame values shown in the Voltages and Temperatures tabs
 
+# Widgets and Tk variables, created by main()
+root = None
+port_var = None  # Selected serial port
+serial_vals = []
+ui_rate = None
+record_var = None  # Whether live frames are recorded to RECORD_DIRECTORY
+frame_counts = None
+speed_var = None  # Replay speed, as a multiple of real time
+position_var = None  # Replay position, in seconds from the start of the log
+position_text = None
+pause_button = None
+seek_scale = None
+notebook = None
+port_option = None
+live_tab = None
+live_plots = None  # Live plots made by create_live_plots
+live_canvas = None
+
+acquisition = None  # Running acquisition or replay process and its shared live history
+serial_running = False
+replaying = False  # Whether the running process is a replay
+seeking = False  # Whether the replay position slider is being dragged
+port_queue = queue.Queue()  # Changed port listings handed from the port watcher thread to the Tk thread
+last_count = 0  # Sequence number of the newest frame displayed
+frames_displayed = 0  # Frames applied to the widgets by the display tick
+frames_missed = 0  # Frames overwritten in the live history before the display tick saw them
+shown_vals = [None] * SERIAL_VALUES  # Values currently shown, to skip unchanged ones
 
-def serial_ports():
-    """ Lists serial port names
 
-        :returns: A list of the serial ports available on the system
+def watch_ports():
+    """ Lists the serial ports every PORT_POLL_SECONDS in a daemon thread and queues the listing
+        when it changes, so adapters can be hot-plugged without the OS listing blocking Tk.
     """
+    devices = None
+    while True:
+        ports = scan_serial_ports()
+        if [port['device'] for port in ports] != devices:
+            devices = [port['device'] for port in ports]
+            port_queue.put(ports)
+        time.sleep(PORT_POLL_SECONDS)
 
-    ports = ['COM%s' % (i + 1) for i in range(256)]
 
-    comms = []
-    for port in ports:
-        try:
-            s = serial.Serial(port)
-            s.close()
-            comms.append(port)
-        except (OSError, serial.SerialException):
-            pass
-    return comms
+def update_ports(ports):
+    """ Fills the port selector, selecting the BMS dongle if no present port is selected.
+
+        :param ports: List returned by list_serial_ports.
+    """
+    devices = [port['device'] for port in ports]
+    port_option.config(values=devices)
+    if port_var.get() not in devices and not serial_running:
+        port_var.set(find_dongle(ports) or (devices[0] if devices else ''))
 
 
 def start_serial_read():
-    global serial_port, serial_running
-    port = port_var
-    try:
-        serial_port = serial.Serial(port, 115200, timeout=1)
-        serial_running = True
-        serial_thread = Thread(target=worker, daemon=True)
-        serial_thread.start()
-    except serial.SerialException:
-        print(f"Could not open serial port {port}")
+    """ Starts reading the selected port in an acquisition process. """
+    global acquisition, serial_running, last_count
+    if serial_running:
+        return
+    acquisition = start_acquisition(port_var.get(), cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS,
+                                    record_directory=RECORD_DIRECTORY if record_var.get() else None)
+    serial_running = True
+    last_count = 0
 
 
 def stop_serial_read():
-    global serial_running
+    """ Stops the acquisition or replay process and frees its live history. """
+    global acquisition, serial_running, replaying
     serial_running = False
-    if serial_port:
-        serial_port.close()
+    replaying = False
+    if acquisition:
+        stop_acquisition(acquisition)
+        acquisition = None
+
+
+def start_replay_file():
+    """ Asks for a log or recording and replays it through the live views. """
+    global acquisition, serial_running, replaying, last_count
+    file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+    if not file_path:
+        return
+    stop_serial_read()
+    acquisition = start_replay(file_path, cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS, speed=float(speed_var.get()))
+    serial_running = True
+    replaying = True
+    last_count = 0
+    pause_button.config(text='Pause')
+
+
+def toggle_pause():
+    """ Pauses or resumes the replay. """
+    if replaying:
+        paused = not acquisition['history']['counters'][PAUSED]
+        pause_replay(acquisition, paused)
+        pause_button.config(text='Resume' if paused else 'Pause')
+
+
+def change_speed(event=None):
+    """ Applies the selected replay speed. """
+    if replaying:
+        set_replay_speed(acquisition, float(speed_var.get()))
+
+
+def start_seek(event=None):
+    """ Stops the replay position slider following the replay while it is dragged. """
+    global seeking
+    seeking = True
+
 
+def seek_to(event=None):
+    """ Jumps the replay to the position of the slider. """
+    global seeking
+    seeking = False
+    if replaying:
+        seek_replay(acquisition, acquisition['history']['counters'][START] + position_var.get() * 1e9)
 
-def worker():
-    global serial_running
-    while serial_running:
-        try:
-            line = serial_port.readline().decode('utf-8').rstrip()
-            if line:
-                values = line.split(', ')
-                for i, val in enumerate(values):
-                    if i < len(serial_vals):
-                        root.after(0, serial_vals[i].set, val)
-        except Exception as e:
-            print(f"Error reading from serial port: {e}")
+
+def ui_tick():
+    """ Applies the newest frame to the widgets in one batch, setting only the values that changed.
+
+        Reschedules itself at the selected display rate, so frames arriving faster
+        than that are coalesced rather than queued on the Tk event loop. Port
+        listings queued by watch_ports are applied here too.
+    """
+    global last_count, frames_displayed, frames_missed
+    ports = None
+    while not port_queue.empty():
+        ports = port_queue.get_nowait()  # Only the newest listing matters
+    if ports is not None:
+        update_ports(ports)
+    if acquisition:
+        history = acquisition['history']
+        count, values = latest_frame(history)
+        if count != last_count:
+            for i, val in enumerate(values[:SERIAL_VALUES].tolist()):
+                if val != shown_vals[i]:
+                    serial_vals[i].set(f'{val:g}')
+                    shown_vals[i] = val
+            # Sequence numbers are shared with the acquisition process, so a jump
+            # longer than the history means frames were lost to the plots
+            frames_missed += max(count - last_count - history['times'].shape[0], 0)
+            frames_displayed += 1
+            last_count = count
+            if notebook.select() == str(live_tab):
+                draw_live_plots(live_plots, history, count)
+        counters = history['counters']
+        frame_counts.set(f'Received: {counters[COUNT]}  Displayed: {frames_displayed}  Missed: {frames_missed}  '
+                         f'Malformed: {counters[MALFORMED]}  Dropped: {counters[DROPPED]}  Recorded: {counters[RECORDED]}')
+        if replaying:
+            seek_scale.config(to=max((counters[END] - counters[START]) / 1e9, 1.0))
+            if not seeking:
+                position_var.set((counters[POSITION] - counters[START]) / 1e9)
+            position_text.set(format_clock(counters[POSITION]))
+        if not acquisition['process'].is_alive():
+            stop_serial_read()  # The port could not be opened or was unplugged
+    try:
+        rate = min(max(ui_rate.get(), UI_RATE_MIN), UI_RATE_MAX)
+    except TclError:  # Rate box being edited
+        rate = UI_RATE_HZ
+    root.after(1000 // rate, ui_tick)
 
 
 def show_ports():
-    ports = serial_ports()
+    ports = list_serial_ports()
     if ports:
-        messagebox.showinfo("Available Serial Ports", "\n".join(ports))
+        messagebox.showinfo("Available Serial Ports", "\n".join(
+            format_port(port) for port in ports))
     else:
         messagebox.showinfo("Available Serial Ports", "No serial ports found.")
 
-notebook = ttk.Notebook(root)
-notebook.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
-
-voltages_tab = ttk.Frame(notebook)
-notebook.add(voltages_tab, text='Voltages')
-for row in range(DEFAULT_ROWS):
-    for col in range(DEFAULT_COLS):
-        stack_index = row * DEFAULT_COLS + col
-        stack_frame = LabelFrame(voltages_tab, text=f'Stack {stack_index+1}')
-        stack_frame.grid(row=row, column=col, padx=15, pady=5)
-        for i in range(DEFAULT_CELLS):
-            Label(stack_frame, text=f'Cell {i+1}').grid(row=i, column=0, padx=5, pady=2)
-            Label(stack_frame, textvariable=serial_vals[i]).grid(row=i, column=1, padx=5, pady=2)
-
-temps_tab = ttk.Frame(notebook)
-notebook.add(temps_tab, text='Temperatures')
-for row in range(DEFAULT_ROWS):
-    for col in range(DEFAULT_COLS):
-        stack_index = row * DEFAULT_COLS + col
-        stack_frame = LabelFrame(temps_tab, text=f'Stack {stack_index+1}')
-        stack_frame.grid(row=row, column=col, padx=5, pady=5)
-        for i in range(DEFAULT_TEMPS):
-            Label(stack_frame, text=f'Temp {i+1}').grid(row=i, column=0, padx=5, pady=2)
-            Label(stack_frame, textvariable=serial_vals[i]).grid(row=i, column=1, padx=5, pady=2)
-
-Button(root, text='Start', command=start_serial_read).grid(
-    row=DEFAULT_ROWS, column=0, pady=10)
-Button(root, text='Stop', command=stop_serial_read).grid(
-    row=DEFAULT_ROWS, column=1, pady=10)
-Button(root, text='List Ports', command=show_ports).grid(
-    row=DEFAULT_ROWS+1, column=0, columnspan=2, pady=10)
-
-root.mainloop()
+
+def main():
+    """ Builds the live GUI and runs it. """
+    global root, port_var, serial_vals, ui_rate, record_var, frame_counts, speed_var, position_var, position_text, pause_button, seek_scale, notebook, port_option, live_tab, live_plots, live_canvas
+
+    root = Tk()
+    port_var = StringVar(value='')
+    serial_vals = [StringVar(value='0.0') for _ in range(SERIAL_VALUES)]
+    ui_rate = IntVar(value=UI_RATE_HZ)
+    record_var = BooleanVar(value=True)
+    speed_var = StringVar(value=str(REPLAY_SPEEDS[0]))
+    position_var = DoubleVar(value=0.0)
+    position_text = StringVar(value='')
+    frame_counts = StringVar(value='Received: 0  Displayed: 0  Missed: 0  Malformed: 0  Dropped: 0  Recorded: 0')
+
+    notebook = ttk.Notebook(root)
+    notebook.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
+
+    voltages_tab = ttk.Frame(notebook)
+    notebook.add(voltages_tab, text='Voltages')
+    for row in range(DEFAULT_ROWS):
+        for col in range(DEFAULT_COLS):
+            stack_index = row * DEFAULT_COLS + col
+            stack_frame = LabelFrame(voltages_tab, text=f'Stack {stack_index+1}')
+            stack_frame.grid(row=row, column=col, padx=15, pady=5)
+            for i in range(DEFAULT_CELLS):
+                Label(stack_frame, text=f'Cell {i+1}').grid(row=i, column=0, padx=5, pady=2)
+                Label(stack_frame, textvariable=serial_vals[i]).grid(row=i, column=1, padx=5, pady=2)
+
+    temps_tab = ttk.Frame(notebook)
+    notebook.add(temps_tab, text='Temperatures')
+    for row in range(DEFAULT_ROWS):
+        for col in range(DEFAULT_COLS):
+            stack_index = row * DEFAULT_COLS + col
+            stack_frame = LabelFrame(temps_tab, text=f'Stack {stack_index+1}')
+            stack_frame.grid(row=row, column=col, padx=5, pady=5)
+            for i in range(DEFAULT_TEMPS):
+                Label(stack_frame, text=f'Temp {i+1}').grid(row=i, column=0, padx=5, pady=2)
+                Label(stack_frame, textvariable=serial_vals[i]).grid(row=i, column=1, padx=5, pady=2)
+
+    live_tab = ttk.Frame(notebook)
+    notebook.add(live_tab, text='Live Plots')
+    plt.style.use(PLOT_STYLE)
+    live_plots = create_live_plots()
+    live_canvas = FigureCanvasTkAgg(live_plots['fig'], master=live_tab)
+    live_canvas.get_tk_widget().pack(fill=BOTH, expand=True)
+    live_canvas.mpl_connect('draw_event', lambda event: capture_live_background(live_plots))
+
+    Button(root, text='Start', command=start_serial_read).grid(
+        row=DEFAULT_ROWS, column=0, pady=10)
+    Button(root, text='Stop', command=stop_serial_read).grid(
+        row=DEFAULT_ROWS, column=1, pady=10)
+    Button(root, text='List Ports', command=show_ports).grid(
+        row=DEFAULT_ROWS+1, column=0, pady=10)
+    port_option = ttk.Combobox(root, textvariable=port_var, width=15)
+    port_option.grid(row=DEFAULT_ROWS+1, column=1, pady=10)
+    Label(root, text='Display rate (Hz)').grid(row=DEFAULT_ROWS+2, column=0, pady=5)
+    ttk.Spinbox(root, from_=UI_RATE_MIN, to=UI_RATE_MAX, textvariable=ui_rate,
+                width=5).grid(row=DEFAULT_ROWS+2, column=1, pady=5)
+    Checkbutton(root, text=f'Record to {RECORD_DIRECTORY}', variable=record_var).grid(
+        row=DEFAULT_ROWS+3, column=0, columnspan=2, pady=5)
+    Label(root, textvariable=frame_counts).grid(
+        row=DEFAULT_ROWS+4, column=0, columnspan=2, pady=5)
+
+    # Replay of a log or recording
+    replay_frame = LabelFrame(root, text='Replay')
+    replay_frame.grid(row=DEFAULT_ROWS+5, column=0, columnspan=2, padx=10, pady=5, sticky='ew')
+    Button(replay_frame, text='Replay Log', command=start_replay_file).grid(
+        row=0, column=0, padx=5, pady=5)
+    pause_button = Button(replay_frame, text='Pause', command=toggle_pause)
+    pause_button.grid(row=0, column=1, padx=5, pady=5)
+    Label(replay_frame, text='Speed (x)').grid(row=0, column=2, padx=5, pady=5)
+    speed_option = ttk.Combobox(replay_frame, textvariable=speed_var, values=REPLAY_SPEEDS,
+                                width=5, state='readonly')
+    speed_option.grid(row=0, column=3, padx=5, pady=5)
+    speed_option.bind('<<ComboboxSelected>>', change_speed)
+    seek_scale = ttk.Scale(replay_frame, from_=0, to=1, variable=position_var, length=400)
+    seek_scale.grid(row=1, column=0, columnspan=3, padx=5, pady=5, sticky='ew')
+    seek_scale.bind('<ButtonPress-1>', start_seek)
+    seek_scale.bind('<ButtonRelease-1>', seek_to)
+    Label(replay_frame, textvariable=position_text).grid(row=1, column=3, padx=5, pady=5)
+
+    Thread(target=watch_ports, daemon=True).start()
+    ui_tick()
+
+    root.mainloop()
+    stop_serial_read()
+
+
+if __name__ == "__main__":
+    main()
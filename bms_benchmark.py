@@ -0,0 +1,104 @@
+# Live throughput benchmark: drives the headless core of BMS-GUI_V7 (acquisition
+# process, shared live history and display tick with the same blitted live plots,
+# on an off-screen canvas) from bms_simulate's pseudo-terminal, and reports sustained
+# frames/s, lost frames and serial-to-screen latency percentiles.
+#
+# Usage: python bms_benchmark.py [--rate 200] [--seconds 10] [--corrupt 0.01] [--ui-rate 20]
+
+# LIBRARIES
+import os
+import time
+import argparse
+from threading import Thread, Event
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from bms_live import (COUNT, MALFORMED, DROPPED, start_acquisition, stop_acquisition, latest_frame, create_live_plots,
+                      draw_live_plots)
+from bms_simulate import SIMULATE_RATE, FRAME_ID_FIELD, open_pty, synthetic_frames, simulate
+
+# CONSTANTS
+BENCHMARK_SECONDS = 10.0  # Default length of a run
+BENCHMARK_UI_RATE = 20  # Default display ticks per second, as in BMS-GUI_V7
+WARMUP_SECONDS = 1.0  # Time given to the acquisition process to start before measuring
+DRAIN_SECONDS = 1.0  # Time given to the acquisition process to catch up after the simulator stops
+LATENCY_PERCENTILES = (50, 90, 99, 100)  # Serial-to-screen latency percentiles reported
+
+
+# FUNCTIONS
+
+def run_benchmark(rate, seconds=BENCHMARK_SECONDS, corrupt=0.0, ui_rate=BENCHMARK_UI_RATE, checksum=False):
+    """ Streams simulated frames through the live pipeline and measures it.
+
+        :param rate: Frames per second sent by the simulator.
+        :param seconds: Length of the measured run.
+        :param corrupt: Fraction of frames corrupted by the simulator.
+        :param ui_rate: Display ticks per second.
+        :param checksum: Whether frames carry a checksum.
+        :returns: Dictionary of the results.
+    """
+    master, slave, device = open_pty()
+    acquisition = start_acquisition(device)
+    counters = acquisition['history']['counters']
+    time.sleep(WARMUP_SECONDS)
+    plots = create_live_plots()
+    sent = []
+    stop = Event()
+    simulator = Thread(target=simulate, args=(master, synthetic_frames(), rate, corrupt, checksum, sent, stop),
+                       daemon=True)
+    latencies = []
+    last_count = 0
+    displayed = 0
+    start = time.monotonic()
+    simulator.start()
+    # Display ticks, as ui_tick of BMS-GUI_V7
+    while time.monotonic() - start < seconds + DRAIN_SECONDS:
+        if time.monotonic() - start >= seconds:
+            stop.set()
+        count, frame = latest_frame(acquisition['history'])
+        if count != last_count:
+            draw_live_plots(plots, acquisition['history'], count)
+            shown = time.monotonic()
+            latencies.append(shown - sent[int(frame[FRAME_ID_FIELD])][0])
+            displayed += 1
+            last_count = count
+        time.sleep(1 / ui_rate)
+    simulator.join()
+    received = int(counters[COUNT])
+    corrupted = sum(corrupted for _, corrupted in sent)
+    results = {'sent': len(sent), 'corrupted': corrupted, 'received': received,
+               'malformed': int(counters[MALFORMED]), 'dropped': int(counters[DROPPED]),
+               'lost': len(sent) - corrupted - received, 'frames_per_second': received / seconds,
+               'displayed': displayed}
+    for percentile in LATENCY_PERCENTILES:
+        results[f'latency_p{percentile}_ms'] = float(np.percentile(latencies, percentile)) * 1000 if latencies else float('nan')
+    stop_acquisition(acquisition)
+    os.close(master)
+    os.close(slave)
+    plt.close(plots['fig'])
+    return results
+
+
+def main():
+    """ Parses the command line and prints the benchmark results. """
+    parser = argparse.ArgumentParser(description='Benchmark the live serial pipeline with a simulated BMS.')
+    parser.add_argument('--rate', type=float, default=SIMULATE_RATE,
+                        help='frames per second sent by the simulator')
+    parser.add_argument('--seconds', type=float, default=BENCHMARK_SECONDS,
+                        help='length of the measured run')
+    parser.add_argument('--corrupt', type=float, default=0.0,
+                        help='fraction of frames to corrupt')
+    parser.add_argument('--ui-rate', type=int, default=BENCHMARK_UI_RATE,
+                        help='display ticks per second')
+    parser.add_argument('--checksum', action='store_true',
+                        help='append a *HH checksum to every frame')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rate, args.seconds, args.corrupt, args.ui_rate, args.checksum)
+    for name, value in results.items():
+        print(f'{name}: {value:.2f}' if isinstance(value, float) else f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1706 @@
+# Headless data pipeline shared by BMS-GUI_V6_12hrF and the report CLI:
+# CSV ingestion and caching, unit conversion, and plotting without Tk.
+
+# LIBRARIES
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import pandas as pd
+
+# Names shared through `from bms_core import *`; module state stays private
+__all__ = ['DEFAULT_STACK_ROWS', 'DEFAULT_STACK_COLS', 'DEFAULT_CELLS', 'DEFAULT_TEMPS', 'DEFAULT_UV', 'DEFAULT_OV',
+           'DEFAULT_UT', 'DEFAULT_OT', 'TIMESTAMP_COL', 'LAST_CELL_DATA_COL', 'SOC_COL', 'VSBAT_COL', 'VSHV_COL',
+           'CURR_COL', 'I_ACTUAL_COL', 'N_ACTUAL_COL', 'T_MOTOR_COL', 'T_IGBT_COL', 'LEFT_RADIATOR_COL',
+           'RIGHT_RADIATOR_COL', 'I_ACTUAL_FLAG', 'CACHE_SUFFIX', 'CACHE_VERSION', 'CACHE_HASH_BLOCK',
+           'CACHE_HASH_BLOCKS', 'CACHE_STAGING_PREFIX', 'CACHE_RETIRED_PREFIX', 'CELL_DTYPE', 'CHUNK_ROWS',
+           'CLOCK_12H', 'NS_PER_DAY', 'CLOCK_PATTERN', 'PLOT_STYLE', 'EXPORT_WORKERS', 'SESSION_WORKERS',
+           'DECIMATE_MIN_POINTS', 'RANGE_BLOCK', 'PERCENTILE_BINS', 'STAT_NAMES', 'LAP_THRESHOLD', 'LAP_MIN_SECONDS',
+           'LAP_MIN_GAP_SECONDS', 'VIOLATION_MIN_GAP_SECONDS', 'LAP_COLUMNS', 'VIOLATION_COLUMNS',
+           'decode_timestamps', 'unwrap_midnight', 'decode_fixed_width', 'decode_variable_width', 'parse_clock',
+           'format_clock', 'clock_formatter', 'file_fingerprint', 'cache_dir', 'load_cache', 'prepare_cache_dir',
+           'publish_cache_dir', 'save_cache', 'count_rows', 'grow', 'iter_csv_blocks', 'iter_cached_blocks',
+           'convert_blocks', 'cell_columns', 'convert_columns', 'LoadCancelled', 'load_data', 'load_raw_columns',
+           'load_session_file', 'load_session', 'prepare_data', 'channel_stats', 'pack_mean', 'build_window_index',
+           'window_bounds', 'window_mean', 'window_integral', 'build_range_index', 'range_extreme', 'range_extremes',
+           'range_max', 'range_min', 'range_worst', 'window_amp_hours', 'window_kwh', 'overview_summary',
+           'find_runs', 'read_lap_times', 'detect_laps', 'lap_stats', 'threshold_runs', 'find_violations',
+           'violation_events', 'envelope_indices', 'plot_decimated', 'set_decimated_data', 'draw_plot',
+           'share_array', 'attach_array', 'init_export_worker', 'export_graph', 'export_graphs', 'calc_temp',
+           'calc_curr', 'calc_radiator_temp', 'calc_motor_temp', 'calc_igbt_temp']
+
+# CONSTANTS
+DEFAULT_STACK_ROWS = 3  # Default number of stacks in a row
+DEFAULT_STACK_COLS = 6  # Default number of stacks in a column
+DEFAULT_CELLS = 6   # Default number of cells per stack
+DEFAULT_TEMPS = 4  # Default number of temperature sensors per stack
+DEFAULT_UV = 2.700  # Default undervoltage threshold, in volts
+DEFAULT_OV = 4.200  # Default overvoltage threshold, in volts
+DEFAULT_UT = 10.0   # Default under-temperature threshold, in degrees Celsius
+DEFAULT_OT = 45.0   # Default over-temperature threshold, in degrees Celsius
+TIMESTAMP_COL = 1  # Column index for timestamp
+LAST_CELL_DATA_COL = 181  # Last column index for cell voltage & temp data
+SOC_COL = 182
+VSBAT_COL = 183
+VSHV_COL = 184
+CURR_COL = 185
+I_ACTUAL_COL = 186
+N_ACTUAL_COL = 187
+T_MOTOR_COL = 188
+T_IGBT_COL = 189
+LEFT_RADIATOR_COL = 190
+RIGHT_RADIATOR_COL = 191
+I_ACTUAL_FLAG = True  # Flag to indicate if actual current data is present
+CACHE_SUFFIX = '.bmscache'  # Sidecar directory holding parsed column arrays
+CACHE_VERSION = 3  # Bump whenever the cached array layout changes
+CACHE_HASH_BLOCK = 65536  # Bytes read per sampled block of the content hash
+CACHE_HASH_BLOCKS = 64  # Number of evenly spaced blocks in the content hash
+CACHE_STAGING_PREFIX = '.staging-'  # Prefix of a cache directory being written
+CACHE_RETIRED_PREFIX = '.retired-'  # Prefix of a replaced cache directory awaiting removal
+CELL_DTYPE = np.float32  # Storage type of the (stack, channel, sample) cell arrays
+CHUNK_ROWS = 20000  # Rows parsed and converted per block when reading a CSV
+CLOCK_12H = True  # Display times on a 12 hr clock, as written by the datalogger
+NS_PER_DAY = 86400 * 1_000_000_000  # Nanoseconds in a day
+# Clock time inside a timestamp: hours, minutes, seconds, optional fraction and AM/PM marker
+CLOCK_PATTERN = r'(\d{1,2}):(\d{2}):(\d{2})(?:\.(\d{1,9}))?\s*([AaPp])?'
+PLOT_STYLE = 'Solarize_Light2'  # Matplotlib style of every plot
+EXPORT_WORKERS = None  # Graph export processes, None for one per CPU core
+SESSION_WORKERS = None  # Log parsing processes of a session, None for one per CPU core
+DECIMATE_MIN_POINTS = 5000  # Series up to this length are plotted without decimation
+RANGE_BLOCK = 256  # Samples per block of the range min/max index
+PERCENTILE_BINS = 4096  # Histogram bins per channel used for the p1/p99 statistics
+STAT_NAMES = ('mean', 'min', 'max', 'std', 'first', 'last', 'p1', 'p99')  # Per-channel statistics, in display order
+LAP_THRESHOLD = 500.0  # Default motor RPM above which the car counts as running
+LAP_MIN_SECONDS = 20.0  # Shortest run of activity detected as a lap
+LAP_MIN_GAP_SECONDS = 2.0  # Dips in activity shorter than this do not end a lap
+VIOLATION_MIN_GAP_SECONDS = 1.0  # Returns within the thresholds shorter than this do not end a violation
+# Key and heading of every column of the lap statistics table
+LAP_COLUMNS = (('lap', 'Lap'), ('start', 'Start'), ('end', 'End'), ('duration', 'Duration (s)'), ('avg_current', 'Avg. Current (A)'),
+               ('peak_current', 'Peak Current (A)'), ('energy', 'Energy (kWh)'), ('min_cell_voltage', 'Min. Cell Voltage (V)'),
+               ('max_cell_temp', 'Max. Cell Temp. (°C)'), ('temp_rise', 'Temp. Rise (°C)'))
+# Key and heading of every column of the threshold violation table
+VIOLATION_COLUMNS = (('type', 'Type'), ('stack', 'Stack'), ('channel', 'Channel'), ('start', 'Start'), ('end', 'End'),
+                     ('duration', 'Duration (s)'), ('extreme', 'Extreme'))
+
+
+# GLOBAL VARIABLES
+attached_arrays = {}  # Shared arrays mapped by a graph export worker process
+
+
+# FUNCTIONS
+
+def decode_timestamps(values):
+    """ Decodes a whole timestamp column into nanoseconds since midnight in one pass.
+
+        Handles the 12hrF datalogger format ('YYYY-MM-DD hh:mm:ss.ffffff PM'),
+        24 hr clock strings, and the numeric seconds column used by BMS-GUI_V6.
+        Logs running past midnight keep counting up instead of wrapping.
+        Blank or garbled timestamps are interpolated from the valid ones around
+        them, so they can neither be taken for a rollover nor run the time backwards.
+
+        :param values: Timestamp column as an array of strings or numbers.
+        :returns: int64 array of nanoseconds since midnight of the first day.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        seconds = values.astype(float)
+        valid = np.isfinite(seconds)
+        time_ns = np.rint(np.where(valid, seconds, 0.0) * 1e9).astype(np.int64)
+    else:
+        decoded = decode_fixed_width(values)
+        if decoded is None:
+            decoded = decode_variable_width(values)
+        time_ns, valid = decoded
+    if valid.all():
+        unwrap_midnight(time_ns)
+        return time_ns
+    # Rollovers are only counted between valid samples
+    good = np.flatnonzero(valid)
+    if len(good) == 0:
+        return np.zeros(len(time_ns), dtype=np.int64)
+    good_ns = time_ns[good]
+    unwrap_midnight(good_ns)
+    time_ns = np.rint(np.interp(np.arange(len(time_ns)), good, good_ns)).astype(np.int64)
+    time_ns[good] = good_ns
+    return time_ns
+
+
+def unwrap_midnight(time_ns):
+    """ Adds a day to every sample after a midnight rollover, in place.
+
+        :param time_ns: int64 array of nanoseconds since midnight.
+    """
+    rollovers = np.cumsum(np.diff(time_ns) < -NS_PER_DAY // 2)
+    time_ns[1:] += rollovers * NS_PER_DAY
+
+
+def decode_fixed_width(values):
+    """ Decodes clock strings that all share the layout of the first entry.
+
+        The strings are viewed as a (row, character) byte matrix so every field is
+        converted with a handful of array operations.
+
+        :param values: Array of timestamp strings.
+        :returns: Tuple of the int64 array of nanoseconds since midnight and a
+            boolean array of the rows holding a valid time, or None if the column
+            is not fixed-width.
+    """
+    if len(values) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=bool)
+    try:
+        encoded = values.astype('S')
+    except UnicodeEncodeError:
+        return None
+    width = encoded.dtype.itemsize
+    first = encoded[0].ljust(width)
+    colon = first.find(b':')
+    if colon < 2 or first[colon+3:colon+4] != b':' or not first[colon-2:colon].isdigit():
+        return None
+    chars = encoded.view(np.uint8).reshape(len(encoded), width)
+    # Every row must carry its separators in the same columns as the first one
+    if not ((chars[:, colon] == ord(':')) & (chars[:, colon+3] == ord(':'))).all():
+        return None
+    digits = chars.astype(np.int64) - ord('0')
+
+    def field(start, length):
+        part = digits[:, start:start+length]
+        if ((part < 0) | (part > 9)).any():
+            raise ValueError
+        return part @ (10 ** np.arange(length - 1, -1, -1))
+
+    try:
+        hours = field(colon-2, 2)
+        minutes = field(colon+1, 2)
+        seconds = field(colon+4, 2)
+        end = colon + 6
+        fraction = np.zeros(len(encoded), dtype=np.int64)
+        if first[end:end+1] == b'.':
+            frac_len = len(first[end+1:]) - len(first[end+1:].lstrip(b'0123456789'))
+            fraction = field(end+1, frac_len) * 10 ** (9 - frac_len)
+            end += 1 + frac_len
+    except ValueError:
+        return None
+    # A fraction or marker of another length in any row would shift the fields,
+    # so every row must match the first one in length and in its separators
+    if (np.char.str_len(encoded) != len(encoded[0])).any():
+        return None
+    if first[colon+6:colon+7] == b'.' and not (chars[:, colon+6] == ord('.')).all():
+        return None
+    # 12 hr clock marker, if present
+    marker = first[end:].strip()[:1].upper()
+    if marker in (b'A', b'P'):
+        marker_col = end + first[end:].find(first[end:].strip()[:1])
+        if not np.isin(chars[:, marker_col], (ord('A'), ord('a'), ord('P'), ord('p'))).all():
+            return None
+        is_pm = np.isin(chars[:, marker_col], (ord('P'), ord('p')))
+        valid = (hours >= 1) & (hours <= 12)
+        hours = hours % 12 + 12 * is_pm
+    else:
+        valid = hours < 24
+    valid &= (minutes < 60) & (seconds < 60)
+    return (((hours * 60 + minutes) * 60 + seconds) * 1_000_000_000 + fraction).astype(np.int64), valid
+
+
+def decode_variable_width(values):
+    """ Decodes clock strings of varying layout with a vectorized regular expression.
+
+        :param values: Array of timestamp strings.
+        :returns: Tuple of the int64 array of nanoseconds since midnight (0 where
+            unparseable) and a boolean array of the rows holding a valid time.
+    """
+    parts = pd.Series(values, dtype=str).str.extract(CLOCK_PATTERN)
+    hours = pd.to_numeric(parts[0]).fillna(0).to_numpy(dtype=np.int64)
+    minutes = pd.to_numeric(parts[1]).fillna(0).to_numpy(dtype=np.int64)
+    seconds = pd.to_numeric(parts[2]).fillna(0).to_numpy(dtype=np.int64)
+    fraction = pd.to_numeric(parts[3].str.ljust(9, '0')).fillna(0).to_numpy(dtype=np.int64)
+    is_pm = parts[4].str.upper().eq('P').to_numpy(dtype=bool)
+    has_marker = parts[4].notna().to_numpy(dtype=bool)
+    valid = parts[0].notna().to_numpy(dtype=bool) & (minutes < 60) & (seconds < 60) & \
+        np.where(has_marker, (hours >= 1) & (hours <= 12), hours < 24)
+    hours = np.where(has_marker, hours % 12 + 12 * is_pm, hours)
+    return ((hours * 60 + minutes) * 60 + seconds) * 1_000_000_000 + fraction, valid
+
+
+def parse_clock(value, reference_ns=None, after_ns=None):
+    """ Converts a user-entered 'hh:mm:ss.ms' time to nanoseconds since midnight.
+
+        Times are shown on a 12 hr clock and logs may run past midnight, so when
+        a log is given the first half-day that falls inside it is used, or the
+        one closest to it. A time ending a range is placed at or after its start
+        instead, so a range running past the end of the log is still accepted.
+
+        :param value: Time string.
+        :param reference_ns: Decoded timestamps of the log, if any.
+        :param after_ns: Start of the range this time ends, if any.
+        :returns: Nanoseconds, or None if the string is not a time.
+    """
+    match = re.search(CLOCK_PATTERN, str(value))
+    if match is None:
+        return None
+    time_ns, valid = decode_variable_width(np.array([match.group(0)]))
+    if not valid[0]:
+        return None
+    time_ns = int(time_ns[0])
+    if reference_ns is None or len(reference_ns) == 0:
+        return time_ns
+    # A time with an AM/PM marker can only move by whole days
+    step = NS_PER_DAY if match.group(5) else NS_PER_DAY // 2
+    if after_ns is not None:
+        return time_ns + max(-(-(after_ns - time_ns) // step), 0) * step
+    first, last = int(reference_ns[0]), int(reference_ns[-1])
+    candidates = time_ns + step * np.arange(max((last - time_ns) // step, 0) + 2)
+    distances = np.maximum(first - candidates, 0) + np.maximum(candidates - last, 0)
+    return int(candidates[np.argmin(distances)])
+
+
+def format_clock(time_ns):
+    """ Formats nanoseconds since midnight as 'hh:mm:ss.ms' display strings.
+
+        Only called for the values that are actually shown (ticks, cursors,
+        labels); arrays are formatted as a byte matrix without a Python loop.
+
+        :param time_ns: Scalar or array of nanoseconds since midnight.
+        :returns: A string, or an array of strings for array input.
+    """
+    time_ns = np.asarray(time_ns, dtype=np.int64)
+    millis = (time_ns // 1_000_000) % (NS_PER_DAY // 1_000_000)
+    hours = millis // 3_600_000
+    if CLOCK_12H:
+        hours = (hours + 11) % 12 + 1
+    fields = [hours, millis // 60_000 % 60, millis // 1000 % 60]
+    chars = np.empty(time_ns.shape + (12,), dtype=np.uint8)
+    for position, value in zip((0, 3, 6), fields):
+        chars[..., position] = value // 10 + ord('0')
+        chars[..., position+1] = value % 10 + ord('0')
+    chars[..., 2] = chars[..., 5] = ord(':')
+    chars[..., 8] = ord('.')
+    for position, divisor in zip((9, 10, 11), (100, 10, 1)):
+        chars[..., position] = millis % 1000 // divisor % 10 + ord('0')
+    strings = chars.view('S12')[..., 0].astype(str)
+    return str(strings) if strings.ndim == 0 else strings
+
+
+def clock_formatter():
+    """ Returns a tick formatter showing seconds since midnight as 'hh:mm:ss.ms'.
+
+        Strings are only built for tick positions and cursor readouts.
+    """
+    return ticker.FuncFormatter(lambda value, pos: format_clock(round(value * 1e9)))
+
+
+def file_fingerprint(file_path):
+    """ Identifies a log file by its size, mtime and a sampled content hash.
+
+        The hash covers CACHE_HASH_BLOCKS evenly spaced blocks (always including
+        the first and last one), so it stays cheap on multi-gigabyte logs.
+
+        :param file_path: Path to the CSV file.
+        :returns: Dictionary with 'size', 'mtime_ns' and 'hash' keys.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        if stat.st_size <= CACHE_HASH_BLOCK * CACHE_HASH_BLOCKS:
+            digest.update(f.read())
+        else:
+            last_block = stat.st_size - CACHE_HASH_BLOCK
+            for block in range(CACHE_HASH_BLOCKS):
+                f.seek(last_block * block // (CACHE_HASH_BLOCKS - 1))
+                digest.update(f.read(CACHE_HASH_BLOCK))
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def cache_dir(file_path, fingerprint, layout=None):
+    """ Returns the sidecar cache directory for a file, optionally for a column layout.
+
+        :param file_path: Path to the CSV file.
+        :param fingerprint: Fingerprint returned by file_fingerprint.
+        :param layout: Column-layout settings, or None for the raw column arrays.
+        :returns: Path of the cache directory.
+    """
+    root = os.path.join(file_path + CACHE_SUFFIX, fingerprint['hash'])
+    if layout is None:
+        return os.path.join(root, 'raw')
+    layout_key = json.dumps(layout, sort_keys=True).encode()
+    return os.path.join(root, hashlib.blake2b(layout_key, digest_size=8).hexdigest())
+
+
+def load_cache(directory, key):
+    """ Memory-maps the arrays of a cache directory if its key matches.
+
+        :param directory: Cache directory written by save_cache.
+        :param key: Dictionary that must equal the stored key.
+        :returns: Dictionary of read-only arrays, or None on a cache miss.
+    """
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['version'] != CACHE_VERSION or meta['key'] != key:
+            return None
+        # Memory-mapped files may hold spare rows past the end of the data
+        return {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')[..., :meta['rows']]
+                for name in meta['arrays']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def prepare_cache_dir(directory):
+    """ Creates a staging directory to write a cache into, dropping caches of previous versions of the file.
+
+        Caches are written aside and moved into place by publish_cache_dir, so the
+        files of a cache another session has memory-mapped are never overwritten.
+
+        :param directory: Cache directory returned by cache_dir.
+        :returns: Path of the new staging directory, or None if it cannot be written.
+    """
+    root = os.path.dirname(directory)
+    file_cache = os.path.dirname(root)
+    try:
+        if os.path.isdir(file_cache):
+            for entry in os.listdir(file_cache):
+                if entry != os.path.basename(root):
+                    shutil.rmtree(os.path.join(file_cache, entry),
+                                  ignore_errors=True)
+        os.makedirs(root, exist_ok=True)
+        for entry in os.listdir(root):
+            if entry.startswith(CACHE_RETIRED_PREFIX):
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        return tempfile.mkdtemp(prefix=CACHE_STAGING_PREFIX, dir=root)
+    except OSError as e:
+        print(f"Could not create cache {directory}: {e}")
+        return None
+
+
+def publish_cache_dir(staging, directory):
+    """ Moves a written staging directory into place, retiring the cache it replaces.
+
+        The replaced directory is renamed away before it is removed, so sessions
+        still mapping its files keep reading them where the OS allows it.
+
+        :param staging: Directory returned by prepare_cache_dir, holding meta.json.
+        :param directory: Cache directory returned by cache_dir.
+        :returns: True if the cache is in place.
+    """
+    try:
+        if os.path.isdir(directory):
+            retired = tempfile.mkdtemp(prefix=CACHE_RETIRED_PREFIX, dir=os.path.dirname(directory))
+            os.replace(directory, os.path.join(retired, 'cache'))
+            shutil.rmtree(retired, ignore_errors=True)
+        os.replace(staging, directory)
+        return True
+    except OSError as e:
+        print(f"Could not write cache {directory}: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+
+
+def save_cache(directory, key, arrays, staging=None):
+    """ Writes arrays to a cache directory, replacing stale caches of the same file.
+
+        The arrays and then meta.json are written to a staging directory that is
+        moved into place once complete, so a half-written cache is never loaded.
+        Arrays already memory-mapped into the staging directory are only flushed.
+
+        :param directory: Cache directory to write.
+        :param key: Dictionary identifying the cached content.
+        :param arrays: Dictionary of numpy arrays whose last axis holds samples.
+        :param staging: Staging directory from prepare_cache_dir the arrays were
+            mapped into, or None to make a new one.
+    """
+    staging = staging or prepare_cache_dir(directory)
+    if staging is None:
+        return
+    try:
+        for name, array in arrays.items():
+            path = os.path.join(staging, name + '.npy')
+            if isinstance(array, np.memmap) and os.path.exists(path) and os.path.samefile(array.filename, path):
+                array.flush()
+            else:
+                np.save(path, array)
+        rows = next(iter(arrays.values())).shape[-1] if arrays else 0
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'key': key,
+                      'arrays': list(arrays), 'rows': rows}, f)
+    except OSError as e:
+        print(f"Could not write cache {directory}: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    publish_cache_dir(staging, directory)
+
+
+def count_rows(file_path):
+    """ Counts the data rows of a CSV file without parsing it.
+
+        :param file_path: Path to the CSV file.
+        :returns: Number of lines after the header and units lines.
+    """
+    newlines = 0
+    last_byte = b'\n'
+    with open(file_path, 'rb') as f:
+        while block := f.read(1 << 24):
+            newlines += block.count(b'\n')
+            last_byte = block[-1:]
+    return max(newlines + (last_byte != b'\n') - 2, 0)
+
+
+def grow(array, rows):
+    """ Returns the array with room for at least the given number of samples.
+
+        :param array: Array whose last axis holds samples.
+        :param rows: Number of samples needed.
+        :returns: The array itself, or a larger copy of it.
+    """
+    if array.shape[-1] >= rows:
+        return array
+    grown = np.empty(array.shape[:-1] + (max(rows, 2 * array.shape[-1]),),
+                     dtype=array.dtype)
+    grown[..., :array.shape[-1]] = array
+    return grown
+
+
+def iter_csv_blocks(file_path, raw_columns, num_rows, directory=None):
+    """ Streams a CSV file in blocks of CHUNK_ROWS rows.
+
+        Every block is also appended to the raw column arrays in raw_columns,
+        which are preallocated for num_rows samples (the numeric matrix is
+        memory-mapped into directory when given) and grown if that was short.
+
+        :param file_path: Path to the CSV file.
+        :param raw_columns: Dictionary filled with the raw column arrays: the
+            numeric 'raw' matrix (one row per CSV column, NaN for text columns)
+            and a 'text_<col>' array for every text column.
+        :param num_rows: Expected number of rows, as returned by count_rows.
+        :param directory: Staging directory of the raw cache, or None to keep everything in memory.
+        :yields: Dictionary of raw column arrays for each block.
+    """
+    start = 0
+    text_cols = None
+    # Read the CSV file, skipping the second line
+    for chunk in pd.read_csv(file_path, header=0, skiprows=[1], chunksize=CHUNK_ROWS):
+        if text_cols is None:
+            text_cols = [col_index for col_index, col in enumerate(chunk.columns)
+                         if not pd.api.types.is_numeric_dtype(chunk[col])]
+        block = {'raw': np.full((len(chunk.columns), len(chunk.index)), np.nan)}
+        for col_index, col in enumerate(chunk.columns):
+            if col_index in text_cols:
+                block[f'text_{col_index}'] = chunk[col].astype(
+                    str).to_numpy(dtype=str)
+            elif pd.api.types.is_numeric_dtype(chunk[col]):
+                block['raw'][col_index] = chunk[col].to_numpy(dtype=float)
+            else:
+                # Garbled values in a numeric column
+                block['raw'][col_index] = pd.to_numeric(
+                    chunk[col], errors='coerce').to_numpy(dtype=float)
+
+        if not raw_columns:
+            shape = (len(chunk.columns), max(num_rows, len(chunk.index)))
+            if directory is None:
+                raw_columns['raw'] = np.empty(shape)
+            else:
+                raw_columns['raw'] = np.lib.format.open_memmap(
+                    os.path.join(directory, 'raw.npy'), mode='w+', dtype=float, shape=shape)
+            for col_index in text_cols:
+                text = block[f'text_{col_index}']
+                raw_columns[f'text_{col_index}'] = np.empty(
+                    shape[1], dtype=text.dtype)
+        end = start + len(chunk.index)
+        for name, array in block.items():
+            stored = grow(raw_columns[name], end)
+            if stored.dtype.itemsize < array.dtype.itemsize:
+                stored = stored.astype(array.dtype)  # Longer strings than before
+            stored[..., start:end] = array
+            raw_columns[name] = stored
+        start = end
+        yield block
+
+    for name in raw_columns:
+        raw_columns[name] = raw_columns[name][..., :start]
+
+
+def iter_cached_blocks(raw_columns):
+    """ Splits cached raw column arrays into blocks of CHUNK_ROWS rows.
+
+        :param raw_columns: Dictionary of raw column arrays.
+        :yields: Dictionary of array views for each block.
+    """
+    num_rows = raw_columns['raw'].shape[-1]
+    for start in range(0, num_rows, CHUNK_ROWS):
+        yield {name: array[..., start:start+CHUNK_ROWS] for name, array in raw_columns.items()}
+
+
+def convert_blocks(blocks, num_rows, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress=None):
+    """ Converts raw column blocks and appends them into preallocated arrays.
+
+        Only one block of raw values is converted at a time, so peak memory is
+        bounded by the block size plus the converted arrays.
+
+        :param blocks: Iterable of raw column blocks.
+        :param num_rows: Expected total number of rows.
+        :param progress: Optional callable taking (rows done, total rows).
+        :returns: Dictionary of converted arrays.
+    """
+    data = {}
+    start = 0
+    for block in blocks:
+        converted = convert_columns(block, cells, temps, timestamp_col,
+                                    SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag)
+        end = start + converted['timestamps_numeric'].shape[-1]
+        for name, array in converted.items():
+            if name not in data:
+                data[name] = np.empty(
+                    array.shape[:-1] + (num_rows,), dtype=array.dtype)
+            data[name] = grow(data[name], end)
+            data[name][..., start:end] = array
+        start = end
+        if progress is not None:
+            progress(start, max(num_rows, start))
+    data = {name: array[..., :start] for name, array in data.items()}
+    # Blocks are decoded separately, so rollovers at block edges are unwrapped here
+    unwrap_midnight(data['timestamps_numeric'])
+    return data
+
+
+def cell_columns(timestamp_col, num_cols, cells, temps):
+    """ Finds the raw columns holding the cell voltages and temperatures of every stack.
+
+        :param timestamp_col: Column index for timestamp.
+        :param num_cols: Number of raw columns.
+        :param cells: Number of cells per stack.
+        :param temps: Number of temperature sensors per stack.
+        :returns: Tuple of the voltage and temperature column lists, one list per stack,
+            as indices into the raw matrix.
+    """
+    new_cols = []
+    for i in range(timestamp_col, LAST_CELL_DATA_COL, 4):
+        group = list(range(i, min(i+4, num_cols)))
+        # Reverse the order of each group of 4 columns
+        new_cols.extend(group[::-1])
+    # Column order of the reordered data, as indices into the raw matrix
+    all_cols = [timestamp_col-1] + new_cols + \
+        list(range(LAST_CELL_DATA_COL+1, num_cols))
+
+    voltage_cols = []
+    temp_cols = []
+    for stack_data in range(timestamp_col, LAST_CELL_DATA_COL, cells+temps):
+        voltage_cols.append(all_cols[stack_data:stack_data+cells])
+        temp_cols.append(all_cols[stack_data+cells:stack_data+cells+temps])
+    return voltage_cols, temp_cols
+
+
+def convert_columns(raw_columns, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag):
+    """ Converts raw column arrays into the series used by the GUI.
+
+        :param raw_columns: Dictionary of raw column arrays for a block of rows.
+        :returns: Dictionary of converted arrays for the block.
+    """
+    raw = raw_columns['raw']
+    num_cols = raw.shape[0]
+    data = {}
+    # Decode the timestamp column, which is numeric in older logs
+    data['timestamps_numeric'] = decode_timestamps(
+        raw_columns.get(f'text_{timestamp_col-1}', raw[timestamp_col-1]))
+    data['SoC'] = raw[SoC_col-1]  # Store SoC data
+    data['VsBat'] = raw[VsBat_col-1]  # Store VsBat data
+    data['VsHV'] = raw[VsHV_col-1]  # Store VsHV data
+    data['curr'] = raw[curr_col-1]  # Store current data
+    if (i_actual_flag):
+        # Store negated actual current data
+        data['i_actual'] = -raw[I_ACTUAL_COL-1]
+        # Torque approximation from current
+        data['torque'] = np.maximum(0, data['i_actual'] * 0.75)
+        N_ACTUAL_COL = I_ACTUAL_COL + 1
+        T_MOTOR_COL = I_ACTUAL_COL + 2
+        T_IGBT_COL = I_ACTUAL_COL + 3
+    else:
+        N_ACTUAL_COL = I_ACTUAL_COL
+        T_MOTOR_COL = I_ACTUAL_COL + 1
+        T_IGBT_COL = I_ACTUAL_COL + 2
+    # Store negated RPM data (corresponding to motor mounting direciton, forward is negative)
+    data['n_actual'] = -raw[N_ACTUAL_COL-1]
+    # Store motor and IGBT temperature data
+    data['t_motor'] = calc_motor_temp(raw[T_MOTOR_COL-1])
+    data['t_igbt'] = calc_igbt_temp(raw[T_IGBT_COL-1])
+    # Convert current to Amperes
+    data['current_converted'] = calc_curr(raw[curr_col-1])
+    data['left_radiator_temps'] = calc_radiator_temp(raw[LEFT_RADIATOR_COL-1])
+    data['right_radiator_temps'] = calc_radiator_temp(
+        raw[RIGHT_RADIATOR_COL-1])
+
+    # Extracting cell voltages and temperatures from the raw matrix
+    voltage_cols, temp_cols = cell_columns(timestamp_col, num_cols, cells, temps)
+    # Fancy indexing with a (stack, channel) index array yields (stack, channel, sample)
+    data['cell_voltages'] = raw[np.array(voltage_cols)].astype(CELL_DTYPE)
+    data['cell_temps'] = calc_temp(raw[np.array(temp_cols)]).astype(CELL_DTYPE)
+    return data
+
+
+class LoadCancelled(Exception):
+    """ Raised from a progress callback to stop loading a file. """
+
+
+def load_data(file_path, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress=None):
+    """ Loads a CSV file into a dictionary of arrays without touching any globals.
+
+        Parsed columns are kept in a sidecar cache next to the file, so reopening
+        the same log memory-maps the arrays instead of parsing the CSV again.
+        Otherwise the CSV is streamed in blocks of CHUNK_ROWS rows. The cache is
+        keyed by size, mtime and a hash of sampled blocks rather than of the whole
+        file, so an edit that keeps the size and mtime is not noticed.
+
+        :param file_path: Path to the CSV file.
+        :param progress: Optional callable taking (rows done, total rows), called
+            after every block; it may raise LoadCancelled to stop loading.
+        :returns: Dictionary of converted arrays.
+    """
+    layout = {'cells': cells, 'temps': temps, 'timestamp_col': timestamp_col, 'SoC_col': SoC_col, 'VsBat_col': VsBat_col,
+              'VsHV_col': VsHV_col, 'curr_col': curr_col, 'i_actual_flag': bool(i_actual_flag)}
+    fingerprint = file_fingerprint(file_path)
+    data_dir = cache_dir(file_path, fingerprint, layout)
+    data = load_cache(data_dir, dict(fingerprint, **layout))
+    if data is None:
+        raw_dir = cache_dir(file_path, fingerprint)
+        raw_columns = load_cache(raw_dir, fingerprint)
+        if raw_columns is None:
+            # Stream the CSV, converting each block as it is parsed
+            raw_columns = {}
+            num_rows = count_rows(file_path)
+            raw_staging = prepare_cache_dir(raw_dir)
+            blocks = iter_csv_blocks(file_path, raw_columns, num_rows, raw_staging)
+            try:
+                data = convert_blocks(blocks, num_rows, cells, temps, timestamp_col,
+                                      SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress)
+            except BaseException:
+                if raw_staging is not None:
+                    shutil.rmtree(raw_staging, ignore_errors=True)
+                raise
+            save_cache(raw_dir, fingerprint, raw_columns, raw_staging)
+        else:
+            data = convert_blocks(iter_cached_blocks(raw_columns), raw_columns['raw'].shape[-1], cells, temps,
+                                  timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress)
+        save_cache(data_dir, dict(fingerprint, **layout), data)
+        # Hand back the memory-mapped copy so the parsed arrays can be freed
+        data = load_cache(data_dir, dict(fingerprint, **layout)) or data
+    elif progress is not None:
+        num_rows = data['timestamps_numeric'].shape[-1]
+        progress(num_rows, num_rows)
+    return data
+
+
+def load_raw_columns(file_path):
+    """ Loads the raw column arrays of a CSV file, from the sidecar cache when possible.
+
+        :param file_path: Path to the CSV file.
+        :returns: Dictionary of raw column arrays, as filled by iter_csv_blocks.
+    """
+    fingerprint = file_fingerprint(file_path)
+    raw_dir = cache_dir(file_path, fingerprint)
+    raw_columns = load_cache(raw_dir, fingerprint)
+    if raw_columns is None:
+        raw_columns = {}
+        raw_staging = prepare_cache_dir(raw_dir)
+        try:
+            for block in iter_csv_blocks(file_path, raw_columns, count_rows(file_path), raw_staging):
+                pass
+        except BaseException:
+            if raw_staging is not None:
+                shutil.rmtree(raw_staging, ignore_errors=True)
+            raise
+        save_cache(raw_dir, fingerprint, raw_columns, raw_staging)
+        raw_columns = load_cache(raw_dir, fingerprint) or raw_columns
+    return raw_columns
+
+
+def load_session_file(file_path, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag):
+    """ Parses one log of a session in a worker process.
+
+        :param file_path: Path to the CSV file.
+        :returns: None if the arrays were cached, so the caller can memory-map them
+            instead of receiving a pickled copy, otherwise the converted arrays.
+    """
+    data = load_data(file_path, cells, temps, timestamp_col,
+                     SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag)
+    if isinstance(data['timestamps_numeric'], np.memmap):
+        return None
+    return data
+
+
+def load_session(file_paths, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, progress=None, max_workers=None):
+    """ Loads several logs in parallel worker processes into one time-ordered session.
+
+        Every file goes through load_data, so files parsed before are read from
+        their cache. Files are ordered by name, which the datalogger gives in
+        recording order, and concatenated. Each file counts from its own midnight,
+        so a file starting more than half a day before the previous one ended is
+        moved to the next day.
+
+        :raises ValueError: If a file starts before the previous one ended.
+
+        :param file_paths: Paths to the CSV files.
+        :param progress: Optional callable taking (files done, total files); it
+            may raise LoadCancelled to stop loading.
+        :param max_workers: Number of worker processes, SESSION_WORKERS if None.
+        :returns: Dictionary of concatenated arrays, with 'file_paths' in session
+            order and 'file_starts' holding the first sample of each file.
+    """
+    columns = (cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag)
+    parts = {}
+    with ProcessPoolExecutor(max_workers=max_workers or SESSION_WORKERS) as pool:
+        futures = {pool.submit(load_session_file, file_path, *columns): file_path
+                   for file_path in file_paths}
+        try:
+            for future in as_completed(futures):
+                file_path = futures[future]
+                data = future.result()
+                parts[file_path] = data if data is not None else load_data(file_path, *columns)
+                if progress is not None:
+                    progress(len(parts), len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    order = sorted(parts, key=lambda file_path: (os.path.basename(file_path), file_path))
+    data = {name: np.concatenate([parts[file_path][name] for file_path in order], axis=-1)
+            for name in parts[order[0]]}
+    lengths = [parts[file_path]['timestamps_numeric'].shape[-1] for file_path in order]
+    data['file_paths'] = order
+    data['file_starts'] = np.cumsum([0] + lengths[:-1], dtype=np.int64)
+    # Unwrap midnight across file boundaries, as decode_timestamps does within a file
+    timestamps = data['timestamps_numeric']
+    previous_end = None
+    for file_path, start, length in zip(order, data['file_starts'], lengths):
+        if length == 0:
+            continue
+        segment = timestamps[start:start+length]
+        if previous_end is not None:
+            segment += max(-(-(previous_end - NS_PER_DAY // 2 - segment[0]) // NS_PER_DAY), 0) * NS_PER_DAY
+            if segment[0] < previous_end:
+                raise ValueError(f"{os.path.basename(file_path)} starts at {format_clock(segment[0])}, "
+                                 f"before the previous file of the session ends at {format_clock(previous_end)}")
+        previous_end = int(segment[-1])
+    return data
+
+
+def prepare_data(data):
+    """ Adds the derived series and per-channel averages shown by the widgets.
+
+        :param data: Dictionary returned by load_data; updated in place.
+        :returns: The same dictionary.
+    """
+    # Sum across stack and cell axes
+    data['total_pack_voltage'] = data['cell_voltages'].sum(
+        axis=(0, 1), dtype=float)
+    data['power'] = data['total_pack_voltage'] * \
+        data['current_converted'] / 1000.0
+    data['window_index'] = build_window_index(data['timestamps_numeric'], {'current': data['current_converted'], 'power': data['power'],
+                                              'pack_voltage': data['total_pack_voltage']}, data.get('file_starts'))
+    data['voltage_range_index'] = build_range_index(
+        data['timestamps_numeric'], data['cell_voltages'])
+    data['temp_range_index'] = build_range_index(
+        data['timestamps_numeric'], data['cell_temps'])
+    data['current_range_index'] = build_range_index(
+        data['timestamps_numeric'], data['current_converted'][np.newaxis])
+    data['voltage_stats'] = channel_stats(data['voltage_range_index'])
+    data['temp_stats'] = channel_stats(data['temp_range_index'])
+    data['current_stats'] = channel_stats(data['current_range_index'])
+    data['avg_cell_voltages'] = data['voltage_stats']['mean']
+    data['avg_cell_temps'] = data['temp_stats']['mean']
+    return data
+
+
+def channel_stats(index):
+    """ Computes the summary statistics of every channel in one pass over the samples.
+
+        Extremes come from the range index, which also fixes the histogram
+        range used to read off the percentiles.
+
+        :param index: Dictionary returned by build_range_index.
+        :returns: Dictionary of 'count', 'mean', 'min', 'max', 'std', 'first',
+            'last', 'p1' and 'p99' arrays shaped like the leading axes of the values.
+    """
+    values = index['values']
+    num_rows = values.shape[-1]
+    shape = values.shape[:-1]
+    channels = index['max']['values'].shape[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lowest = index['min']['values'].min(axis=1, initial=np.inf)
+        highest = index['max']['values'].max(axis=1, initial=-np.inf)
+        finite = np.isfinite(lowest) & np.isfinite(highest)
+        # Sums are taken around the middle of the range to keep the variance accurate
+        shift = np.where(finite, (lowest + highest) / 2, 0.0)
+        scale = np.where(finite & (highest > lowest), PERCENTILE_BINS / (highest - lowest), 0.0)
+    base = np.where(finite, lowest, 0.0)
+    count = np.zeros(channels)
+    total = np.zeros(channels)
+    squares = np.zeros(channels)
+    histogram = np.zeros(channels * PERCENTILE_BINS, dtype=np.int64)
+    offsets = np.arange(channels)[:, None] * PERCENTILE_BINS
+    for start in range(0, num_rows, CHUNK_ROWS):
+        chunk = np.asarray(values[..., start:start+CHUNK_ROWS], dtype=float).reshape(channels, -1)
+        valid = ~np.isnan(chunk)
+        centred = np.where(valid, chunk - shift[:, None], 0.0)
+        count += valid.sum(axis=1)
+        total += centred.sum(axis=1)
+        squares += (centred * centred).sum(axis=1)
+        bins = np.clip((np.where(valid, chunk, base[:, None]) - base[:, None]) * scale[:, None],
+                       0, PERCENTILE_BINS - 1).astype(np.int64)
+        histogram += np.bincount((offsets + bins)[valid], minlength=channels * PERCENTILE_BINS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+    stats = {'count': count, 'mean': mean + shift, 'min': np.where(finite, lowest, np.nan),
+             'max': np.where(finite, highest, np.nan), 'std': std}
+    flat = np.asarray(values[..., [0, -1]] if num_rows else np.full(shape + (2,), np.nan), dtype=float).reshape(channels, 2)
+    stats['first'], stats['last'] = flat[:, 0], flat[:, 1]
+    ranks = np.cumsum(histogram.reshape(channels, PERCENTILE_BINS), axis=1)
+    for name, percent in (('p1', 1), ('p99', 99)):
+        # First bin holding the requested share of the samples, read at its centre
+        bins = (ranks < percent / 100 * count[:, None]).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value = np.where(scale > 0, base + (bins + 0.5) / scale, base)
+        stats[name] = np.where(finite, np.clip(value, stats['min'], stats['max']), np.nan)
+    return {name: array.reshape(shape) for name, array in stats.items()}
+
+
+def pack_mean(stats, stacks=None):
+    """ Returns the mean over every sample of every channel of the first stacks.
+
+        :param stats: Dictionary returned by channel_stats.
+        :param stacks: Number of stacks in use, all of them if None.
+    """
+    count = stats['count'][:stacks]
+    return float(np.nansum(stats['mean'][:stacks] * count) / count.sum())
+
+
+def build_window_index(timestamps_ns, series, file_starts=None):
+    """ Builds cumulative sums over time so window queries cost two lookups and a subtraction.
+
+        :param timestamps_ns: Sorted sample times in nanoseconds since midnight.
+        :param series: Dictionary of sample arrays to index, by name.
+        :param file_starts: First sample of each file of a session; the gaps
+            between files are left out of the time integrals.
+        :returns: Dictionary with the timestamps, the running 'sums' of every
+            series and their running trapezoidal 'integrals' over seconds.
+    """
+    timestamps_ns = np.asarray(timestamps_ns)
+    dt = np.diff(timestamps_ns) / 1e9
+    if file_starts is not None and len(file_starts) > 1:
+        dt[np.asarray(file_starts[1:]) - 1] = 0.0
+    index = {'timestamps': timestamps_ns, 'sums': {}, 'integrals': {}}
+    for name, values in series.items():
+        values = np.asarray(values, dtype=float)
+        # A leading zero makes the sum of samples [i, j) sums[j] - sums[i]
+        index['sums'][name] = np.concatenate(([0.0], np.cumsum(values)))
+        # integrals[i] is the area from the first sample up to sample i
+        index['integrals'][name] = np.concatenate(
+            ([0.0], np.cumsum((values[1:] + values[:-1]) * 0.5 * dt)))
+    return index
+
+
+def window_bounds(index, start_ns, end_ns):
+    """ Returns the samples inside time windows.
+
+        :param index: Dictionary returned by build_window_index.
+        :param start_ns: Window start time(s) in nanoseconds, scalar or array.
+        :param end_ns: Window end time(s) in nanoseconds, inclusive.
+        :returns: Tuple of (first sample, one past the last sample) index arrays.
+    """
+    start = np.searchsorted(index['timestamps'], start_ns, side='left')
+    end = np.searchsorted(index['timestamps'], end_ns, side='right')
+    return start, np.maximum(end, start)
+
+
+def window_mean(index, name, start_ns, end_ns):
+    """ Returns the mean of a series over time windows.
+
+        :param index: Dictionary returned by build_window_index.
+        :param name: Name of the indexed series.
+        :returns: Mean per window, NaN for windows without samples.
+    """
+    start, end = window_bounds(index, start_ns, end_ns)
+    sums = index['sums'][name]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[end] - sums[start]) / (end - start)
+
+
+def window_integral(index, name, start_ns, end_ns):
+    """ Returns the integral of a series over time windows, in unit-seconds.
+
+        :param index: Dictionary returned by build_window_index.
+        :param name: Name of the indexed series.
+        :returns: Trapezoidal integral between the first and last sample of each window.
+    """
+    start, end = window_bounds(index, start_ns, end_ns)
+    integrals = index['integrals'][name]
+    first = np.minimum(start, len(integrals) - 1)
+    # Empty windows end on their first sample and integrate to zero
+    last = np.clip(end - 1, first, len(integrals) - 1)
+    return integrals[last] - integrals[first]
+
+
+def build_range_index(timestamps_ns, values):
+    """ Builds a block min/max index with a sparse table over the blocks of every channel.
+
+        Each block of RANGE_BLOCK samples keeps its extremes and their positions.
+        Level k of a table holds, for every block, which of the next 2**k blocks
+        has the extreme, so any run of whole blocks is covered by two lookups.
+
+        :param timestamps_ns: Sorted sample times in nanoseconds since midnight.
+        :param values: Array whose last axis holds samples, e.g. (stack, channel, sample).
+        :returns: Dictionary holding the values and, per 'max' and 'min', the
+            block extremes, their sample positions and the sparse table levels.
+    """
+    num_rows = values.shape[-1]
+    channels = int(np.prod(values.shape[:-1], dtype=np.int64))
+    num_blocks = -(-num_rows // RANGE_BLOCK)
+    index = {'timestamps': np.asarray(timestamps_ns), 'values': values}
+    for kind, fill, pick in (('max', -np.inf, np.argmax), ('min', np.inf, np.argmin)):
+        block_values = np.empty((channels, num_blocks))
+        block_positions = np.empty((channels, num_blocks), dtype=np.int64)
+        # Reduce CHUNK_ROWS samples at a time so memory-mapped arrays stay on disk
+        step = max(CHUNK_ROWS // RANGE_BLOCK, 1) * RANGE_BLOCK
+        for start in range(0, num_rows, step):
+            chunk = np.asarray(values[..., start:start+step], dtype=float).reshape(channels, -1)
+            padding = -chunk.shape[1] % RANGE_BLOCK
+            chunk = np.pad(chunk, ((0, 0), (0, padding)), constant_values=np.nan)
+            blocks = np.where(np.isnan(chunk), fill, chunk).reshape(
+                channels, -1, RANGE_BLOCK)
+            offsets = pick(blocks, axis=2)
+            first = start // RANGE_BLOCK
+            block_range = np.arange(blocks.shape[1])
+            block_values[:, first:first+blocks.shape[1]] = np.take_along_axis(
+                blocks, offsets[..., None], axis=2)[..., 0]
+            block_positions[:, first:first+blocks.shape[1]] = start + \
+                block_range * RANGE_BLOCK + offsets
+        # Level 0 is the block itself, so only levels from 1 up are stored
+        tables = [None]
+        span = 1
+        while 2 * span <= num_blocks:
+            previous = tables[-1] if tables[-1] is not None else np.broadcast_to(
+                np.arange(num_blocks, dtype=np.int32), (channels, num_blocks))
+            left = previous[:, :num_blocks - 2 * span + 1]
+            right = previous[:, span:span + num_blocks - 2 * span + 1]
+            left_values = np.take_along_axis(block_values, left, axis=1)
+            right_values = np.take_along_axis(block_values, right, axis=1)
+            better = right_values > left_values if kind == 'max' else right_values < left_values
+            tables.append(np.where(better, right, left).astype(np.int32))
+            span *= 2
+        index[kind] = {'fill': fill, 'values': block_values,
+                       'positions': block_positions, 'tables': tables}
+    return index
+
+
+def range_extreme(index, start, end, kind='max'):
+    """ Returns the extreme of every channel over samples [start, end).
+
+        :param index: Dictionary returned by build_range_index.
+        :param start: First sample of the window.
+        :param end: One past the last sample of the window.
+        :param kind: 'max' or 'min'.
+        :returns: Tuple of (extreme values, sample positions), shaped like the
+            leading axes of the indexed values; NaN and -1 for empty windows.
+    """
+    start, end = int(start), int(end)
+    values = index['values']
+    level = index[kind]
+    channels = level['values'].shape[0]
+    best_values = np.full(channels, level['fill'])
+    best_positions = np.full(channels, -1, dtype=np.int64)
+
+    def offer(candidate_values, candidate_positions):
+        if kind == 'max':
+            better = candidate_values > best_values
+        else:
+            better = candidate_values < best_values
+        best_values[better] = candidate_values[better]
+        best_positions[better] = candidate_positions[better]
+
+    first_block = -(-start // RANGE_BLOCK)
+    last_block = end // RANGE_BLOCK
+    if first_block < last_block:
+        # Whole blocks come from two overlapping sparse table lookups
+        span_level = (last_block - first_block).bit_length() - 1
+        rows = np.arange(channels)
+        for block in (first_block, last_block - (1 << span_level)):
+            if span_level == 0:
+                blocks = np.full(channels, block)
+            else:
+                blocks = level['tables'][span_level][:, block]
+            offer(level['values'][rows, blocks],
+                  level['positions'][rows, blocks])
+        segments = ((start, first_block * RANGE_BLOCK),
+                    (last_block * RANGE_BLOCK, end))
+    else:
+        segments = ((start, end),)
+    # Partial blocks at the edges are scanned directly
+    for segment_start, segment_end in segments:
+        if segment_end > segment_start:
+            chunk = np.asarray(values[..., segment_start:segment_end], dtype=float).reshape(channels, -1)
+            chunk = np.where(np.isnan(chunk), level['fill'], chunk)
+            offsets = chunk.argmax(axis=1) if kind == 'max' else chunk.argmin(axis=1)
+            offer(chunk[np.arange(channels), offsets],
+                  segment_start + offsets)
+    best_values[best_positions < 0] = np.nan
+    shape = values.shape[:-1]
+    return best_values.reshape(shape), best_positions.reshape(shape)
+
+
+def range_extremes(index, starts, ends, kind='max'):
+    """ Returns the extreme of every channel over many windows of samples in one pass.
+
+        Whole blocks come from the sparse table lookups of all windows of the same
+        span at once, so only the partial blocks at the edges are read per window
+        and the cost grows with the number of windows, not their length.
+
+        :param index: Dictionary returned by build_range_index.
+        :param starts: First sample of each window.
+        :param ends: One past the last sample of each window.
+        :param kind: 'max' or 'min'.
+        :returns: Array of extremes shaped (window,) plus the leading axes of the
+            indexed values; NaN for empty windows.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    values = index['values']
+    num_rows = values.shape[-1]
+    level = index[kind]
+    channels = level['values'].shape[0]
+    reduce = np.fmax if kind == 'max' else np.fmin
+    best = np.full((len(starts), channels), np.nan)
+    if len(starts) == 0 or num_rows == 0:
+        return best.reshape((len(starts),) + values.shape[:-1])
+    # Blocks without readings hold the fill value, which must not win
+    block_values = np.where(np.isinf(level['values']), np.nan, level['values'])
+    first_blocks = -(-starts // RANGE_BLOCK)
+    last_blocks = ends // RANGE_BLOCK
+    whole = first_blocks < last_blocks
+    span_levels = np.frexp(np.maximum(last_blocks - first_blocks, 1))[1] - 1
+    for span_level in np.unique(span_levels[whole]):
+        windows = np.flatnonzero(whole & (span_levels == span_level))
+        for blocks in (first_blocks[windows], last_blocks[windows] - (1 << int(span_level))):
+            if span_level == 0:
+                picked = block_values[:, blocks]
+            else:
+                picked = np.take_along_axis(block_values, level['tables'][span_level][:, blocks], axis=1)
+            best[windows] = reduce(best[windows], picked.T)
+    # Partial blocks at the edges are contiguous slices of under two blocks, which
+    # a reduction per slice reads faster than any gather of all of them at once
+    flat = values.reshape(channels, num_rows)
+    segment_ends = np.where(whole, first_blocks * RANGE_BLOCK, ends)
+    segment_starts = np.where(whole, last_blocks * RANGE_BLOCK, ends)
+    for window in np.flatnonzero(ends > starts):
+        for segment_start, segment_end in ((starts[window], segment_ends[window]), (segment_starts[window], ends[window])):
+            if segment_end > segment_start:
+                best[window] = reduce(best[window], reduce.reduce(flat[:, segment_start:segment_end], axis=1))
+    return best.reshape((len(starts),) + values.shape[:-1])
+
+
+def range_max(index, start_ns, end_ns):
+    """ Returns the maximum of every channel within a time window.
+
+        :param index: Dictionary returned by build_range_index.
+        :param start_ns: Window start time in nanoseconds.
+        :param end_ns: Window end time in nanoseconds, inclusive.
+        :returns: Tuple of (maximum values, sample positions) per channel.
+    """
+    start, end = window_bounds(index, start_ns, end_ns)
+    return range_extreme(index, start, end, 'max')
+
+
+def range_min(index, start_ns, end_ns):
+    """ Returns the minimum of every channel within a time window.
+
+        :param index: Dictionary returned by build_range_index.
+        :param start_ns: Window start time in nanoseconds.
+        :param end_ns: Window end time in nanoseconds, inclusive.
+        :returns: Tuple of (minimum values, sample positions) per channel.
+    """
+    start, end = window_bounds(index, start_ns, end_ns)
+    return range_extreme(index, start, end, 'min')
+
+
+def range_worst(index, start_ns, end_ns, kind='max', channels=None):
+    """ Finds the single most extreme channel of the pack within a time window.
+
+        :param index: Dictionary returned by build_range_index.
+        :param kind: 'max' for the highest reading, 'min' for the lowest.
+        :param channels: Optional number of leading entries (e.g. stacks) to search.
+        :returns: Tuple of (channel index tuple, sample position, value), or
+            None if the window holds no readings.
+    """
+    start, end = window_bounds(index, start_ns, end_ns)
+    extremes, positions = range_extreme(index, start, end, kind)
+    extremes = extremes[:channels]
+    if np.isnan(extremes).all():
+        return None
+    channel = np.unravel_index(
+        np.nanargmax(extremes) if kind == 'max' else np.nanargmin(extremes), extremes.shape)
+    return tuple(int(axis) for axis in channel), int(positions[channel]), float(extremes[channel])
+
+
+def window_amp_hours(index, start_ns, end_ns):
+    """ Returns the charge drawn over time windows, in amp-hours.
+
+        :param index: Dictionary returned by build_window_index.
+    """
+    return window_integral(index, 'current', start_ns, end_ns) / 3600.0
+
+
+def window_kwh(index, start_ns, end_ns):
+    """ Returns the energy drawn over time windows, in kWh.
+
+        :param index: Dictionary returned by build_window_index.
+    """
+    return window_integral(index, 'power', start_ns, end_ns) / 3600.0
+
+
+def overview_summary(data, stacks):
+    """ Computes the figures shown in the Data and Average Stack Voltages frames.
+
+        :param data: Dictionary returned by prepare_data.
+        :param stacks: Number of stacks in use.
+        :returns: List of (name, value, unit) tuples.
+    """
+    avg_stack_voltages = data['avg_cell_voltages'][:stacks].sum(axis=1)
+    summary = [
+        ('Total Pack Voltage', avg_stack_voltages.sum(), 'V'),
+        ('Avg. Cell Voltage', pack_mean(data['voltage_stats']), 'V'),
+        ('Avg. Cell Temp.', pack_mean(data['temp_stats']), '°C'),
+        ('Highest Cell Temp.', np.nanmax(data['temp_stats']['max'][:stacks]), '°C'),
+        ('Average Current', data['current_stats']['mean'][0], 'A'),
+        ('Highest Current', data['current_stats']['max'][0], 'A'),
+    ]
+    for stack_index, voltage in enumerate(avg_stack_voltages):
+        summary.append((f'Stack {stack_index + 1} Avg. Voltage', voltage, 'V'))
+    return [(name, round(float(value), 4), unit) for name, value, unit in summary]
+
+
+def find_runs(mask):
+    """ Run-length encodes the True runs of a boolean array along its last axis.
+
+        :param mask: Boolean array whose last axis holds samples.
+        :returns: Tuple of (leading indices, starts, ends): a tuple of index arrays
+            into the leading axes, and the first and one-past-last sample of
+            every run, ordered by channel and then by time.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    padded = np.zeros(mask.shape[:-1] + (mask.shape[-1] + 2,), dtype=np.int8)
+    padded[..., 1:-1] = mask
+    # Within a channel the changes alternate between a rise and a fall
+    changes = np.nonzero(np.diff(padded, axis=-1))
+    leading = tuple(axis[::2] for axis in changes[:-1])
+    return leading, changes[-1][::2], changes[-1][1::2]
+
+
+def read_lap_times(file_path, reference_ns=None):
+    """ Reads lap start and end times from a CSV or Excel file.
+
+        Rows holding two times are read as (start, end). A single column of
+        times is read as lap boundaries, each lap ending where the next starts.
+        Rows without a time, such as headers, are skipped.
+
+        :param file_path: Path to the lap times file.
+        :param reference_ns: Decoded timestamps of the log, to place 12 hr times.
+        :returns: Tuple of (start, end) int64 arrays in nanoseconds since midnight.
+    """
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        table = pd.read_excel(file_path, header=None, dtype=str)
+    else:
+        table = pd.read_csv(file_path, header=None, dtype=str,
+                            skip_blank_lines=True)
+    rows = []
+    previous = None  # First time of the previous row, which later laps follow
+    for values in table.itertuples(index=False):
+        times = []
+        for value in values:
+            time_ns = parse_clock(value, reference_ns, times[-1] if times else previous)
+            if time_ns is not None:
+                times.append(time_ns)
+        if times:
+            previous = times[0]
+        rows.append(times)
+    pairs = [times[:2] for times in rows if len(times) >= 2]
+    if pairs:
+        starts, ends = np.array(pairs, dtype=np.int64).T
+    else:
+        boundaries = np.array([times[0] for times in rows if times], dtype=np.int64)
+        starts, ends = boundaries[:-1], boundaries[1:]
+    if len(starts) == 0:
+        raise ValueError(f"No lap times found in {file_path}")
+    return starts, ends
+
+
+def detect_laps(timestamps_ns, signal, threshold, min_duration=LAP_MIN_SECONDS, min_gap=LAP_MIN_GAP_SECONDS):
+    """ Detects laps as runs where a signal such as motor RPM or current stays above a threshold.
+
+        :param timestamps_ns: Sorted sample times in nanoseconds.
+        :param signal: Samples of the signal.
+        :param threshold: Level above which the car counts as running.
+        :param min_duration: Shortest lap kept, in seconds.
+        :param min_gap: Dips shorter than this, in seconds, are bridged.
+        :returns: Tuple of (start, end) int64 arrays in nanoseconds.
+    """
+    timestamps_ns = np.asarray(timestamps_ns)
+    _, starts, ends = find_runs(np.asarray(signal) > threshold)
+    if len(starts) > 1:
+        # Merge runs separated by short dips
+        gaps = timestamps_ns[starts[1:]] - timestamps_ns[ends[:-1] - 1]
+        keep = gaps >= min_gap * 1e9
+        starts = starts[np.concatenate(([True], keep))]
+        ends = ends[np.concatenate((keep, [True]))]
+    start_ns = timestamps_ns[starts]
+    end_ns = timestamps_ns[ends - 1]
+    long_enough = end_ns - start_ns >= min_duration * 1e9
+    return start_ns[long_enough], end_ns[long_enough]
+
+
+def lap_stats(data, starts_ns, ends_ns, stacks=None):
+    """ Computes the statistics of every lap from the prepared window and range indexes.
+
+        Sums and integrals come from prefix sums and extremes from the range
+        indexes, looked up for all laps at once, so each lap costs a few lookups
+        however long it is.
+
+        :param data: Dictionary returned by prepare_data.
+        :param starts_ns: Lap start times in nanoseconds.
+        :param ends_ns: Lap end times in nanoseconds.
+        :param stacks: Number of stacks in use, all of them if None.
+        :returns: Dictionary of per-lap arrays keyed like LAP_COLUMNS.
+    """
+    starts_ns = np.asarray(starts_ns, dtype=np.int64)
+    ends_ns = np.asarray(ends_ns, dtype=np.int64)
+    window_index = data['window_index']
+    start, end = window_bounds(window_index, starts_ns, ends_ns)
+    laps = len(starts_ns)
+    has_samples = end > start
+    peak_current = range_extremes(data['current_range_index'], start, end, 'max')[:, 0]
+    voltages = range_extremes(data['voltage_range_index'], start, end, 'min')[:, :stacks]
+    temps = range_extremes(data['temp_range_index'], start, end, 'max')[:, :stacks]
+    min_cell_voltage = np.fmin.reduce(voltages.reshape(laps, -1), axis=1)
+    max_cell_temp = np.fmax.reduce(temps.reshape(laps, -1), axis=1)
+    # Rise of the hottest sensor between the first and last sample of each lap
+    cell_temps = data['cell_temps'][:stacks]
+    first_temps = np.asarray(cell_temps[..., np.where(has_samples, start, 0)], dtype=float).reshape(-1, laps)
+    last_temps = np.asarray(cell_temps[..., np.where(has_samples, end - 1, 0)], dtype=float).reshape(-1, laps)
+    temp_rise = np.where(has_samples, np.fmax.reduce(last_temps, axis=0) - np.fmax.reduce(first_temps, axis=0), np.nan)
+    return {'lap': np.arange(1, laps + 1), 'start': starts_ns, 'end': ends_ns, 'duration': (ends_ns - starts_ns) / 1e9,
+            'avg_current': window_mean(window_index, 'current', starts_ns, ends_ns),
+            'peak_current': peak_current, 'energy': np.where(has_samples, window_kwh(window_index, starts_ns, ends_ns), np.nan),
+            'min_cell_voltage': min_cell_voltage, 'max_cell_temp': max_cell_temp, 'temp_rise': temp_rise}
+
+
+def threshold_runs(index, threshold, kind):
+    """ Finds every run of samples beyond a threshold, scanning only the blocks that can hold one.
+
+        Blocks whose extreme in the range index stays within the threshold are
+        skipped, so the scan costs in proportion to the violating blocks.
+
+        :param index: Dictionary returned by build_range_index.
+        :param threshold: Limit the values must not cross.
+        :param kind: 'min' for runs below the threshold, 'max' for runs above it.
+        :returns: Tuple of (leading indices, starts, ends, extremes) with one
+            entry per run, ordered by channel and then by time.
+    """
+    values = index['values']
+    num_rows = values.shape[-1]
+    block_values = index[kind]['values']
+    rows, blocks = np.nonzero(block_values < threshold if kind == 'min' else block_values > threshold)
+    if len(rows) == 0:
+        empty = np.array([], dtype=np.int64)
+        return tuple(empty for _ in values.shape[:-1]), empty, empty, np.array([])
+    leading = np.unravel_index(rows, values.shape[:-1])
+    # Gather the candidate blocks into a (block, sample) matrix
+    positions = blocks[:, None] * RANGE_BLOCK + np.arange(RANGE_BLOCK)
+    gathered = np.asarray(values[tuple(axis[:, None] for axis in leading) + (np.minimum(positions, num_rows - 1),)],
+                          dtype=float)
+    mask = (gathered < threshold if kind == 'min' else gathered > threshold) & (positions < num_rows)
+    # A separator column after each block joins runs into the next block of the
+    # same channel and splits them everywhere else
+    follows = (rows[1:] == rows[:-1]) & (blocks[1:] == blocks[:-1] + 1)
+    joined = np.zeros(len(rows), dtype=bool)
+    joined[:-1] = follows & mask[:-1, -1] & mask[1:, 0]
+    mask = np.column_stack((mask, joined)).ravel()
+    positions = np.column_stack((positions, np.full(len(rows), -1))).ravel()
+    gathered = np.column_stack((gathered, np.full(len(rows), np.nan))).ravel()
+    _, starts, ends = find_runs(mask)
+    # Extremes of each run from one reduceat over (start, end) pairs
+    reduce = np.fmin if kind == 'min' else np.fmax
+    bounds = np.column_stack((starts, ends)).ravel()
+    extremes = reduce.reduceat(np.append(gathered, np.nan), bounds)[::2]
+    run_rows = starts // (RANGE_BLOCK + 1)
+    return tuple(axis[run_rows] for axis in leading), positions[starts], positions[ends - 1] + 1, extremes
+
+
+def find_violations(index, lower, upper, labels, stacks=None, min_gap=VIOLATION_MIN_GAP_SECONDS):
+    """ Lists the intervals where any channel leaves its [lower, upper] band.
+
+        A channel hovering at a threshold crosses it back and forth, so runs of
+        the same channel separated by less than min_gap are merged into one event.
+
+        :param index: Dictionary returned by build_range_index over (stack, channel, sample) data.
+        :param lower: Lower threshold, e.g. UV or UT.
+        :param upper: Upper threshold, e.g. OV or OT.
+        :param labels: Type names of (lower, upper) violations, e.g. ('UV', 'OV').
+        :param stacks: Number of stacks in use, all of them if None.
+        :param min_gap: Returns within the band shorter than this, in seconds, are bridged.
+        :returns: Dictionary of per-event arrays keyed like VIOLATION_COLUMNS, plus
+            the 'start_index' and 'end_index' samples, ordered by start time.
+    """
+    timestamps_ns = index['timestamps']
+    parts = []
+    for label, threshold, kind in ((labels[0], lower, 'min'), (labels[1], upper, 'max')):
+        (stack, channel), starts, ends, extremes = threshold_runs(index, threshold, kind)
+        if len(starts) > 1:
+            # Runs are ordered by channel and then by time, so bridged runs are adjacent
+            bridged = (stack[1:] == stack[:-1]) & (channel[1:] == channel[:-1]) & \
+                (timestamps_ns[starts[1:]] - timestamps_ns[ends[:-1] - 1] < min_gap * 1e9)
+            firsts = np.flatnonzero(np.concatenate(([True], ~bridged)))
+            lasts = np.append(firsts[1:] - 1, len(starts) - 1)
+            extremes = (np.fmin if kind == 'min' else np.fmax).reduceat(extremes, firsts)
+            stack, channel, starts, ends = stack[firsts], channel[firsts], starts[firsts], ends[lasts]
+        keep = stack < (stacks if stacks is not None else len(index['values']))
+        parts.append((np.full(keep.sum(), label), stack[keep], channel[keep],
+                      starts[keep], ends[keep], extremes[keep]))
+    label, stack, channel, starts, ends, extremes = (np.concatenate(column) for column in zip(*parts))
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    start_ns = timestamps_ns[starts]
+    end_ns = timestamps_ns[ends - 1]
+    return {'type': label[order], 'stack': stack[order], 'channel': channel[order], 'start': start_ns, 'end': end_ns,
+            'duration': (end_ns - start_ns) / 1e9, 'extreme': extremes[order], 'start_index': starts, 'end_index': ends}
+
+
+def violation_events(voltage_index, temp_index, UV, OV, UT, OT, stacks=None, min_gap=VIOLATION_MIN_GAP_SECONDS):
+    """ Lists the voltage and temperature threshold violations of the pack, by start time.
+
+        :param voltage_index: Range index over the cell voltages.
+        :param temp_index: Range index over the cell temperatures.
+        :param stacks: Number of stacks in use, all of them if None.
+        :param min_gap: Returns within the band shorter than this, in seconds, are bridged.
+        :returns: Dictionary of per-event arrays, as returned by find_violations.
+    """
+    voltages = find_violations(voltage_index, UV, OV, ('UV', 'OV'), stacks, min_gap)
+    temps = find_violations(temp_index, UT, OT, ('UT', 'OT'), stacks, min_gap)
+    order = np.argsort(np.concatenate((voltages['start'], temps['start'])), kind='stable')
+    return {name: np.concatenate((voltages[name], temps[name]))[order] for name in voltages}
+
+
+def envelope_indices(y, buckets):
+    """ Picks the samples that keep a series' min/max envelope over equal buckets.
+
+        :param y: 1-D array of samples.
+        :param buckets: Number of buckets, normally one per horizontal pixel.
+        :returns: Sorted indices of the first, last, and each bucket's min and max
+            sample, or every index if the series is already short enough.
+    """
+    num_samples = len(y)
+    if num_samples <= max(2 * buckets, DECIMATE_MIN_POINTS):
+        return np.arange(num_samples)
+    bucket_size = -(-num_samples // buckets)  # Ceiling division
+    full = num_samples // bucket_size * bucket_size
+    rows = np.asarray(y[:full]).reshape(-1, bucket_size)
+    offsets = np.arange(0, full, bucket_size)
+    picks = [[0], offsets + rows.argmin(axis=1), offsets + rows.argmax(axis=1),
+             [num_samples - 1]]
+    if full < num_samples:
+        tail = np.asarray(y[full:])
+        picks.append([full + tail.argmin(), full + tail.argmax()])
+    return np.unique(np.concatenate(picks))
+
+
+def plot_decimated(ax, x, y, **kwargs):
+    """ Plots a series reduced to a per-pixel min/max envelope of the axis.
+
+        Spikes survive because each pixel column keeps its extreme samples, while
+        the number of points drawn depends only on the axis width. With a numeric
+        x-axis the visible range is decimated again whenever it is zoomed, panned
+        or resized. Text x values are plotted by sample position and only used as
+        tick labels, since decimated lines would not share the same categories.
+
+        :param ax: Axes to plot on.
+        :param x: X-axis data.
+        :param y: Y-axis data.
+        :returns: The plotted Line2D; its data can be replaced with set_decimated_data.
+    """
+    x = np.asarray(x)
+    if x.dtype.kind not in 'iuf':
+        labels = x
+        x = np.arange(len(labels))
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(
+            lambda value, pos: labels[int(np.clip(round(value), 0, len(labels) - 1))]))
+    source = {'x': x, 'y': np.asarray(y)}  # Full-resolution data behind the line
+
+    def decimate(start, end):
+        buckets = max(int(ax.get_window_extent().width), 1)
+        indices = start + envelope_indices(source['y'][start:end], buckets)
+        return source['x'][indices], source['y'][indices]
+
+    line, = ax.plot(*decimate(0, len(source['y'])), **kwargs)
+
+    def redecimate(*args):
+        left, right = sorted(ax.get_xlim())
+        # One sample of margin on each side keeps the line running off the edges
+        start = max(int(np.searchsorted(source['x'], left)) - 1, 0)
+        end = int(np.searchsorted(source['x'], right, side='right')) + 1
+        line.set_data(*decimate(start, end))
+    ax.callbacks.connect('xlim_changed', redecimate)
+    ax.figure.canvas.mpl_connect('resize_event', redecimate)
+    line.decimated_source = source
+    line.decimate = decimate
+    return line
+
+
+def set_decimated_data(line, x, y):
+    """ Replaces the data of a line drawn by plot_decimated, keeping its style and callbacks.
+
+        :param line: Line2D returned by plot_decimated with a numeric x-axis.
+        :param x: New X-axis data.
+        :param y: New Y-axis data.
+    """
+    line.decimated_source['x'] = np.asarray(x)
+    line.decimated_source['y'] = np.asarray(y)
+    line.set_data(*line.decimate(0, len(line.decimated_source['y'])))
+
+
+def draw_plot(ax, x, y, x_label, y_label, title, type='', top_lim=None, bot_lim=None):
+    """ Draws data on an axes, without any interactive additions.
+
+        :param ax: Axes to draw on.
+        :param x: X-axis data (e.g., time_axis).
+        :param y: Y-axis data (e.g., cell voltages or temperatures).
+        :param x_label: Label for the X-axis.
+        :param y_label: Label for the Y-axis.
+        :param title: Title of the plot.
+        :returns: List of the plotted lines.
+    """
+    lines = []
+
+    if (type == 'voltages'):
+        if np.ndim(y) == 2:  # If y is (channel, sample) (all cells in a stack)
+            for cell_index, voltage in enumerate(y):
+                line = plot_decimated(ax, x, voltage,
+                                      label=f'Cell {cell_index + 1}')
+                lines.append(line)
+            ax.legend()
+        else:
+            line = plot_decimated(ax, x, y)
+            lines.append(line)
+        ax.set_ylim(bottom=0.0, top=5.0)
+
+    elif (type == 'temps'):
+        if np.ndim(y) == 2:  # If y is (channel, sample) (all cells in a stack)
+            for cell_index, temp in enumerate(y):
+                line = plot_decimated(ax, x, temp,
+                                      label=f'Cell {cell_index + 1}')
+                lines.append(line)
+            ax.legend()
+        else:
+            line = plot_decimated(ax, x, y)
+            lines.append(line)
+        ax.set_ylim(bottom=0.0, top=60.0)
+
+    else:
+        line = plot_decimated(ax, x, y)
+        lines.append(line)
+        ax.set_ylim(bottom=bot_lim, top=top_lim)
+
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.xaxis.set_major_locator(ticker.AutoLocator())
+    ax.xaxis.set_major_formatter(clock_formatter())
+    ax.xaxis.set_minor_locator(ticker.AutoLocator())
+    ax.set_title(title)
+    ax.grid(True)
+    return lines
+
+
+def share_array(array, shared):
+    """ Describes an array so worker processes can map it instead of receiving a pickled copy.
+
+        Arrays memory-mapped from the sidecar cache are reopened from their file;
+        anything else is copied once into shared memory.
+
+        :param array: Array to share.
+        :param shared: List collecting the SharedMemory blocks the caller must release.
+        :returns: Small picklable descriptor for attach_array.
+    """
+    if isinstance(array, np.memmap) and array.filename and os.path.exists(array.filename):
+        mapped = np.load(array.filename, mmap_mode='r')
+        if mapped[..., :array.shape[-1]].shape == array.shape and mapped.dtype == array.dtype:
+            return ('npy', array.filename, array.shape[-1])
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    shared.append(block)
+    return ('shm', block.name, array.shape, array.dtype.str)
+
+
+def attach_array(descriptor):
+    """ Maps an array described by share_array in a worker process.
+
+        Mappings are kept for the life of the worker, so every task after the
+        first one reuses them.
+
+        :param descriptor: Descriptor returned by share_array.
+        :returns: Read-only view of the shared array.
+    """
+    if descriptor not in attached_arrays:
+        if descriptor[0] == 'npy':
+            _, path, rows = descriptor
+            attached_arrays[descriptor] = (np.load(path, mmap_mode='r')[..., :rows], None)
+        else:
+            _, name, shape, dtype = descriptor
+            block = shared_memory.SharedMemory(name=name)
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            array.flags.writeable = False
+            attached_arrays[descriptor] = (array, block)
+    return attached_arrays[descriptor][0]
+
+
+def init_export_worker():
+    """ Switches a graph export worker process to the non-interactive Agg backend. """
+    plt.switch_backend('Agg')
+    plt.style.use(PLOT_STYLE)
+
+
+def export_graph(x_descriptor, y_descriptor, index, x_label, y_label, title, type, output_path):
+    """ Renders one graph to a PNG file in a worker process, without cursors.
+
+        :param x_descriptor: Shared x-axis data, from share_array.
+        :param y_descriptor: Shared y-axis data, from share_array.
+        :param index: Index into the first axis of the y-axis data.
+        :param output_path: PNG file to write.
+        :returns: output_path.
+    """
+    x = attach_array(x_descriptor)
+    y = attach_array(y_descriptor)[index]
+    fig, ax = plt.subplots()
+    draw_plot(ax, x, y, x_label, y_label, title, type)
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
+
+
+def export_graphs(x, y, indices, x_label, y_label, titles, type, output_paths, progress=None, max_workers=None):
+    """ Renders graphs in parallel worker processes on the Agg backend.
+
+        :param x: X-axis data shared by all graphs.
+        :param y: Array whose first axis selects the data of each graph.
+        :param indices: Indices into y to render.
+        :param titles: Title of each graph, in the order of indices.
+        :param output_paths: PNG file of each graph, in the order of indices.
+        :param progress: Optional callable taking (graphs done, total graphs); it
+            may raise LoadCancelled to stop exporting.
+        :param max_workers: Number of worker processes, EXPORT_WORKERS if None.
+        :returns: List of the written file names.
+    """
+    shared = []
+    written = []
+    try:
+        x_descriptor = share_array(np.asarray(x), shared)
+        y_descriptor = share_array(y, shared)
+        with ProcessPoolExecutor(max_workers=max_workers or EXPORT_WORKERS, initializer=init_export_worker) as pool:
+            futures = [pool.submit(export_graph, x_descriptor, y_descriptor, index, x_label, y_label, title, type, output_path)
+                       for index, title, output_path in zip(indices, titles, output_paths)]
+            try:
+                for future in as_completed(futures):
+                    written.append(future.result())
+                    if progress is not None:
+                        progress(len(written), len(futures))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        for block in shared:
+            block.close()
+            block.unlink()
+    return written
+
+
+def calc_temp(raw_temp):
+    """ Calculates the temperature in Celsius from the raw temperature value.
+
+        :param raw_temp: Raw temperature value.
+        :returns: Temperature in Celsius.
+    """
+    raw_temp = np.asarray(raw_temp, dtype=float)
+    r_inf = 10000 * np.exp(-3435 / 298.15)
+    R = raw_temp / (3.0 - (raw_temp * 0.0001))  # Calculate resistance
+    return ((3435 / np.log(R / r_inf)) - 273.15)  # Convert to Celsius
+
+
+def calc_curr(raw_curr):
+    """ Calculates the current in Amperes from the raw current value.
+
+        :param raw_curr: Raw current value.
+        :returns: Current in Amperes.
+    """
+    # Assuming raw_curr is in mA, convert to A
+    raw_curr = np.asarray(raw_curr, dtype=float)
+    voltage = raw_curr * 5.0 / 1023.0
+    current = ((voltage - 2.4929) / 0.0057)
+    return current
+
+
+def calc_radiator_temp(raw_radiator_temp):
+    """ Calculates radiator temperature from a raw sensor value.
+
+        :param raw_radiator_temp: Raw radiator temperature value.
+        :returns: Radiator temperature in Celsius.
+    """
+    raw_radiator_temp = np.asarray(raw_radiator_temp, dtype=float)
+    clamped = np.clip(raw_radiator_temp, 0.0, 5000.0)
+    radiator_temp = -55.0 + (clamped / 5000.0) * 180.0
+    return radiator_temp
+
+
+def calc_motor_temp(raw_motor_temp):
+    """ Calculates motor temperature from a raw sensor value.
+
+        :param raw_motor_temp: Raw motor temperature value.
+        :returns: Motor temperature in Celsius.
+    """
+    raw_motor_temp = np.asarray(raw_motor_temp, dtype=float)
+    # EMRAX motor temperature regression model
+    p1 = -1.387e-16
+    p2 = 3.164e-11
+    p3 = -1.009e-06
+    p4 = 0.027410
+    p5 = -196.9
+    motor_temp = (
+        p1 * (raw_motor_temp ** 4)
+        + p2 * (raw_motor_temp ** 3)
+        + p3 * (raw_motor_temp ** 2)
+        + p4 * raw_motor_temp
+        + p5
+    )
+    return motor_temp
+
+
+def calc_igbt_temp(raw_igbt_temp):
+    """ Calculates IGBT temperature from a raw sensor value.
+
+        :param raw_igbt_temp: Raw IGBT temperature value.
+        :returns: IGBT temperature in Celsius.
+    """
+    raw_igbt_temp = np.asarray(raw_igbt_temp, dtype=float)
+    p1 = -2.8e-15
+    p2 = 3.375e-10
+    p3 = -1.426e-05
+    p4 = 0.26510
+    p5 = -1810
+    igbt_temp = (
+        p1 * (raw_igbt_temp ** 4)
+        + p2 * (raw_igbt_temp ** 3)
+        + p3 * (raw_igbt_temp ** 2)
+        + p4 * raw_igbt_temp
+        + p5
+    )
+    return igbt_temp
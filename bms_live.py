@@ -0,0 +1,799 @@
+# Headless live serial pipeline used by BMS-GUI_V7:
+# serial port discovery, frame parsing, live history, recording, and the acquisition
+# and replay processes, without Tk.
+
+# LIBRARIES
+import os
+import time
+import queue
+from threading import Thread
+from multiprocessing import Process, shared_memory
+import numpy as np
+import matplotlib.pyplot as plt
+import serial
+from serial.tools import list_ports
+from bms_core import (DEFAULT_CELLS, DEFAULT_TEMPS, TIMESTAMP_COL, LAST_CELL_DATA_COL, CURR_COL, RIGHT_RADIATOR_COL,
+                      calc_curr, calc_temp, cell_columns, decode_timestamps, load_raw_columns)
+
+# Names shared through `from bms_live import *`; module state stays private
+__all__ = ['BAUD_RATE', 'DONGLE_IDS', 'PORT_CACHE_SECONDS', 'PORT_POLL_SECONDS', 'FRAME_FIELDS', 'FRAME_WIDTHS',
+           'FRAME_SEPARATOR', 'FRAME_CHECKSUM', 'FRAME_MAX_BYTES', 'LIVE_CAPACITY', 'LIVE_WINDOW_SECONDS',
+           'LIVE_SERIES', 'LIVE_PLOTS', 'COUNTERS', 'COUNT', 'MALFORMED', 'DROPPED', 'STOP', 'RECORDED', 'SPEED',
+           'PAUSED', 'SEEK', 'POSITION', 'START', 'END', 'ACQUIRE_TIMEOUT', 'STOP_TIMEOUT', 'RECORD_DIRECTORY',
+           'RECORD_SYNC_SECONDS', 'RECORD_ROTATE_ROWS', 'RECORD_QUEUE_FRAMES', 'REPLAY_SPEEDS', 'REPLAY_TICK_SECONDS',
+           'describe_port', 'scan_serial_ports', 'list_serial_ports', 'find_dongle', 'format_port',
+           'create_frame_reader', 'frame_checksum', 'parse_frame', 'feed_bytes', 'read_frames', 'frame_layout',
+           'history_shapes', 'create_history', 'create_shared_history', 'attach_history', 'release_history',
+           'append_frame', 'history_window', 'live_series', 'latest_frame', 'create_live_plots',
+           'capture_live_background', 'draw_live_plots', 'format_record_time', 'open_recorder', 'start_recording_file',
+           'record_frame', 'sync_recorder', 'close_recorder', 'write_records', 'start_recorder', 'queue_record',
+           'stop_recorder', 'acquire', 'start_acquisition', 'stop_acquisition', 'replay', 'start_replay',
+           'set_replay_speed', 'pause_replay', 'seek_replay']
+
+# CONSTANTS
+BAUD_RATE = 115200  # Baud rate of the BMS serial link
+# USB (VID, PID) of the serial adapters the BMS dongle is built on: FTDI FT232R, CP210x, CH340
+DONGLE_IDS = ((0x0403, 0x6001), (0x10C4, 0xEA60), (0x1A86, 0x7523))
+PORT_CACHE_SECONDS = 2.0  # Age up to which a port listing is reused
+PORT_POLL_SECONDS = 1.0  # Interval at which the GUI's port watcher thread lists the ports for hot-plugged adapters
+# Values per live frame: the raw datalogger columns after the timestamp, cell data to right radiator
+FRAME_FIELDS = RIGHT_RADIATOR_COL - TIMESTAMP_COL
+# Accepted values per frame: cell data only, or the full datalogger row; missing columns are NaN
+FRAME_WIDTHS = (LAST_CELL_DATA_COL - TIMESTAMP_COL, FRAME_FIELDS)
+FRAME_SEPARATOR = b','  # Separator of the values of a frame; surrounding spaces are ignored
+FRAME_CHECKSUM = False  # Reject frames without a trailing *HH checksum; present ones are always checked
+FRAME_MAX_BYTES = 8192  # Longest line kept while waiting for its newline
+LIVE_CAPACITY = 4096  # Frames of live history kept, about 80 s at 50 frames/s
+LIVE_WINDOW_SECONDS = 60.0  # History shown by the live plots
+# Derived series stored after the frame values in the live history, in row order
+LIVE_SERIES = ('pack_voltage', 'current', 'max_temp')
+# Title, unit and initial y-axis limits of the live plot of each LIVE_SERIES
+LIVE_PLOTS = (('Pack Voltage', 'V', 270, 453.6), ('Current', 'A', -50, 50), ('Max. Cell Temp.', '°C', 10, 45))
+COUNTERS = 11  # Shared counters of a live history, indexed by the constants below
+COUNT = 0  # Frames appended, which is also the sequence number of the newest frame
+MALFORMED = 1  # Lines rejected by the frame reader of the acquisition process
+# Over-long lines discarded by the frame reader, plus frames the recorder could not keep up with or write
+DROPPED = 2
+STOP = 3  # Set by the GUI to stop the acquisition process
+RECORDED = 4  # Frames written to disk by the acquisition process
+SPEED = 5  # Replay speed, in percent of real time
+PAUSED = 6  # Set to pause a replay
+SEEK = 7  # Log time a replay should jump to, in ns since midnight, or -1
+POSITION = 8  # Log time a replay has reached, in ns since midnight
+START = 9  # Log time of the first frame of a replay, in ns since midnight
+END = 10  # Log time of the last frame of a replay, in ns since midnight
+ACQUIRE_TIMEOUT = 0.1  # Serial read timeout of the acquisition process, bounding how long a stop takes
+STOP_TIMEOUT = 5.0  # Time a stopped acquisition process gets to write out its queued recording before it is killed
+# Default directory of recorded live sessions, in the user's home rather than the working directory
+RECORD_DIRECTORY = os.path.join(os.path.expanduser('~'), 'BMS-GUI', 'recordings')
+RECORD_SYNC_SECONDS = 5.0  # Interval at which recordings are flushed and synced to disk
+RECORD_ROTATE_ROWS = 180000  # Frames per recording file, one hour at 50 frames/s
+RECORD_QUEUE_FRAMES = 5000  # Frames queued for the recording thread before new ones are dropped, 100 s at 50 frames/s
+REPLAY_SPEEDS = (1, 2, 5, 10, 20, 50)  # Selectable replay speeds, as multiples of real time
+REPLAY_TICK_SECONDS = 0.01  # Interval at which a replay hands due frames to the live history
+
+
+# GLOBAL VARIABLES
+port_cache = {'time': None, 'ports': []}  # Last port listing and when it was taken
+
+
+# FUNCTIONS
+
+def describe_port(port):
+    """ Summarises a port found by pyserial.
+
+        :param port: ListPortInfo returned by serial.tools.list_ports.comports.
+        :returns: Dictionary of 'device', 'description', 'vid', 'pid', 'serial_number' and 'dongle'.
+    """
+    return {'device': port.device, 'description': port.description, 'vid': port.vid, 'pid': port.pid,
+            'serial_number': port.serial_number, 'dongle': (port.vid, port.pid) in DONGLE_IDS}
+
+
+def scan_serial_ports():
+    """ Lists the serial ports of the system from the OS device listing, without opening any or
+        touching the shared listing, so it may be called from any thread.
+
+        :returns: List of port dictionaries as returned by describe_port, BMS dongles first.
+    """
+    ports = [describe_port(port) for port in list_ports.comports()]
+    return sorted(ports, key=lambda port: (not port['dongle'], port['device']))
+
+
+def list_serial_ports(max_age=PORT_CACHE_SECONDS):
+    """ Lists the serial ports of the system, reusing a recent listing.
+
+        :param max_age: Seconds a previous listing may be reused for; 0 always lists again.
+        :returns: List returned by scan_serial_ports.
+    """
+    now = time.monotonic()
+    if port_cache['time'] is None or now - port_cache['time'] > max_age:
+        port_cache['ports'] = scan_serial_ports()
+        port_cache['time'] = now
+    return port_cache['ports']
+
+
+def find_dongle(ports):
+    """ Picks the port of the BMS dongle.
+
+        :param ports: List returned by list_serial_ports.
+        :returns: Device name of the first dongle, or None if there is none.
+    """
+    for port in ports:
+        if port['dongle']:
+            return port['device']
+    return None
+
+
+def format_port(port):
+    """ Formats a port for display.
+
+        :param port: Dictionary returned by describe_port.
+        :returns: Device name, description and USB VID:PID when known.
+    """
+    text = f"{port['device']} - {port['description']}"
+    if port['vid'] is not None:
+        text += f" [{port['vid']:04X}:{port['pid']:04X}]"
+    return text
+
+
+def create_frame_reader(fields=FRAME_FIELDS, checksum=FRAME_CHECKSUM, widths=FRAME_WIDTHS):
+    """ Creates the state of a frame reader.
+
+        :param fields: Number of values of a parsed frame.
+        :param checksum: Whether frames without a checksum are rejected.
+        :param widths: Numbers of values a frame may have; narrower frames are padded with NaN up to fields.
+        :returns: Dictionary holding the receive 'buffer', the preallocated 'frame'
+            array and the 'frames', 'malformed' and 'dropped' counters.
+    """
+    return {'buffer': bytearray(), 'frame': np.zeros(fields), 'fields': fields, 'checksum': checksum,
+            'widths': frozenset(width for width in widths if width <= fields), 'frames': 0, 'malformed': 0,
+            'dropped': 0}
+
+
+def frame_checksum(payload):
+    """ Computes the checksum of a frame: the XOR of all its bytes, as in NMEA sentences.
+
+        :param payload: Bytes of the frame before the '*'.
+        :returns: Checksum as an integer from 0 to 255.
+    """
+    return int(np.bitwise_xor.reduce(np.frombuffer(payload, dtype=np.uint8), initial=0))
+
+
+def parse_frame(reader, line):
+    """ Checks the framing of a line and parses its values into reader['frame'].
+
+        :param reader: Dictionary returned by create_frame_reader.
+        :param line: One line of bytes, without its newline.
+        :returns: True if the line is a valid frame, in which case reader['frame'] holds its values.
+    """
+    payload, star, check = line.strip().partition(b'*')
+    if star:
+        try:
+            valid = int(check, 16) == frame_checksum(payload)
+        except ValueError:
+            valid = False
+        if not valid:
+            return False
+    elif reader['checksum']:
+        return False
+    fields = payload.split(FRAME_SEPARATOR)
+    width = len(fields)
+    if width not in reader['widths']:
+        return False
+    try:
+        reader['frame'][:width] = fields
+    except ValueError:
+        return False
+    reader['frame'][width:] = np.nan
+    return True
+
+
+def feed_bytes(reader, data, on_frame):
+    """ Adds received bytes to the reader and handles every complete line in them.
+
+        Only whole, well-formed lines are passed on, so a partial or garbled line is
+        counted as malformed instead of shifting the values of the frame.
+
+        :param reader: Dictionary returned by create_frame_reader.
+        :param data: Received bytes.
+        :param on_frame: Called with reader['frame'] for every valid frame; the array is
+            reused, so it has to be copied to be kept.
+    """
+    buffer = reader['buffer']
+    buffer += data
+    start = 0
+    end = buffer.find(b'\n')
+    while end != -1:
+        if end > start:
+            if parse_frame(reader, bytes(buffer[start:end])):
+                reader['frames'] += 1
+                on_frame(reader['frame'])
+            else:
+                reader['malformed'] += 1
+        start = end + 1
+        end = buffer.find(b'\n', start)
+    del buffer[:start]
+    if len(buffer) > FRAME_MAX_BYTES:
+        # No newline for too long: discard the line rather than grow without bound
+        reader['dropped'] += 1
+        buffer.clear()
+
+
+def read_frames(serial_port, reader, on_frame):
+    """ Reads everything the serial port has received and handles the complete frames in it.
+
+        Blocks for up to the port timeout when nothing has been received.
+
+        :param serial_port: Open serial.Serial port.
+        :param reader: Dictionary returned by create_frame_reader.
+        :param on_frame: Called with reader['frame'] for every valid frame.
+    """
+    feed_bytes(reader, serial_port.read(serial_port.in_waiting or 1), on_frame)
+
+
+def frame_layout(cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS):
+    """ Finds where the values of a live frame are.
+
+        :param cells: Number of cells per stack.
+        :param temps: Number of temperature sensors per stack.
+        :returns: Dictionary of (stack, channel) 'voltages' and 'temps' index arrays
+            into the frame, and the index of the raw 'current'.
+    """
+    # Frames start at the column after the timestamp, one raw column later than the raw matrix
+    voltage_cols, temp_cols = cell_columns(TIMESTAMP_COL, FRAME_FIELDS + 1, cells, temps)
+    return {'voltages': np.array(voltage_cols) - 1, 'temps': np.array(temp_cols) - 1,
+            'current': CURR_COL - TIMESTAMP_COL - 1}
+
+
+def history_shapes(capacity, fields):
+    """ Gives the shape and type of every array of a live history.
+
+        :param capacity: Number of frames kept.
+        :param fields: Number of values per frame.
+        :returns: Dictionary of (shape, dtype) by array name.
+    """
+    return {'values': ((fields + len(LIVE_SERIES), capacity), np.float32), 'times': ((capacity,), np.float64),
+            'sequences': ((capacity,), np.int64), 'counters': ((COUNTERS,), np.int64)}
+
+
+def create_history(capacity=LIVE_CAPACITY, fields=FRAME_FIELDS, blocks=None):
+    """ Creates a fixed-capacity circular buffer of live frames.
+
+        :param capacity: Number of frames kept.
+        :param fields: Number of values per frame.
+        :param blocks: Optional dictionary of SharedMemory blocks by array name to
+            place the arrays in, as made by create_shared_history.
+        :returns: Dictionary of the (channel, capacity) float32 'values', with the frame
+            values followed by the LIVE_SERIES rows, the receive 'times', the
+            'sequences' of the frame in each slot and the shared 'counters'.
+    """
+    history = {'fields': fields}
+    for name, (shape, dtype) in history_shapes(capacity, fields).items():
+        if blocks is None:
+            history[name] = np.zeros(shape, dtype=dtype)
+        else:
+            history[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return history
+
+
+def create_shared_history(capacity=LIVE_CAPACITY, fields=FRAME_FIELDS):
+    """ Creates a live history in shared memory, for an acquisition process to fill.
+
+        :param capacity: Number of frames kept.
+        :param fields: Number of values per frame.
+        :returns: Tuple of the history, the SharedMemory blocks the caller must
+            release with release_history, and a picklable descriptor for attach_history.
+    """
+    blocks = {}
+    for name, (shape, dtype) in history_shapes(capacity, fields).items():
+        blocks[name] = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+    history = create_history(capacity, fields, blocks)
+    for name in blocks:
+        history[name][...] = 0
+    descriptor = (capacity, fields, {name: block.name for name, block in blocks.items()})
+    return history, blocks, descriptor
+
+
+def attach_history(descriptor):
+    """ Maps a live history made by create_shared_history in another process.
+
+        :param descriptor: Descriptor returned by create_shared_history.
+        :returns: Tuple of the history and its SharedMemory blocks, to close when done.
+    """
+    capacity, fields, names = descriptor
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, block_name in names.items()}
+    return create_history(capacity, fields, blocks), blocks
+
+
+def release_history(history, blocks, unlink=True):
+    """ Unmaps a shared live history.
+
+        :param history: History using the blocks; its arrays must not be used afterwards.
+        :param blocks: Dictionary of SharedMemory blocks.
+        :param unlink: Whether to free the memory as well, done by the process that created it.
+    """
+    for name in blocks:
+        history.pop(name, None)
+    for block in blocks.values():
+        block.close()
+        if unlink:
+            block.unlink()
+
+
+def append_frame(history, layout, frame, received):
+    """ Appends a frame and its derived series to the live history, overwriting the oldest frame.
+
+        Costs the same whatever the capacity, and allocates nothing of the history's size.
+        The slot's sequence number and the count are written last, so a reader in
+        another process never takes a half-written frame for a whole one.
+
+        :param history: Dictionary returned by create_history.
+        :param layout: Dictionary returned by frame_layout.
+        :param frame: Values of the frame.
+        :param received: Receive time of the frame, in seconds.
+    """
+    count = int(history['counters'][COUNT])
+    column = count % history['times'].shape[0]
+    fields = history['fields']
+    values = history['values']
+    history['sequences'][column] = 0
+    values[:fields, column] = frame
+    values[fields, column] = frame[layout['voltages']].sum()
+    values[fields + 1, column] = calc_curr(frame[layout['current']])
+    values[fields + 2, column] = calc_temp(frame[layout['temps']]).max()
+    history['times'][column] = received
+    history['sequences'][column] = count + 1
+    history['counters'][COUNT] = count + 1
+
+
+def history_window(history, seconds=LIVE_WINDOW_SECONDS, count=None):
+    """ Gets the most recent frames of the live history, oldest first.
+
+        Frames overwritten while they were being copied are left out.
+
+        :param history: Dictionary returned by create_history.
+        :param seconds: Span of history returned, ending at the newest frame.
+        :param count: Sequence number of the newest frame to return, the current count if None.
+        :returns: Tuple of the receive times, the (channel, frame) values and the
+            sequence numbers of the frames.
+    """
+    capacity = history['times'].shape[0]
+    if count is None:
+        count = int(history['counters'][COUNT])
+    first = max(count - capacity, 0)
+    order = np.arange(first, count) % capacity
+    times = history['times'][order]
+    # Only the slice inside the window is copied out of the buffer
+    start = int(np.searchsorted(times, times[-1] - seconds)) if count else 0
+    order = order[start:]
+    values = history['values'][:, order]
+    sequences = history['sequences'][order]
+    valid = sequences == np.arange(first + start, count) + 1
+    return times[start:][valid], values[:, valid], sequences[valid]
+
+
+def live_series(history, values, name):
+    """ Gets one of the derived LIVE_SERIES rows of values returned by history_window.
+
+        :param history: Dictionary returned by create_history.
+        :param values: Values returned by history_window.
+        :param name: One of LIVE_SERIES.
+        :returns: The series.
+    """
+    return values[history['fields'] + LIVE_SERIES.index(name)]
+
+
+def latest_frame(history):
+    """ Gets the newest frame of the live history.
+
+        :param history: Dictionary returned by create_history.
+        :returns: Tuple of the sequence number and a copy of the frame values,
+            or (0, None) if nothing has been appended yet.
+    """
+    while True:
+        count = int(history['counters'][COUNT])
+        if count == 0:
+            return 0, None
+        column = (count - 1) % history['times'].shape[0]
+        frame = history['values'][:history['fields'], column].copy()
+        if history['sequences'][column] == count:
+            return count, frame
+
+
+def create_live_plots():
+    """ Creates the live plots of LIVE_PLOTS, one axes per series, with animated lines for blitting.
+
+        :returns: Dictionary of the 'fig', 'axes', 'lines' and saved 'background',
+            which is taken on the first draw_live_plots.
+    """
+    fig, axes = plt.subplots(len(LIVE_PLOTS), 1, figsize=(9, 7), sharex=True)
+    lines = []
+    for ax, (title, unit, bottom, top) in zip(axes, LIVE_PLOTS):
+        lines.append(ax.plot([], [], animated=True)[0])
+        ax.set_title(title)
+        ax.set_ylabel(unit)
+        ax.set_xlim(-LIVE_WINDOW_SECONDS, 0)
+        ax.set_ylim(bottom, top)
+        ax.grid(True)
+    axes[-1].set_xlabel('Time (s)')
+    fig.tight_layout()
+    return {'fig': fig, 'axes': axes, 'lines': lines, 'background': None}
+
+
+def capture_live_background(plots):
+    """ Keeps the live plots as drawn without their animated lines, for blitting.
+
+        Connect it to the 'draw_event' of the canvas so resizes recapture it.
+
+        :param plots: Dictionary returned by create_live_plots.
+    """
+    plots['background'] = plots['fig'].canvas.copy_from_bbox(plots['fig'].bbox)
+
+
+def draw_live_plots(plots, history, count):
+    """ Redraws the lines of the live plots by blitting them over the saved background.
+
+        The axes are only redrawn in full when a series leaves its y-axis limits.
+
+        :param plots: Dictionary returned by create_live_plots.
+        :param history: Shared live history.
+        :param count: Sequence number of the newest frame to show.
+    """
+    times, values, _ = history_window(history, count=count)
+    if len(times) == 0:
+        return
+    times = times - times[-1]
+    canvas = plots['fig'].canvas
+    redraw = plots['background'] is None
+    for ax, line, name in zip(plots['axes'], plots['lines'], LIVE_SERIES):
+        series = live_series(history, values, name)
+        line.set_data(times, series)
+        bottom, top = ax.get_ylim()
+        low, high = float(series.min()), float(series.max())
+        if low < bottom or high > top:
+            margin = max(high - low, 1.0) * 0.1
+            ax.set_ylim(min(bottom, low - margin), max(top, high + margin))
+            redraw = True
+    if redraw:
+        canvas.draw()
+        capture_live_background(plots)
+    canvas.restore_region(plots['background'])
+    for ax, line in zip(plots['axes'], plots['lines']):
+        ax.draw_artist(line)
+    canvas.blit(plots['fig'].bbox)
+
+
+def format_record_time(received):
+    """ Formats a receive time as the datalogger writes its timestamps.
+
+        :param received: Time in seconds since the epoch.
+        :returns: Local time as 'YYYY-MM-DD hh:mm:ss.ffffff AM'.
+    """
+    seconds = int(received)
+    clock = time.localtime(seconds)
+    micros = min(int((received - seconds) * 1e6), 999999)
+    return time.strftime('%Y-%m-%d %I:%M:%S', clock) + f'.{micros:06d} ' + time.strftime('%p', clock)
+
+
+def open_recorder(directory=RECORD_DIRECTORY, fields=FRAME_FIELDS):
+    """ Creates the state of a recorder writing live frames to CSV files in the datalogger layout.
+
+        Recordings are named like the 12hrF logs, so they open in BMS-GUI_V6_12hrF
+        and bms_report.py as they are.
+
+        :param directory: Directory to write the recordings to; created if missing.
+        :param fields: Number of values per frame.
+        :returns: Dictionary of the recorder state; the first file is opened on the first frame.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return {'directory': directory, 'fields': fields, 'file': None, 'path': None, 'paths': [],
+            'rows': 0, 'synced': 0.0}
+
+
+def start_recording_file(recorder, received):
+    """ Closes the current recording file and starts the next one, with the datalogger's two header lines.
+
+        :param recorder: Dictionary returned by open_recorder.
+        :param received: Receive time of the first frame of the file, in seconds.
+    """
+    close_recorder(recorder)
+    name = time.strftime('live_%Y-%m-%d_%H-%M-%S', time.localtime(received))
+    path = os.path.join(recorder['directory'], f'{name}_{len(recorder["paths"]) + 1:03d}_12hrF.csv')
+    recorder['file'] = open(path, 'w', newline='')
+    recorder['file'].write(','.join(['Time'] + [f'C{i}' for i in range(1, recorder['fields'] + 1)]) + '\n')
+    recorder['file'].write(','.join(['raw'] * (recorder['fields'] + 1)) + '\n')
+    recorder['path'] = path
+    recorder['paths'].append(path)
+    recorder['rows'] = 0
+    recorder['synced'] = received
+
+
+def record_frame(recorder, frame, received):
+    """ Appends a frame to the current recording file, rotating and syncing it as configured.
+
+        :param recorder: Dictionary returned by open_recorder.
+        :param frame: Values of the frame.
+        :param received: Receive time of the frame, in seconds.
+    """
+    if recorder['file'] is None or recorder['rows'] >= RECORD_ROTATE_ROWS:
+        start_recording_file(recorder, received)
+    # repr round-trips every value exactly as it was received
+    recorder['file'].write(format_record_time(received) + ',' + ','.join(map(repr, frame.tolist())) + '\n')
+    recorder['rows'] += 1
+    if received - recorder['synced'] >= RECORD_SYNC_SECONDS:
+        sync_recorder(recorder)
+        recorder['synced'] = received
+
+
+def sync_recorder(recorder):
+    """ Flushes the current recording file and syncs it to disk.
+
+        :param recorder: Dictionary returned by open_recorder.
+    """
+    if recorder['file'] is not None:
+        recorder['file'].flush()
+        os.fsync(recorder['file'].fileno())
+
+
+def close_recorder(recorder):
+    """ Syncs and closes the current recording file.
+
+        :param recorder: Dictionary returned by open_recorder.
+    """
+    if recorder['file'] is not None:
+        sync_recorder(recorder)
+        recorder['file'].close()
+        recorder['file'] = None
+
+
+def write_records(recorder, counters):
+    """ Writes queued frames to the recording files until the None that ends a recording.
+
+        Runs in the recording thread, so formatting, syncing and rotating files never
+        hold up the serial read loop. After a write error the rest of the frames are
+        only counted as dropped.
+
+        :param recorder: Dictionary returned by start_recorder.
+        :param counters: Counters of the live history; RECORDED is updated here.
+    """
+    failed = False
+    while True:
+        item = recorder['queue'].get()
+        if item is None:
+            break
+        if failed:
+            recorder['dropped'] += 1
+            continue
+        try:
+            record_frame(recorder, *item)
+            counters[RECORDED] += 1
+        except OSError as e:
+            print(f"Error writing recording {recorder['path']}: {e}")
+            failed = True
+            recorder['dropped'] += 1
+    try:
+        close_recorder(recorder)
+    except OSError as e:
+        print(f"Error closing recording {recorder['path']}: {e}")
+
+
+def start_recorder(directory, fields, counters):
+    """ Opens a recorder and starts its recording thread.
+
+        :param directory: Directory to write the recordings to; created if missing.
+        :param fields: Number of values per frame.
+        :param counters: Counters of the live history; RECORDED is updated by the thread.
+        :returns: Dictionary of the recorder state, with its frame 'queue', 'thread' and 'dropped' count.
+    """
+    recorder = open_recorder(directory, fields)
+    recorder['queue'] = queue.Queue(RECORD_QUEUE_FRAMES)
+    recorder['dropped'] = 0
+    recorder['thread'] = Thread(target=write_records, args=(recorder, counters), daemon=True)
+    recorder['thread'].start()
+    return recorder
+
+
+def queue_record(recorder, frame, received):
+    """ Hands a frame to the recording thread, dropping it if the thread has fallen too far behind.
+
+        :param recorder: Dictionary returned by start_recorder.
+        :param frame: Values of the frame; copied, as the frame reader reuses its buffer.
+        :param received: Receive time of the frame, in seconds.
+    """
+    try:
+        recorder['queue'].put_nowait((frame.copy(), received))
+    except queue.Full:
+        recorder['dropped'] += 1
+
+
+def stop_recorder(recorder):
+    """ Lets the recording thread write the frames still queued, then waits for it to close the file.
+
+        :param recorder: Dictionary returned by start_recorder.
+    """
+    recorder['queue'].put(None)
+    recorder['thread'].join()
+
+
+def acquire(port, descriptor, cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS, baud_rate=BAUD_RATE, record_directory=None,
+            widths=FRAME_WIDTHS):
+    """ Reads and parses frames from a serial port into a shared live history until told to stop.
+
+        Runs in its own process, so reading keeps up with the port however busy the GUI is.
+        Frames are recorded by a thread of that process, so disk stalls do not block reading either.
+
+        :param port: Serial port to open.
+        :param descriptor: Descriptor returned by create_shared_history.
+        :param cells: Number of cells per stack.
+        :param temps: Number of temperature sensors per stack.
+        :param baud_rate: Baud rate of the port.
+        :param record_directory: Directory to record every frame to, or None to not record.
+        :param widths: Numbers of values a frame may have, as for create_frame_reader.
+    """
+    history, blocks = attach_history(descriptor)
+    counters = history['counters']
+    reader = create_frame_reader(history['fields'], widths=widths)
+    layout = frame_layout(cells, temps)
+    recorder = start_recorder(record_directory, history['fields'], counters) if record_directory else None
+
+    def on_frame(frame):
+        received = time.time()
+        append_frame(history, layout, frame, received)
+        if recorder is not None:
+            queue_record(recorder, frame, received)
+
+    try:
+        serial_port = serial.Serial(port, baud_rate, timeout=ACQUIRE_TIMEOUT)
+    except serial.SerialException as e:
+        print(f"Could not open serial port {port}: {e}")
+        if recorder is not None:
+            stop_recorder(recorder)
+        release_history(history, blocks, unlink=False)
+        return
+    try:
+        while not counters[STOP]:
+            read_frames(serial_port, reader, on_frame)
+            counters[MALFORMED] = reader['malformed']
+            counters[DROPPED] = reader['dropped'] + (recorder['dropped'] if recorder is not None else 0)
+    except (serial.SerialException, OSError) as e:
+        print(f"Error reading from serial port: {e}")
+    finally:
+        serial_port.close()
+        if recorder is not None:
+            stop_recorder(recorder)
+            counters[DROPPED] = reader['dropped'] + recorder['dropped']
+        release_history(history, blocks, unlink=False)
+
+
+def start_acquisition(port, capacity=LIVE_CAPACITY, cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS, record_directory=None,
+                      widths=FRAME_WIDTHS):
+    """ Starts reading a serial port in an acquisition process.
+
+        :param port: Serial port to open.
+        :param capacity: Number of frames kept in the shared live history.
+        :param record_directory: Directory to record every frame to, or None to not record.
+        :param widths: Numbers of values a frame may have, as for create_frame_reader.
+        :returns: Dictionary of the acquisition 'process', the shared 'history' and its 'blocks'.
+    """
+    history, blocks, descriptor = create_shared_history(capacity)
+    process = Process(target=acquire, args=(port, descriptor, cells, temps, BAUD_RATE, record_directory, widths),
+                      daemon=True)
+    process.start()
+    return {'process': process, 'history': history, 'blocks': blocks}
+
+
+def stop_acquisition(acquisition):
+    """ Stops an acquisition process and frees its shared live history.
+
+        :param acquisition: Dictionary returned by start_acquisition.
+    """
+    acquisition['history']['counters'][STOP] = 1
+    acquisition['process'].join(STOP_TIMEOUT)
+    if acquisition['process'].is_alive():
+        acquisition['process'].terminate()
+    release_history(acquisition['history'], acquisition['blocks'])
+
+
+def replay(file_path, descriptor, cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS):
+    """ Feeds the frames of a datalogger log or recording into a shared live history at the set speed.
+
+        Runs in its own process in place of acquire, so the GUI shows a replay exactly
+        as a live session. Frames are timed by the log's timestamps; a seek finds its
+        frame by binary search of them, so any point is reached at once. The replay
+        stays paused at the end of the log until it is stopped or sought back.
+
+        :param file_path: Path to the CSV file.
+        :param descriptor: Descriptor returned by create_shared_history.
+        :param cells: Number of cells per stack.
+        :param temps: Number of temperature sensors per stack.
+    """
+    history, blocks = attach_history(descriptor)
+    counters = history['counters']
+    layout = frame_layout(cells, temps)
+    try:
+        raw_columns = load_raw_columns(file_path)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {file_path}: {e}")
+        release_history(history, blocks, unlink=False)
+        return
+    raw = raw_columns['raw']
+    timestamps = decode_timestamps(raw_columns.get(f'text_{TIMESTAMP_COL-1}', raw[TIMESTAMP_COL-1]))
+    # Frames are the raw columns after the timestamp, as sent over serial; logs without
+    # the derived columns leave them NaN
+    frames = raw[TIMESTAMP_COL:TIMESTAMP_COL + history['fields']]
+    position = 0  # Index of the next frame to hand over
+    log_now = float(timestamps[0]) if len(timestamps) else 0.0  # Log time reached, in ns
+    received_now = time.time()  # Receive time given to log_now; only moves forward
+    wall = time.monotonic()
+    if len(timestamps):
+        counters[START] = timestamps[0]
+        counters[END] = timestamps[-1]
+    try:
+        while not counters[STOP]:
+            now = time.monotonic()
+            if counters[SEEK] >= 0:
+                position = int(np.searchsorted(timestamps, counters[SEEK]))
+                log_now = float(timestamps[min(position, len(timestamps) - 1)])
+                counters[SEEK] = -1
+            elif not counters[PAUSED] and position < len(timestamps):
+                step = (now - wall) * counters[SPEED] / 100 * 1e9
+                log_now = min(log_now + step, float(timestamps[-1]))
+                received_now += step / 1e9
+            wall = now
+            end = int(np.searchsorted(timestamps, log_now, side='right'))
+            if end > position:
+                due = np.full((history['fields'], end - position), np.nan)
+                due[:len(frames)] = frames[:, position:end]
+                for offset in range(end - position):
+                    append_frame(history, layout, due[:, offset],
+                                 received_now - (log_now - timestamps[position + offset]) / 1e9)
+                position = end
+            counters[POSITION] = int(log_now)
+            time.sleep(REPLAY_TICK_SECONDS)
+    finally:
+        release_history(history, blocks, unlink=False)
+
+
+def start_replay(file_path, capacity=LIVE_CAPACITY, cells=DEFAULT_CELLS, temps=DEFAULT_TEMPS, speed=1):
+    """ Starts replaying a log in a replay process.
+
+        :param file_path: Path to the CSV file.
+        :param capacity: Number of frames kept in the shared live history.
+        :param speed: Replay speed, as a multiple of real time.
+        :returns: Dictionary of the replay 'process', the shared 'history' and its 'blocks',
+            as returned by start_acquisition.
+    """
+    history, blocks, descriptor = create_shared_history(capacity)
+    history['counters'][SPEED] = round(speed * 100)
+    history['counters'][SEEK] = -1
+    process = Process(target=replay, args=(file_path, descriptor, cells, temps), daemon=True)
+    process.start()
+    return {'process': process, 'history': history, 'blocks': blocks}
+
+
+def set_replay_speed(acquisition, speed):
+    """ Changes the speed of a replay.
+
+        :param acquisition: Dictionary returned by start_replay.
+        :param speed: Replay speed, as a multiple of real time.
+    """
+    acquisition['history']['counters'][SPEED] = round(speed * 100)
+
+
+def pause_replay(acquisition, paused):
+    """ Pauses or resumes a replay.
+
+        :param acquisition: Dictionary returned by start_replay.
+        :param paused: Whether to pause.
+    """
+    acquisition['history']['counters'][PAUSED] = int(paused)
+
+
+def seek_replay(acquisition, time_ns):
+    """ Makes a replay jump to a log time.
+
+        :param acquisition: Dictionary returned by start_replay.
+        :param time_ns: Log time to jump to, in ns since midnight.
+    """
+    acquisition['history']['counters'][SEEK] = max(int(time_ns), 0)
@@ -0,0 +1,170 @@
+# Headless report generator: parses datalogger logs with bms_core and writes
+# the stack graphs, Overview and Motor Controller plots and summary statistics
+# without importing Tk, so it can batch-process logs on a machine with no display.
+#
+# Usage: python bms_report.py LOG.csv [LOG.csv ...] -o reports
+
+# LIBRARIES
+import os
+import csv
+import argparse
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+from bms_core import (DEFAULT_STACK_ROWS, DEFAULT_STACK_COLS, DEFAULT_CELLS, DEFAULT_TEMPS, TIMESTAMP_COL, SOC_COL,
+                      VSBAT_COL, VSHV_COL, CURR_COL, I_ACTUAL_FLAG, PLOT_STYLE, STAT_NAMES, load_data, prepare_data,
+                      overview_summary, plot_decimated, draw_plot, clock_formatter, export_graphs)
+
+plt.style.use(PLOT_STYLE)
+
+
+# FUNCTIONS
+
+def save_plot(path, x, series, labels, title, y_label, top_lim=None, bot_lim=None):
+    """ Saves one or more series against time to a PNG file.
+
+        :param path: PNG file to write.
+        :param x: X-axis data (seconds since midnight).
+        :param series: List of y-axis data arrays.
+        :param labels: Legend label of each series, or None for a single series.
+        :param title: Title of the plot.
+        :param y_label: Label for the Y-axis.
+    """
+    if labels is None:
+        fig, ax = plt.subplots()
+        draw_plot(ax, x, series[0], 'Time (hh:mm:ss.ms)', y_label,
+                  title, '', top_lim, bot_lim)
+    else:
+        fig, ax = plt.subplots()
+        for data, label in zip(series, labels):
+            plot_decimated(ax, x, data, label=label)
+        ax.legend()
+        ax.set_xlabel('Time (hh:mm:ss.ms)')
+        ax.set_ylabel(y_label)
+        ax.set_title(title)
+        ax.set_ylim(top=top_lim, bottom=bot_lim)
+        ax.xaxis.set_major_locator(ticker.AutoLocator())
+        ax.xaxis.set_major_formatter(clock_formatter())
+        ax.xaxis.set_minor_locator(ticker.AutoLocator())
+        ax.grid(True)
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def write_report(file_path, output_dir, stacks, cells, temps, timestamp_col, SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag, jobs=None):
+    """ Writes every graph and the summary statistics of one log.
+
+        :param file_path: Path to the CSV file.
+        :param output_dir: Directory the report files are written to.
+        :param stacks: Number of stacks in use.
+        :param jobs: Number of graph export processes, one per CPU core if None.
+        :returns: List of the written file names.
+    """
+    data = prepare_data(load_data(file_path, cells, temps, timestamp_col,
+                                  SoC_col, VsBat_col, VsHV_col, curr_col, i_actual_flag))
+    os.makedirs(output_dir, exist_ok=True)
+    x = data['timestamps_numeric'] / 1e9
+    written = []
+
+    # Stack voltage and temperature graphs
+    for key, type, name, y_label in (('cell_voltages', 'voltages', 'Voltages', 'Voltage (V)'),
+                                     ('cell_temps', 'temps', 'Temperatures', 'Temperature (°C)')):
+        titles = [f'Stack {stack_index + 1} {name}' for stack_index in range(stacks)]
+        written += export_graphs(x, data[key], range(stacks), 'Time (hh:mm:ss.ms)', y_label, titles, type,
+                                 [os.path.join(output_dir, title + '.png') for title in titles], max_workers=jobs)
+
+    # Overview and motor controller plots
+    plots = [
+        ('Current', [data['current_converted']], None, 'A', None, None),
+        ('Total Pack Voltage', [data['total_pack_voltage']],
+         None, 'V', 453.6, 270),
+        ('Power', [data['power']], None, 'kW', None, None),
+        ('Left Radiator Temp.', [data['left_radiator_temps']],
+         None, '°C', 125, -55),
+        ('Right Radiator Temp.', [data['right_radiator_temps']],
+         None, '°C', 125, -55),
+        ('Actual Speed', [data['n_actual']], None, 'RPM', None, None),
+        ('Motor Temperature', [data['t_motor']], None, '°C', None, None),
+        ('IGBT Temperature', [data['t_igbt']], None, '°C', None, None),
+    ]
+    if (i_actual_flag):
+        plots += [
+            ('Actual Current', [data['i_actual']], None, 'A (rms)', None, None),
+            ('Torque', [data['torque']], None, 'nm', None, None),
+            ('Motor RPM and Torque', [data['n_actual'], data['torque']],
+             ['Motor RPM', 'Torque'], 'RPM / A (rms)', None, None),
+        ]
+    for title, series, labels, unit, top_lim, bot_lim in plots:
+        path = os.path.join(output_dir, title + '.png')
+        save_plot(path, x, series, labels, title,
+                  f'{title} ({unit})', top_lim, bot_lim)
+        written.append(path)
+
+    # Summary statistics
+    path = os.path.join(output_dir, 'summary.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Statistic', 'Value', 'Unit'])
+        writer.writerows(overview_summary(data, stacks))
+    written.append(path)
+
+    # Statistics of every channel
+    path = os.path.join(output_dir, 'channel_stats.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Channel', 'Stack', 'Index'] + list(STAT_NAMES))
+        for name, key in (('Cell Voltage', 'voltage_stats'), ('Cell Temp.', 'temp_stats')):
+            stats = data[key]
+            for stack_index, channel in np.ndindex(stats['mean'][:stacks].shape):
+                writer.writerow([name, stack_index + 1, channel + 1] +
+                                [round(float(stats[stat][stack_index, channel]), 4) for stat in STAT_NAMES])
+    written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Writes stack graphs, Overview and Motor Controller plots and summary statistics for datalogger CSV logs.')
+    parser.add_argument('logs', nargs='+', help='datalogger CSV files')
+    parser.add_argument('-o', '--output', default='reports',
+                        help='output directory, one sub-directory per log (default: %(default)s)')
+    parser.add_argument('--stacks', type=int, default=DEFAULT_STACK_ROWS * DEFAULT_STACK_COLS,
+                        help='number of stacks (default: %(default)s)')
+    parser.add_argument('--cells', type=int, default=DEFAULT_CELLS,
+                        help='cells per stack (default: %(default)s)')
+    parser.add_argument('--temps', type=int, default=DEFAULT_TEMPS,
+                        help='temperature sensors per stack (default: %(default)s)')
+    parser.add_argument('--timestamp-col', type=int, default=TIMESTAMP_COL,
+                        help='timestamp column (default: %(default)s)')
+    parser.add_argument('--soc-col', type=int, default=SOC_COL,
+                        help='SoC column (default: %(default)s)')
+    parser.add_argument('--vsbat-col', type=int, default=VSBAT_COL,
+                        help='VsBat column (default: %(default)s)')
+    parser.add_argument('--vshv-col', type=int, default=VSHV_COL,
+                        help='VsHV column (default: %(default)s)')
+    parser.add_argument('--curr-col', type=int, default=CURR_COL,
+                        help='current column (default: %(default)s)')
+    parser.add_argument('--i-actual', action=argparse.BooleanOptionalAction, default=I_ACTUAL_FLAG,
+                        help='actual current data is present (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='graph export processes (default: one per CPU core)')
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for file_path in args.logs:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        output_dir = os.path.join(args.output, name)
+        try:
+            written = write_report(file_path, output_dir, args.stacks, args.cells, args.temps, args.timestamp_col, args.soc_col,
+                                   args.vsbat_col, args.vshv_col, args.curr_col, args.i_actual, args.jobs)
+            print(f"{file_path}: {len(written)} files written to {output_dir}")
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            failed += 1
+            print(f"{file_path}: could not generate report: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
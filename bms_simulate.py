@@ -0,0 +1,164 @@
+# Serial simulator: opens a pseudo-terminal and writes datalogger-format frames to it
+# at a set rate, optionally corrupting some, so BMS-GUI_V7 and bms_benchmark.py can
+# run without the car. Needs a pty, so Linux or macOS only.
+#
+# Usage: python bms_simulate.py [--rate 50] [--corrupt 0.01] [--log LOG.csv]
+
+# LIBRARIES
+import os
+import pty
+import tty
+import time
+import argparse
+import numpy as np
+from bms_core import TIMESTAMP_COL, load_raw_columns
+from bms_live import FRAME_FIELDS, FRAME_SEPARATOR, frame_checksum, frame_layout
+
+# CONSTANTS
+SIMULATE_RATE = 50.0  # Default frames per second
+SIMULATE_SEED = 0  # Seed of the synthetic values and corruption
+SIMULATE_FRAMES = 3000  # Synthetic frames generated and then repeated
+FRAME_ID_FIELD = FRAME_FIELDS - 1  # Frame number is written here (right radiator) so frames can be matched
+# Ways a frame is corrupted: cut short, merged with the next one, or a value garbled
+CORRUPTIONS = ('truncate', 'merge', 'garble')
+
+
+# FUNCTIONS
+
+def open_pty():
+    """ Opens a pseudo-terminal pair in raw mode.
+
+        :returns: Tuple of the master file descriptor, the slave file descriptor
+            and the device name to open the slave as a serial port.
+    """
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+
+def synthetic_frames(count=SIMULATE_FRAMES, seed=SIMULATE_SEED):
+    """ Generates raw frames that look like the datalogger's.
+
+        :param count: Number of frames.
+        :param seed: Seed of the random values.
+        :returns: (field, frame) array of raw values.
+    """
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(100, 4000, (FRAME_FIELDS, count)).astype(float)
+    layout = frame_layout()
+    voltages = layout['voltages'].ravel()
+    temps = layout['temps'].ravel()
+    frames[voltages] = np.round(3.7 + rng.normal(0, 0.05, (len(voltages), count)), 4)
+    frames[temps] = rng.integers(9000, 9500, (len(temps), count))
+    frames[layout['current']] = rng.integers(500, 600, count)
+    return frames
+
+
+def log_frames(file_path):
+    """ Reads the frames of a datalogger log or recording, to send them as they were logged.
+
+        :param file_path: Path to the CSV file.
+        :returns: (field, frame) array of raw values.
+    """
+    raw = load_raw_columns(file_path)['raw']
+    return np.array(raw[TIMESTAMP_COL:TIMESTAMP_COL + FRAME_FIELDS])
+
+
+def encode_frame(frame, number, checksum=False):
+    """ Formats a frame as the line the BMS sends.
+
+        :param frame: Raw values of the frame.
+        :param number: Frame number, written into FRAME_ID_FIELD.
+        :param checksum: Whether to append a *HH checksum.
+        :returns: The line as bytes, with its newline.
+    """
+    values = frame.tolist()
+    values[FRAME_ID_FIELD] = number
+    line = ', '.join(map(repr, values)).encode()
+    if checksum:
+        line += b'*%02X' % frame_checksum(line)
+    return line + b'\n'
+
+
+def corrupt_line(line, rng):
+    """ Damages a line in one of the CORRUPTIONS ways, so the reader should reject it.
+
+        :param line: Line returned by encode_frame.
+        :param rng: numpy random Generator.
+        :returns: Tuple of the damaged line and the kind of damage.
+    """
+    kind = CORRUPTIONS[rng.integers(len(CORRUPTIONS))]
+    if kind == 'truncate':
+        # Cut before the last separator, so the line is always short of fields
+        return line[:rng.integers(1, line.rindex(FRAME_SEPARATOR) + 1)] + b'\n', kind
+    if kind == 'merge':
+        return line[:-1], kind  # Runs into the next line
+    position = line.index(b',', rng.integers(len(line) // 2))
+    return line[:position] + b'x' + line[position:], kind
+
+
+def simulate(master, frames, rate=SIMULATE_RATE, corrupt=0.0, checksum=False, sent=None, stop=None, seed=SIMULATE_SEED):
+    """ Writes frames to a pseudo-terminal at a steady rate until stopped.
+
+        Frames are scheduled from the start time rather than slept between, so the
+        rate holds on average even when a write blocks for a while.
+
+        :param master: Master file descriptor returned by open_pty.
+        :param frames: (field, frame) array of raw values, repeated as needed.
+        :param rate: Frames per second.
+        :param corrupt: Fraction of frames corrupted.
+        :param checksum: Whether frames carry a checksum.
+        :param sent: Optional list collecting (send time, corrupted) of every frame,
+            indexed by frame number; times are from time.monotonic. A frame a merged
+            line runs into counts as corrupted too.
+        :param stop: Optional threading.Event ending the simulation.
+    """
+    rng = np.random.default_rng(seed)
+    start = time.monotonic()
+    number = 0
+    merged = False  # Whether the previous line runs into this one
+    while stop is None or not stop.is_set():
+        due = start + number / rate
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        line = encode_frame(frames[:, number % frames.shape[1]], number, checksum)
+        corrupted = merged
+        merged = False
+        if rng.random() < corrupt:
+            line, kind = corrupt_line(line, rng)
+            corrupted = True
+            merged = kind == 'merge'
+        # Logged before the write, so a reader never sees a frame it has no entry for
+        if sent is not None:
+            sent.append((time.monotonic(), corrupted))
+        os.write(master, line)
+        number += 1
+
+
+def main():
+    """ Parses the command line and simulates the BMS until interrupted. """
+    parser = argparse.ArgumentParser(description='Simulate the BMS serial stream on a pseudo-terminal.')
+    parser.add_argument('--rate', type=float, default=SIMULATE_RATE,
+                        help='frames per second')
+    parser.add_argument('--corrupt', type=float, default=0.0,
+                        help='fraction of frames to corrupt')
+    parser.add_argument('--checksum', action='store_true',
+                        help='append a *HH checksum to every frame')
+    parser.add_argument('--log', help='send the frames of this log instead of synthetic ones')
+    args = parser.parse_args()
+
+    frames = log_frames(args.log) if args.log else synthetic_frames()
+    master, slave, device = open_pty()
+    print(f'Simulating the BMS on {device}; select it as the serial port. Ctrl+C to stop.')
+    try:
+        simulate(master, frames, args.rate, args.corrupt, args.checksum)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Timestamp decoding of datalogger logs with blank or garbled timestamp cells.
+# Run with: python -m pytest tests
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bms_core import (NS_PER_DAY, LAST_CELL_DATA_COL, RIGHT_RADIATOR_COL, decode_timestamps, load_data,
+                      window_bounds, build_window_index)
+
+PM_START_NS = 13 * 3600 * 1_000_000_000  # 01:00:00 PM
+ROWS = 101  # One row a second, a 100 s log
+
+
+def pm_log_times():
+    """ Timestamps of a 100 s afternoon log in the 12hrF format. """
+    return [f'2025-03-14 01:{second // 60:02d}:{second % 60:02d}.000000 PM' for second in range(ROWS)]
+
+
+def test_bad_cells_are_interpolated_not_rolled_over():
+    times = pm_log_times()
+    times[40] = 'nan'  # How pandas hands over a blank text cell
+    times[70] = '2025-03-14 garbled PM'
+    decoded = decode_timestamps(np.array(times))
+    expected = PM_START_NS + np.arange(ROWS) * 1_000_000_000
+    assert np.array_equal(decoded, expected)
+
+
+def test_bad_cells_keep_real_rollovers():
+    times = ['11:59:58.000000 PM', '', '12:00:00.000000 AM', 'x', '12:00:02.000000 AM']
+    decoded = decode_timestamps(np.array(times))
+    assert np.all(np.diff(decoded) > 0)
+    assert decoded[-1] == NS_PER_DAY + 2_000_000_000
+
+
+def test_load_data_with_blank_and_garbled_timestamps(tmp_path):
+    path = tmp_path / 'log_12hrF.csv'
+    times = pm_log_times()
+    times[40] = ''
+    times[70] = 'garbled'
+    values = ','.join(['3.7'] * (LAST_CELL_DATA_COL - 1) + ['500'] * (RIGHT_RADIATOR_COL - LAST_CELL_DATA_COL))
+    with open(path, 'w') as f:
+        f.write(','.join(['Time'] + [f'C{i}' for i in range(1, RIGHT_RADIATOR_COL)]) + '\n')
+        f.write(','.join(['raw'] * RIGHT_RADIATOR_COL) + '\n')
+        for time in times:
+            f.write(f'{time},{values}\n')
+    data = load_data(str(path), 6, 4, 1, 182, 183, 184, 185, True)
+    timestamps = np.asarray(data['timestamps_numeric'])
+    assert timestamps[0] == PM_START_NS
+    assert timestamps[-1] - timestamps[0] == (ROWS - 1) * 1_000_000_000
+    assert np.all(np.diff(timestamps) > 0)
+    # Window queries over the bad rows find every sample in between
+    index = build_window_index(timestamps, {'current': data['current_converted']})
+    start, end = window_bounds(index, PM_START_NS + 30_000_000_000, PM_START_NS + 80_000_000_000)
+    assert (start, end) == (30, 81)